@@ -0,0 +1 @@
+"""Load benchmarks for the Heatly integration (run with ``python -m benchmarks.<module>``)."""
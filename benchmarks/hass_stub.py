@@ -0,0 +1,102 @@
+"""Minimal stand-in for the HomeAssistant object, enough to drive the room update cycle.
+
+Only what HeatlyRoom, HeatlyThermostat and the API client touch is provided:
+hass.data, hass.states, hass.services, hass.bus and hass.async_create_task.
+Entity state writes are swallowed; service calls are counted.
+"""
+import asyncio
+from datetime import datetime, timezone
+
+
+class StubState:
+    """Just enough of homeassistant.core.State for the sensor cache."""
+
+    __slots__ = ("entity_id", "state", "attributes", "last_updated", "last_reported")
+
+    def __init__(self, entity_id: str, state: str, attributes: dict = None):
+        self.entity_id = entity_id
+        self.state = state
+        self.attributes = attributes or {}
+        self.last_updated = datetime.now(timezone.utc)
+        self.last_reported = self.last_updated
+
+
+class StubStates:
+    def __init__(self):
+        self._states = {}
+
+    def get(self, entity_id: str):
+        return self._states.get(entity_id)
+
+    def async_set(self, entity_id: str, state, attributes: dict = None):
+        new_state = StubState(entity_id, str(state), attributes)
+        self._states[entity_id] = new_state
+        return new_state
+
+    def async_all(self):
+        return list(self._states.values())
+
+
+class StubServices:
+    """Records service calls and applies on/off to the stub state machine."""
+
+    def __init__(self, states: StubStates):
+        self._states = states
+        self.calls = 0
+        self.entity_commands = 0
+
+    async def async_call(self, domain, service, service_data=None, blocking=False, **kwargs):
+        self.calls += 1
+        service_data = service_data or {}
+        entity_ids = service_data.get("entity_id", [])
+        if isinstance(entity_ids, str):
+            entity_ids = [entity_ids]
+        self.entity_commands += len(entity_ids)
+        for entity_id in entity_ids:
+            if service == "turn_on":
+                self._states.async_set(entity_id, "on")
+            elif service == "turn_off":
+                self._states.async_set(entity_id, "off")
+            elif service == "set_hvac_mode":
+                self._states.async_set(entity_id, service_data.get("hvac_mode", "off"))
+
+
+class StubBus:
+    def async_listen(self, event_type, listener, *args, **kwargs):
+        return lambda: None
+
+    def async_listen_once(self, event_type, listener):
+        return lambda: None
+
+    def async_fire(self, event_type, event_data=None, *args, **kwargs):
+        pass
+
+
+class HassStub:
+    def __init__(self):
+        self.data = {}
+        self.states = StubStates()
+        self.services = StubServices(self.states)
+        self.bus = StubBus()
+        self._tasks = set()
+
+    @property
+    def loop(self):
+        return asyncio.get_running_loop()
+
+    def async_create_task(self, coro, *args, **kwargs):
+        task = asyncio.get_running_loop().create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def async_block_till_done(self):
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+
+def silence_entity(entity, hass: HassStub):
+    """Attach an entity to the stub without a real entity platform."""
+    entity.hass = hass
+    entity.async_write_ha_state = lambda: None
+    return entity
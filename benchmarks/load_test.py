@@ -0,0 +1,262 @@
+"""Load benchmark: N rooms driven through send_sensor_update against a local stand-in API.
+
+Each room is a real HeatlyApiClient + HeatlyThermostat + HeatlyRoom on top of a
+minimal hass stub. Every cycle nudges each room's temperature and runs
+HeatlyRoom.async_send_sensor_update for all rooms at once.
+
+The report is JSON (stdout, or --output), so results can be compared between
+commits:
+
+    python -m benchmarks.load_test --rooms 200 --cycles 20 --output bench.json
+
+Requires homeassistant and aiohttp to be installed.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import random
+import subprocess
+import time
+import tracemalloc
+
+from custom_components.heatly_test.api_client import (
+    HeatlyApiClient, HeatlySessionPool, HeatlySensorBatcher, ScheduleCache, CircuitBreaker
+)
+from custom_components.heatly_test.climate import HeatlyThermostat
+from custom_components.heatly_test.metrics import RequestMetrics
+from custom_components.heatly_test.room import HeatlyRoom
+from custom_components.heatly_test.sensor import HeatlyForecastSensor
+from custom_components.heatly_test.tracing import UpdateTracer
+from custom_components.heatly_test.traffic_log import ApiTrafficRecorder
+from custom_components.heatly_test.const import (
+    DOMAIN, CONF_ROOM_ID, CONF_TEMP_SENSOR, CONF_HEATER_SWITCHES, CONF_OUTDOOR_SENSOR
+)
+
+from .hass_stub import HassStub, silence_entity
+from .stand_in_server import (
+    StandInApi, start_stand_in_server, add_config_arguments, config_from_args
+)
+
+
+def percentile(sorted_values, fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class LoopLagMonitor:
+    """Measures how late a periodic sleep wakes up - a proxy for event-loop blocking."""
+
+    def __init__(self, interval: float = 0.01):
+        self._interval = interval
+        self._task = None
+        self.samples = []
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self._interval)
+            self.samples.append(max(0.0, loop.time() - start - self._interval))
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+    def summary(self) -> dict:
+        lags = sorted(self.samples)
+        return {
+            "samples": len(lags),
+            "p50_ms": round(percentile(lags, 0.5) * 1000, 3),
+            "p99_ms": round(percentile(lags, 0.99) * 1000, 3),
+            "max_ms": round((lags[-1] if lags else 0.0) * 1000, 3),
+        }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def build_rooms(
+    hass: HassStub, base_url: str, count: int, heaters_per_room: int, batch_window,
+    room_ids=None, recorder=None, tracer=None
+):
+    """Create count rooms (or one per room_ids) wired like async_setup_entry does, sharing pool/batcher/cache/breaker."""
+    pool = HeatlySessionPool()
+    session = pool.acquire(base_url)
+    batcher = HeatlySensorBatcher(base_url, "bench-key", window=batch_window) if batch_window is not None else None
+    schedule_cache = ScheduleCache(base_url)
+    breaker = CircuitBreaker(base_url)
+    host_metrics = RequestMetrics()
+    hass.data.setdefault(DOMAIN, {})
+    hass.states.async_set("sensor.outdoor", "2.5")
+
+    rooms = []
+    room_ids = room_ids or [f"bench_room_{i:04d}" for i in range(count)]
+    for i, room_id in enumerate(room_ids):
+        entry_id = f"entry_{i:04d}"
+        config = {
+            CONF_ROOM_ID: room_id,
+            CONF_TEMP_SENSOR: f"sensor.{room_id}_temperature",
+            CONF_OUTDOOR_SENSOR: "sensor.outdoor",
+            CONF_HEATER_SWITCHES: [f"switch.{room_id}_heater_{h}" for h in range(heaters_per_room)],
+        }
+        client = HeatlyApiClient(
+            room_id, base_url, "bench-key",
+            session=session, batcher=batcher, schedule_cache=schedule_cache, circuit_breaker=breaker,
+            host_metrics=host_metrics, recorder=recorder
+        )
+        room = HeatlyRoom(hass, entry_id, room_id, client, tracer=tracer)
+        thermostat = silence_entity(HeatlyThermostat(hass, client, config, entry_id), hass)
+        forecast = HeatlyForecastSensor(config, entry_id)  # hass left unset: hashing only, no writes
+        hass.data[DOMAIN][entry_id] = {"api": client, "room": room, "thermostat": thermostat, "forecast": forecast}
+        rooms.append((room, thermostat, config))
+    return pool, rooms
+
+
+def set_temperature(hass: HassStub, thermostat, entity_id: str, value: float):
+    """Update the stub state and feed it to the thermostat's sensor cache like a state event would."""
+    state = hass.states.async_set(entity_id, f"{value:.2f}")
+    thermostat._sensors._update(entity_id, state)
+
+
+async def run_benchmark(args) -> dict:
+    api = StandInApi(config_from_args(args))
+    runner, base_url = await start_stand_in_server(api)
+    hass = HassStub()
+    rng = random.Random(args.seed)
+
+    tracemalloc.start()
+    mem_before, _ = tracemalloc.get_traced_memory()
+    batch_window = None if args.no_batch else args.batch_window
+    recorder = ApiTrafficRecorder(args.record) if args.record else None
+    tracer = UpdateTracer(args.trace, sample_rate=args.trace_sample)
+    tracer.start()
+    pool, rooms = build_rooms(hass, base_url, args.rooms, args.heaters, batch_window, recorder=recorder, tracer=tracer)
+
+    temperatures = {}
+    for room, thermostat, config in rooms:
+        temperatures[room.room_id] = rng.uniform(18.0, 23.0)
+        set_temperature(hass, thermostat, "sensor.outdoor", 2.5)
+        set_temperature(hass, thermostat, config[CONF_TEMP_SENSOR], temperatures[room.room_id])
+    mem_built, _ = tracemalloc.get_traced_memory()
+
+    cycle_latencies = []
+    monitor = LoopLagMonitor()
+    monitor.start()
+
+    async def timed_update(room):
+        start = time.perf_counter()
+        await room.async_send_sensor_update()
+        cycle_latencies.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    for _ in range(args.cycles):
+        cycle_start = time.perf_counter()
+        for room, thermostat, config in rooms:
+            temperatures[room.room_id] += rng.gauss(0.0, 0.05)
+            set_temperature(hass, thermostat, config[CONF_TEMP_SENSOR], temperatures[room.room_id])
+        await asyncio.gather(*(timed_update(room) for room, _, _ in rooms))
+        remaining = args.interval - (time.perf_counter() - cycle_start)
+        if remaining > 0:
+            await asyncio.sleep(remaining)
+    await hass.async_block_till_done()
+    wall = time.perf_counter() - started
+
+    await monitor.stop()
+    mem_after, mem_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    await pool.async_close()
+    await runner.cleanup()
+    if recorder is not None:
+        await recorder.async_close()
+    await tracer.async_close()
+
+    latencies = sorted(cycle_latencies)
+    total_updates = len(latencies)
+    # Host metrics count each HTTP request once; a batched upload also counts in every room it carried
+    host_metrics = rooms[0][0].api.host_metrics
+    total_requests = host_metrics.requests
+    return {
+        "meta": {
+            "revision": git_revision(),
+            "timestamp": int(time.time()),
+            "python": platform.python_version(),
+            "rooms": args.rooms,
+            "heaters_per_room": args.heaters,
+            "cycles": args.cycles,
+            "interval_seconds": args.interval,
+            "batch_window_seconds": batch_window,
+            "server": api.config.as_dict(),
+        },
+        "throughput": {
+            "wall_seconds": round(wall, 3),
+            "updates": total_updates,
+            "updates_per_second": round(total_updates / wall, 1) if wall else 0.0,
+            "api_requests": total_requests,
+            "api_requests_per_second": round(total_requests / wall, 1) if wall else 0.0,
+            "uploads_sent": sum(room.reporting.sent for room, _, _ in rooms),
+            "uploads_suppressed": sum(room.reporting.suppressed for room, _, _ in rooms),
+            "service_calls": hass.services.calls,
+            "heater_commands": hass.services.entity_commands,
+        },
+        "update_latency_ms": {
+            "p50": round(percentile(latencies, 0.5) * 1000, 3),
+            "p99": round(percentile(latencies, 0.99) * 1000, 3),
+            "max": round((latencies[-1] if latencies else 0.0) * 1000, 3),
+        },
+        "request_latency_ms": {
+            "mean": round(host_metrics.latency_ms.sum / host_metrics.latency_ms.count, 3) if host_metrics.latency_ms.count else 0.0,
+            "max": round(host_metrics.latency_ms.max, 3),
+        },
+        "event_loop_lag": monitor.summary(),
+        "update_timing": tracer.as_dict(),
+        "memory": {
+            "per_room_bytes": int((mem_built - mem_before) / max(1, args.rooms)),
+            "after_run_per_room_bytes": int((mem_after - mem_before) / max(1, args.rooms)),
+            "peak_bytes": mem_peak,
+        },
+        "server_counters": dict(sorted(api.counters.items())),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Heatly load benchmark")
+    parser.add_argument("--rooms", type=int, default=100)
+    parser.add_argument("--heaters", type=int, default=2, help="Heaters per room")
+    parser.add_argument("--cycles", type=int, default=10)
+    parser.add_argument("--interval", type=float, default=0.0, help="Minimum seconds between cycles")
+    parser.add_argument("--batch-window", type=float, default=0.05, help="Batcher collection window")
+    parser.add_argument("--no-batch", action="store_true", help="One request per room (no batcher)")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    parser.add_argument("--record", help="Record the API traffic here (input for benchmarks.replay)")
+    parser.add_argument("--trace", help="Write sampled update traces here (Chrome trace event JSON)")
+    parser.add_argument("--trace-sample", type=float, default=0.1, help="Fraction of updates traced with --trace")
+    add_config_arguments(parser)
+    args = parser.parse_args()
+
+    report = asyncio.run(run_benchmark(args))
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+"""Replay a recorded API session through the stand-in server and the thermostat logic.
+
+Takes a recording made with API_RECORD_FILE (config.py) or
+`load_test --record`, rebuilds one room per recorded room id, and replays
+every recorded sensor upload in order at --speed times real time. Each
+upload's temperature and outdoor temperature are fed to the room's sensor
+cache before running HeatlyRoom.async_send_sensor_update, and the stand-in
+server answers with the recorded responses (and recorded failures) for that
+room, falling back to its synthetic response when the recording runs out.
+
+    python -m benchmarks.replay heatly_traffic.jsonl --speed 60 --output replay.json
+
+The report has the same shape as the load test's, plus how many heater
+switches each room made in the recording and in the replay, so a change to
+the thermostat logic shows up as a diff between two replay reports.
+
+Recorded uploads are always sent during replay: the significance filter and
+local plan execution run on the compressed clock and would otherwise skip
+uploads that happened, which would shift every later response out of step.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import time
+import tracemalloc
+
+from custom_components.heatly_test.traffic_log import read_recording
+from custom_components.heatly_test.const import CONF_TEMP_SENSOR
+
+from .hass_stub import HassStub
+from .load_test import LoopLagMonitor, build_rooms, git_revision, percentile, set_temperature
+from .stand_in_server import StandInApi, StandInConfig, start_stand_in_server
+
+_ROOM_PREFIX = "/api/room/"
+
+
+def parse_recording(path: str) -> dict:
+    """Split a recording into uploads, per-room responses and latencies.
+
+    uploads: [(recorded_at, room_id, temperature, outdoor_temp)] in time order.
+    responses: room_id -> [(recorded_at, status, response)] in time order.
+    """
+    uploads = []
+    responses = {}
+    latencies = []
+    sensor_requests = 0
+    other = 0
+    for record in read_recording(path):
+        recorded_at = record.get("t", 0.0)
+        status = record.get("s")
+        body = record.get("q") or {}
+        path_ = record.get("p", "")
+        if record.get("l") is not None and status is not None:
+            latencies.append(record["l"])
+
+        if path_.endswith("/api/rooms/sensor"):
+            sensor_requests += 1
+            rooms = (record.get("r") or {}).get("rooms", {}) if status == 200 else {}
+            for reading in body.get("readings", []):
+                room_id = reading.get("room_id")
+                uploads.append((recorded_at, room_id, reading.get("temperature"), reading.get("outdoor_temp"),
+                                reading.get("timestamp")))
+                response = rooms.get(room_id)
+                responses.setdefault(room_id, []).append(
+                    (recorded_at, status if response is not None or status != 200 else None, response)
+                )
+        elif path_.startswith(_ROOM_PREFIX) and path_.endswith("/sensor"):
+            sensor_requests += 1
+            room_id = path_[len(_ROOM_PREFIX):-len("/sensor")]
+            uploads.append((recorded_at, room_id, body.get("temperature"), body.get("outdoor_temp"),
+                            body.get("timestamp")))
+            responses.setdefault(room_id, []).append((recorded_at, status, record.get("r")))
+        else:
+            other += 1
+
+    # A retry resends the same payload right after the failed attempt - count it once
+    unique = []
+    last_payload = {}
+    for recorded_at, room_id, temperature, outdoor_temp, timestamp in sorted(uploads, key=lambda upload: upload[0]):
+        payload = (temperature, outdoor_temp, timestamp)
+        if temperature is None or last_payload.get(room_id) == payload:
+            continue
+        last_payload[room_id] = payload
+        unique.append((recorded_at, room_id, temperature, outdoor_temp))
+    return {
+        "uploads": unique,
+        "responses": responses,
+        "latencies_ms": sorted(latencies),
+        "sensor_requests": sensor_requests,
+        "other_requests": other,
+    }
+
+
+def count_switches(states) -> int:
+    """Number of on/off changes in a sequence of heater states."""
+    switches = 0
+    previous = None
+    for state in states:
+        if previous is not None and state != previous:
+            switches += 1
+        previous = state
+    return switches
+
+
+async def run_replay(args) -> dict:
+    recording = parse_recording(args.recording)
+    uploads = recording["uploads"]
+    if not uploads:
+        raise SystemExit(f"No sensor uploads found in {args.recording}")
+    room_ids = sorted({upload[1] for upload in uploads})
+
+    latency_ms = args.latency_ms
+    if latency_ms is None:
+        latency_ms = percentile(recording["latencies_ms"], 0.5)
+    api = StandInApi(StandInConfig(latency_ms=latency_ms, latency_jitter_ms=0.0))
+    for room_id, responses in recording["responses"].items():
+        api.load_replay(room_id, responses)
+    runner, base_url = await start_stand_in_server(api)
+    hass = HassStub()
+
+    tracemalloc.start()
+    batch_window = None if args.no_batch else args.batch_window
+    pool, rooms = build_rooms(hass, base_url, len(room_ids), args.heaters, batch_window, room_ids=room_ids)
+    by_id = {room.room_id: (room, thermostat, config) for room, thermostat, config in rooms}
+    for _, thermostat, _ in rooms:
+        # Every recorded upload reached the API - a replayed plan must not skip it locally
+        thermostat.can_skip_api_poll = lambda: False
+
+    update_latencies = []
+    heater_states = {room_id: [] for room_id in room_ids}
+    tasks = set()
+    monitor = LoopLagMonitor()
+    monitor.start()
+
+    async def replay_upload(room):
+        room.reporting.reset()
+        start = time.perf_counter()
+        await room.async_send_sensor_update()
+        update_latencies.append(time.perf_counter() - start)
+        heater_states[room.room_id].append(by_id[room.room_id][1].heater_on)
+
+    first_time = uploads[0][0]
+    started = time.perf_counter()
+    for recorded_at, room_id, temperature, outdoor_temp in uploads:
+        delay = (recorded_at - first_time) / args.speed - (time.perf_counter() - started)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        room, thermostat, config = by_id[room_id]
+        if outdoor_temp is not None:
+            set_temperature(hass, thermostat, "sensor.outdoor", outdoor_temp)
+        set_temperature(hass, thermostat, config[CONF_TEMP_SENSOR], temperature)
+        task = asyncio.get_running_loop().create_task(replay_upload(room))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+    if tasks:
+        await asyncio.gather(*tasks)
+    await hass.async_block_till_done()
+    wall = time.perf_counter() - started
+
+    await monitor.stop()
+    _, mem_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    await pool.async_close()
+    await runner.cleanup()
+
+    recorded_states = {
+        room_id: [
+            response.get("heater_state") == "on"
+            for _, status, response in recording["responses"].get(room_id, [])
+            if status == 200 and response
+        ]
+        for room_id in room_ids
+    }
+    latencies = sorted(update_latencies)
+    recorded_span = uploads[-1][0] - first_time
+    return {
+        "meta": {
+            "revision": git_revision(),
+            "timestamp": int(time.time()),
+            "python": platform.python_version(),
+            "recording": args.recording,
+            "rooms": len(room_ids),
+            "speed": args.speed,
+            "batch_window_seconds": batch_window,
+            "server_latency_ms": latency_ms,
+        },
+        "throughput": {
+            "recorded_seconds": round(recorded_span, 1),
+            "wall_seconds": round(wall, 3),
+            "effective_speed": round(recorded_span / wall, 1) if wall else None,
+            "uploads": len(uploads),
+            "updates_per_second": round(len(latencies) / wall, 1) if wall else 0.0,
+            "api_requests": rooms[0][0].api.host_metrics.requests,
+            "recorded_sensor_requests": recording["sensor_requests"],
+            "other_recorded_requests": recording["other_requests"],
+            "service_calls": hass.services.calls,
+            "heater_commands": hass.services.entity_commands,
+        },
+        "update_latency_ms": {
+            "p50": round(percentile(latencies, 0.5) * 1000, 3),
+            "p99": round(percentile(latencies, 0.99) * 1000, 3),
+            "max": round((latencies[-1] if latencies else 0.0) * 1000, 3),
+        },
+        "heater_switches": {
+            "recorded": sum(count_switches(states) for states in recorded_states.values()),
+            "replayed": sum(count_switches(states) for states in heater_states.values()),
+            "per_room": {
+                room_id: {
+                    "recorded": count_switches(recorded_states[room_id]),
+                    "replayed": count_switches(heater_states[room_id]),
+                }
+                for room_id in room_ids
+            },
+        },
+        "event_loop_lag": monitor.summary(),
+        "memory": {"peak_bytes": mem_peak},
+        "server_counters": dict(sorted(api.counters.items())),
+    }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Replay recorded Heatly API traffic")
+    parser.add_argument("recording", help="Recording file (rotated files next to it are included)")
+    parser.add_argument("--speed", type=float, default=60.0, help="Replay this many times faster than recorded")
+    parser.add_argument("--heaters", type=int, default=1, help="Heaters per room")
+    parser.add_argument("--latency-ms", type=float, default=None, help="Server latency (default: recorded median)")
+    parser.add_argument("--batch-window", type=float, default=0.05, help="Batcher collection window")
+    parser.add_argument("--no-batch", action="store_true", help="One request per room (no batcher)")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    return parser
+
+
+def main():
+    args = build_parser().parse_args()
+
+    report = asyncio.run(run_replay(args))
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
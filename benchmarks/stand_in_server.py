@@ -0,0 +1,318 @@
+"""Local stand-in for the Heatly API.
+
+Mimics the endpoints the integration talks to, with configurable latency,
+error rate and trajectory size:
+
+    POST /api/room/{room_id}/sensor
+    POST /api/room/{room_id}/sensor/backfill
+    POST /api/room/{room_id}/schedule
+    POST /api/rooms/sensor              (batched upload)
+    GET  /api/schedules                 (ETag / 304 aware)
+    GET  /api/stream                    (server-sent events, see push_control)
+
+Sensor uploads can also be answered from a recording (see load_replay and
+benchmarks/replay.py) instead of the synthetic control_response.
+
+Run standalone:
+
+    python -m benchmarks.stand_in_server --port 5364 --latency-ms 40 --error-rate 0.02
+"""
+import argparse
+import asyncio
+import collections
+import json
+import random
+import time
+
+from aiohttp import web
+
+DEFAULT_SCHEDULES = {
+    "hverdag": {"description": "Standard ukeplan for arbeidsdager"},
+    "helg": {"description": "Helgeplan med lengre morgensøvn"},
+    "medium_18_24": {"description": "Konstant moderat temperatur"},
+}
+
+
+class StandInConfig:
+    """Behaviour knobs for the stand-in server."""
+
+    def __init__(
+        self,
+        latency_ms: float = 20.0,
+        latency_jitter_ms: float = 5.0,
+        error_rate: float = 0.0,
+        trajectory_points: int = 48,
+        trajectory_step_seconds: int = 300,
+        include_plan: bool = False,
+        batch: bool = True,
+        prediction_age_seconds: float = 30.0,
+        stream: bool = True,
+        heartbeat_seconds: float = 15.0,
+        seed: int = None,
+    ):
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.error_rate = error_rate
+        self.trajectory_points = trajectory_points
+        self.trajectory_step_seconds = trajectory_step_seconds
+        # With heater states in the trajectory the thermostat can execute the
+        # plan locally and skip polls, which hides API load in a benchmark
+        self.include_plan = include_plan
+        self.batch = batch
+        self.prediction_age_seconds = prediction_age_seconds
+        self.stream = stream
+        self.heartbeat_seconds = heartbeat_seconds
+        self.seed = seed
+
+    def as_dict(self) -> dict:
+        return dict(vars(self))
+
+
+class StandInApi:
+    """aiohttp application plus request counters."""
+
+    def __init__(self, config: StandInConfig = None):
+        self.config = config or StandInConfig()
+        self._random = random.Random(self.config.seed)
+        self.schedules = dict(DEFAULT_SCHEDULES)
+        self.schedules_etag = '"schedules-1"'
+        self.counters = {}
+        self.room_schedules = {}
+        self._streams = set()  # One queue per open /api/stream connection
+        self._event_id = 0
+        self._replay = {}  # room_id -> deque of (recorded_at, status, response) to answer uploads with
+
+    def _count(self, key: str):
+        self.counters[key] = self.counters.get(key, 0) + 1
+
+    async def _delay(self):
+        cfg = self.config
+        delay_ms = max(0.0, self._random.gauss(cfg.latency_ms, cfg.latency_jitter_ms))
+        if delay_ms:
+            await asyncio.sleep(delay_ms / 1000)
+
+    def _fail(self):
+        if self._random.random() < self.config.error_rate:
+            self._count("errors")
+            return web.json_response({"error": "injected failure"}, status=503)
+        return None
+
+    def control_response(self, room_id: str, temperature: float) -> dict:
+        """Deterministic-ish control response for one room."""
+        cfg = self.config
+        heater_on = temperature < 21.0
+        now = int(time.time())
+        trajectory = []
+        temp = temperature
+        for i in range(cfg.trajectory_points):
+            on = temp < 21.0
+            temp += 0.05 if on else -0.03
+            point = {"timestamp": now + i * cfg.trajectory_step_seconds, "temperature": round(temp, 2)}
+            if cfg.include_plan:
+                point["heater_state"] = "on" if on else "off"
+            trajectory.append(point)
+        return {
+            "room_id": room_id,
+            "heater_state": "on" if heater_on else "off",
+            "trajectory": trajectory,
+            "strategy": {"mode": "comfort", "target": 21.0},
+            "prediction_age_seconds": cfg.prediction_age_seconds,
+        }
+
+    def load_replay(self, room_id: str, responses):
+        """Answer this room's uploads with recorded (recorded_at, status, response) tuples, in order."""
+        self._replay[room_id] = collections.deque(responses)
+
+    def _replayed(self, room_id: str):
+        """Next recorded (status, response) for a room, or None when it has none left.
+
+        Trajectory timestamps are shifted by the time since the recording, so
+        a recorded plan is as fresh now as it was then.
+        """
+        queue = self._replay.get(room_id)
+        if not queue:
+            return None
+        recorded_at, status, response = queue.popleft()
+        self._count("replayed")
+        if status != 200 or not isinstance(response, dict):
+            # Timeout, connection error or missing room in a recorded batch - answer as an outage
+            return (status if status and status != 200 else 503), None
+        shift = int(time.time() - recorded_at)
+        response = dict(response)
+        if isinstance(response.get("trajectory"), list):
+            response["trajectory"] = [
+                {**point, "timestamp": point["timestamp"] + shift} if "timestamp" in point else point
+                for point in response["trajectory"]
+            ]
+        return 200, response
+
+    def room_response(self, room_id: str, temperature: float):
+        """(status, response) for one room's upload: recorded if available, else synthetic."""
+        replayed = self._replayed(room_id)
+        if replayed is not None:
+            return replayed
+        return 200, self.control_response(room_id, temperature)
+
+    async def handle_sensor(self, request: web.Request):
+        self._count("sensor")
+        await self._delay()
+        error = self._fail()
+        if error is not None:
+            return error
+        body = await request.json()
+        status, response = self.room_response(request.match_info["room_id"], body["temperature"])
+        if status != 200:
+            return web.json_response({"error": "replayed failure"}, status=status)
+        return web.json_response(response)
+
+    async def handle_batch(self, request: web.Request):
+        if not self.config.batch:
+            self._count("batch_unsupported")
+            return web.json_response({"error": "not found"}, status=404)
+        self._count("batch")
+        await self._delay()
+        error = self._fail()
+        if error is not None:
+            return error
+        body = await request.json()
+        readings = body.get("readings", [])
+        self.counters["batch_readings"] = self.counters.get("batch_readings", 0) + len(readings)
+        rooms = {}
+        for reading in readings:
+            status, response = self.room_response(reading["room_id"], reading["temperature"])
+            if status == 200:
+                rooms[reading["room_id"]] = response
+        return web.json_response({"rooms": rooms})
+
+    async def handle_backfill(self, request: web.Request):
+        self._count("backfill")
+        await self._delay()
+        error = self._fail()
+        if error is not None:
+            return error
+        body = await request.json()
+        self.counters["backfill_readings"] = self.counters.get("backfill_readings", 0) + len(body.get("readings", []))
+        return web.json_response({"accepted": len(body.get("readings", []))})
+
+    async def handle_schedule(self, request: web.Request):
+        self._count("schedule")
+        await self._delay()
+        error = self._fail()
+        if error is not None:
+            return error
+        body = await request.json()
+        self.room_schedules[request.match_info["room_id"]] = body.get("active_schedule")
+        return web.json_response({"ok": True})
+
+    async def handle_schedules(self, request: web.Request):
+        self._count("schedules")
+        await self._delay()
+        error = self._fail()
+        if error is not None:
+            return error
+        if request.headers.get("If-None-Match") == self.schedules_etag:
+            self._count("schedules_not_modified")
+            return web.Response(status=304)
+        return web.json_response({"schedules": self.schedules}, headers={"ETag": self.schedules_etag})
+
+    @property
+    def stream_clients(self) -> int:
+        return len(self._streams)
+
+    def push(self, event_type: str, data: dict):
+        """Send an event to every open stream. Returns the number of receivers."""
+        self._event_id += 1
+        message = f"id: {self._event_id}\nevent: {event_type}\ndata: {json.dumps(data)}\n\n".encode()
+        for queue in self._streams:
+            queue.put_nowait(message)
+        self._count(f"pushed_{event_type}")
+        return len(self._streams)
+
+    def push_control(self, room_id: str, temperature: float = 20.0):
+        return self.push("control", self.control_response(room_id, temperature))
+
+    def drop_streams(self):
+        """Close every open stream, as a server restart or network drop would."""
+        for queue in self._streams:
+            queue.put_nowait(None)
+
+    async def handle_stream(self, request: web.Request):
+        if not self.config.stream:
+            self._count("stream_unsupported")
+            return web.json_response({"error": "not found"}, status=404)
+        self._count("stream")
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream", "Cache-Control": "no-cache"})
+        await response.prepare(request)
+        queue = asyncio.Queue()
+        self._streams.add(queue)
+        try:
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), self.config.heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    message = b": ping\n\n"
+                if message is None:
+                    break
+                await response.write(message)
+        except (ConnectionResetError, asyncio.CancelledError):
+            pass
+        finally:
+            self._streams.discard(queue)
+        return response
+
+    def make_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/api/room/{room_id}/sensor", self.handle_sensor)
+        app.router.add_post("/api/room/{room_id}/sensor/backfill", self.handle_backfill)
+        app.router.add_post("/api/room/{room_id}/schedule", self.handle_schedule)
+        app.router.add_post("/api/rooms/sensor", self.handle_batch)
+        app.router.add_get("/api/schedules", self.handle_schedules)
+        app.router.add_get("/api/stream", self.handle_stream)
+        return app
+
+
+async def start_stand_in_server(api: StandInApi, host: str = "127.0.0.1", port: int = 0):
+    """Start the server. Returns (runner, base_url); call runner.cleanup() to stop."""
+    runner = web.AppRunner(api.make_app())
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    bound_port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://{host}:{bound_port}"
+
+
+def add_config_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--latency-jitter-ms", type=float, default=5.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--trajectory-points", type=int, default=48)
+    parser.add_argument("--include-plan", action="store_true", help="Put heater states in the trajectory")
+    parser.add_argument("--no-batch-endpoint", action="store_true", help="Answer 404 on /api/rooms/sensor")
+    parser.add_argument("--no-stream-endpoint", action="store_true", help="Answer 404 on /api/stream")
+    parser.add_argument("--seed", type=int, default=None)
+
+
+def config_from_args(args) -> StandInConfig:
+    return StandInConfig(
+        latency_ms=args.latency_ms,
+        latency_jitter_ms=args.latency_jitter_ms,
+        error_rate=args.error_rate,
+        trajectory_points=args.trajectory_points,
+        include_plan=args.include_plan,
+        batch=not args.no_batch_endpoint,
+        stream=not args.no_stream_endpoint,
+        seed=args.seed,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in Heatly API server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5364)
+    add_config_arguments(parser)
+    args = parser.parse_args()
+    web.run_app(StandInApi(config_from_args(args)).make_app(), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,98 +1,263 @@
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.event import async_track_time_interval, async_track_state_change_event
-from datetime import timedelta
-from .api_client import HeatlyApiClient
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.storage import Store
+from .api_client import (
+    HeatlyApiClient, HeatlySessionPool, HeatlySensorBatcher, ScheduleCache, CircuitBreaker
+)
+from .heaters import HeaterDispatcher
+from .hub import HeatlyHub
+from .metrics import RequestMetrics
+from .room import HeatlyRoom
+from .tracing import UpdateTracer
+from .traffic_log import ApiTrafficRecorder
 from .const import (
     DOMAIN, CONF_ROOM_ID, CONF_TEMP_SENSOR, CONF_HEATER_SWITCH, CONF_HEATER_SWITCHES,
-    CONF_OUTDOOR_SENSOR, CONF_API_URL, CONF_API_KEY, DEFAULT_API_URL, SCAN_INTERVAL_SECONDS
+    CONF_API_URL, CONF_API_KEY, DEFAULT_API_URL,
+    DATA_SESSION_POOL, DATA_BATCHERS, DATA_SCHEDULE_CACHES, DATA_CIRCUIT_BREAKERS, DATA_HOST_METRICS,
+    DATA_HUBS, DATA_HEATER_DISPATCHER, DATA_TRAFFIC_RECORDER, API_RECORD_FILE,
+    DATA_TRACER, TRACE_FILE, HEATER_POWER_BUDGET_WATTS, HEATER_MAX_ACTIVE, HEATER_STAGGER_SECONDS,
+    HEATER_RECONCILE_INTERVAL_SECONDS, HEATER_RECONCILE_GRACE_SECONDS,
+    BATCH_SENSOR_UPLOADS,
+    STORAGE_VERSION, STORAGE_KEY_BACKLOG, STORAGE_KEY_THERMAL_MODEL, STORAGE_KEY_LAST_RESPONSE
 )
+from datetime import timedelta
+from functools import partial
+from urllib.parse import urlparse
 import logging
 
 _LOGGER = logging.getLogger(__name__)
 
+PLATFORMS = ["climate", "sensor"]
+
 async def async_setup(hass: HomeAssistant, config: dict):
     """Lar HA sette opp integrasjonen."""
     return True
 
+def _get_session_pool(hass: HomeAssistant) -> HeatlySessionPool:
+    """Return the integration-wide session pool, creating it on first use."""
+    pool = hass.data.get(DATA_SESSION_POOL)
+    if pool is None:
+        pool = HeatlySessionPool()
+        hass.data[DATA_SESSION_POOL] = pool
+
+        async def close_pool(event):
+            await pool.async_close()
+
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, close_pool)
+    return pool
+
+def _get_batcher(hass: HomeAssistant, api_url: str, api_key: str):
+    """Return the shared sensor batcher for an API URL/key pair."""
+    if not BATCH_SENSOR_UPLOADS:
+        return None
+    batchers = hass.data.setdefault(DATA_BATCHERS, {})
+    key = (api_url.rstrip('/'), api_key)
+    if key not in batchers:
+        batchers[key] = HeatlySensorBatcher(api_url, api_key)
+    return batchers[key]
+
+def _get_schedule_cache(hass: HomeAssistant, api_url: str) -> ScheduleCache:
+    """Return the shared schedule cache for an API URL."""
+    caches = hass.data.setdefault(DATA_SCHEDULE_CACHES, {})
+    base_url = api_url.rstrip('/')
+    if base_url not in caches:
+        caches[base_url] = ScheduleCache(base_url)
+    return caches[base_url]
+
+def _get_circuit_breaker(hass: HomeAssistant, api_url: str) -> CircuitBreaker:
+    """Return the shared circuit breaker for the API host."""
+    breakers = hass.data.setdefault(DATA_CIRCUIT_BREAKERS, {})
+    host = urlparse(api_url).netloc or api_url
+    if host not in breakers:
+        breakers[host] = CircuitBreaker(host)
+    return breakers[host]
+
+def _get_host_metrics(hass: HomeAssistant, api_url: str) -> RequestMetrics:
+    """Return the shared request metrics for the API host."""
+    host_metrics = hass.data.setdefault(DATA_HOST_METRICS, {})
+    host = urlparse(api_url).netloc or api_url
+    if host not in host_metrics:
+        host_metrics[host] = RequestMetrics()
+    return host_metrics[host]
+
+def _get_heater_dispatcher(hass: HomeAssistant) -> HeaterDispatcher:
+    """Return the whole-house heater dispatcher shared by all rooms."""
+    dispatcher = hass.data.get(DATA_HEATER_DISPATCHER)
+    if dispatcher is None:
+        dispatcher = HeaterDispatcher(
+            hass,
+            max_watts=HEATER_POWER_BUDGET_WATTS,
+            max_heaters=HEATER_MAX_ACTIVE,
+            stagger_seconds=HEATER_STAGGER_SECONDS
+        )
+        hass.data[DATA_HEATER_DISPATCHER] = dispatcher
+
+        if HEATER_RECONCILE_INTERVAL_SECONDS:
+            # Én runde over alle rom sjekker faktisk tilstand mot siste kommando
+            dispatcher.unsub_reconcile = async_track_time_interval(
+                hass,
+                partial(dispatcher.async_reconcile, grace_seconds=HEATER_RECONCILE_GRACE_SECONDS),
+                timedelta(seconds=HEATER_RECONCILE_INTERVAL_SECONDS)
+            )
+    return dispatcher
+
+def _get_traffic_recorder(hass: HomeAssistant):
+    """Return the API traffic recorder if recording is enabled in config.py."""
+    if not API_RECORD_FILE:
+        return None
+    recorder = hass.data.get(DATA_TRAFFIC_RECORDER)
+    if recorder is None:
+        recorder = ApiTrafficRecorder(hass.config.path(API_RECORD_FILE))
+        hass.data[DATA_TRAFFIC_RECORDER] = recorder
+        _LOGGER.warning(f"Recording Heatly API traffic to {recorder.path}")
+
+        async def close_recorder(event):
+            await recorder.async_close()
+
+        recorder.unsub_stop = hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, close_recorder)
+    return recorder
+
+def _get_tracer(hass: HomeAssistant) -> UpdateTracer:
+    """Return the tracer that times every room update and samples traces."""
+    tracer = hass.data.get(DATA_TRACER)
+    if tracer is None:
+        tracer = UpdateTracer(hass.config.path(TRACE_FILE))
+        hass.data[DATA_TRACER] = tracer
+        tracer.start()
+        if tracer.sample_rate:
+            _LOGGER.info(f"Tracing {tracer.sample_rate:.0%} of Heatly updates to {tracer.path}")
+
+        async def close_tracer(event):
+            await tracer.async_close()
+
+        tracer.unsub_stop = hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, close_tracer)
+    return tracer
+
+def _get_hub(hass: HomeAssistant, api_url: str, api_key: str) -> HeatlyHub:
+    """Return the hub for an API URL/key pair, creating it (and its session) on first use."""
+    hubs = hass.data.setdefault(DATA_HUBS, {})
+    key = (api_url.rstrip('/'), api_key)
+    if key not in hubs:
+        hubs[key] = HeatlyHub(
+            hass, api_url, api_key,
+            session=_get_session_pool(hass).acquire(api_url),
+            batcher=_get_batcher(hass, api_url, api_key)
+        )
+    return hubs[key]
+
+def _entry_config(entry) -> dict:
+    """Setup data with options (set via Configure) taking precedence."""
+    return {**entry.data, **entry.options}
+
 async def async_setup_entry(hass: HomeAssistant, entry):
     """Setter opp Heatly via GUI og starter loopen."""
-    room_id = entry.data[CONF_ROOM_ID]
-    sensor_id = entry.data[CONF_TEMP_SENSOR]
-    outdoor_sensor_id = entry.data.get(CONF_OUTDOOR_SENSOR)
-    api_url = entry.data.get(CONF_API_URL, DEFAULT_API_URL)
-    api_key = entry.data.get(CONF_API_KEY)
+    config = _entry_config(entry)
+    room_id = config[CONF_ROOM_ID]
+    sensor_id = config[CONF_TEMP_SENSOR]
+    api_url = config.get(CONF_API_URL, DEFAULT_API_URL)
+    api_key = config.get(CONF_API_KEY)
     
-    api_client = HeatlyApiClient(room_id, api_url, api_key)
+    # Alle rom på samme konto (API URL + nøkkel) deler én hub: session, batcher, timer og lytter
+    hub = _get_hub(hass, api_url, api_key)
+    api_client = HeatlyApiClient(
+        room_id, api_url, api_key,
+        session=hub.session,
+        batcher=hub.batcher,
+        schedule_cache=_get_schedule_cache(hass, api_url),
+        circuit_breaker=_get_circuit_breaker(hass, api_url),
+        host_metrics=_get_host_metrics(hass, api_url),
+        recorder=_get_traffic_recorder(hass)
+    )
     
     # 1. Opprett lagringsplass i HA
     hass.data.setdefault(DOMAIN, {})
+    room = HeatlyRoom(
+        hass, entry.entry_id, room_id, api_client,
+        backlog_store=Store(hass, STORAGE_VERSION, STORAGE_KEY_BACKLOG.format(entry_id=entry.entry_id)),
+        model_store=Store(hass, STORAGE_VERSION, STORAGE_KEY_THERMAL_MODEL.format(entry_id=entry.entry_id)),
+        response_store=Store(hass, STORAGE_VERSION, STORAGE_KEY_LAST_RESPONSE.format(entry_id=entry.entry_id)),
+        tracer=_get_tracer(hass)
+    )
     hass.data[DOMAIN][entry.entry_id] = {
         "api": api_client,
+        "room": room,
+        "hub": hub,
         "thermostat": None  # Denne fylles av climate.py senere
     }
 
-    # 2. Definer funksjonen som sender data til skyen og oppdaterer termostat
-    async def send_sensor_update():
-        """Send current sensor data to API and update thermostat."""
-        state = hass.states.get(sensor_id)
-        if state and state.state not in ["unknown", "unavailable"]:
-            try:
-                temp = float(state.state)
-            except ValueError:
-                return 
-            
-            outdoor_temp = None
-            if outdoor_sensor_id:
-                outdoor_state = hass.states.get(outdoor_sensor_id)
-                if outdoor_state and outdoor_state.state not in ["unknown", "unavailable"]:
-                    try:
-                        outdoor_temp = float(outdoor_state.state)
-                    except (ValueError, TypeError):
-                        pass
-            
-            # Get thermostat reference
-            data_store = hass.data[DOMAIN].get(entry.entry_id)
-            if not data_store:
-                return
-            
-            thermostat = data_store.get("thermostat")
-            if not thermostat:
-                return
-            
-            # If in AUTO mode, send to API and get control commands
-            from homeassistant.components.climate import HVACMode
-            if thermostat.hvac_mode == HVACMode.AUTO:
-                try:
-                    response = await api_client.send_sensor_data(temp, outdoor_temp)
-                    if response:
-                        await thermostat.update_from_response(response)
-                    else:
-                        _LOGGER.warning("No response from API - thermostat may switch to failsafe")
-                except Exception as e:
-                    _LOGGER.error(f"API error: {e}")
-            
-            # If in HEAT mode (local control), run local update
-            elif thermostat.hvac_mode == HVACMode.HEAT:
-                await thermostat.async_update()
-
-    # 3. Lytt på endringer i temperatur
-    async def sensor_changed(event):
-        new_state = event.data.get("new_state")
-        if new_state and new_state.state not in ["unknown", "unavailable"]:
-            await send_sensor_update()
-
-    async_track_state_change_event(hass, [sensor_id], sensor_changed)
-    
-    # 4. Kjør periodisk sjekk også (hvert minutt)
-    async def periodic_update(now):
-        await send_sensor_update()
-    
-    async_track_time_interval(
-        hass,
-        periodic_update,
-        timedelta(seconds=SCAN_INTERVAL_SECONDS)
-    )
+    # Alle varmeovner i huset går via én dispatcher (effektbudsjett og spredte påslag)
+    _get_heater_dispatcher(hass)
+
+    # 2. Buffer for målinger som ikke kom frem, lært termisk modell, presets og siste svar - overlever omstart
+    await room.async_load()
+
+    # 3. Hubben lytter på temperaturendringer og poller rommet med tilpasset intervall
+    hub.add_room(room, sensor_id)
+
+    # 4. Endrede innstillinger (toleranser, API URL, ...) tas i bruk via en rask reload
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
+
+    # 5. Fortell HA at vi har en klimaanordning (climate.py) og prognosesensor (sensor.py)
+    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    return True
+
+async def _async_update_listener(hass: HomeAssistant, entry):
+    """Options changed - reload the entry so every part picks them up."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+async def async_unload_entry(hass: HomeAssistant, entry):
+    """Stopper rommet: hub-registrering, bakgrunnsjobber, plattformer og klient."""
+    data_store = hass.data.get(DOMAIN, {}).get(entry.entry_id)
+    if not data_store:
+        return await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    room = data_store["room"]
+    hub = data_store["hub"]
+
+    # Avbryt rommets pågående oppdateringer før entitetene fjernes - ellers kan en oppdatering
+    # som er på vei skrive til en termostat som ikke finnes lenger
+    hub_empty = await hub.async_remove_room(entry.entry_id)
+    await room.async_shutdown()
+    if not await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
+        # Entitetene er der fortsatt - la rommet fortsette
+        hub.add_room(room, _entry_config(entry)[CONF_TEMP_SENSOR])
+        return False
+    hass.data[DOMAIN].pop(entry.entry_id, None)
+
+    dispatcher = hass.data.get(DATA_HEATER_DISPATCHER)
+    if dispatcher is not None:
+        dispatcher.forget(entry.entry_id)
+        if not hass.data.get(DOMAIN):
+            # Ingen rom igjen - stopp avstemmingen, en ny dispatcher lages ved neste oppsett
+            if dispatcher.unsub_reconcile is not None:
+                dispatcher.unsub_reconcile()
+            hass.data.pop(DATA_HEATER_DISPATCHER, None)
+
+    recorder = hass.data.get(DATA_TRAFFIC_RECORDER)
+    if recorder is not None and not hass.data.get(DOMAIN):
+        # Siste rom - skriv ut det som ligger i bufferet
+        if recorder.unsub_stop is not None:
+            recorder.unsub_stop()
+        hass.data.pop(DATA_TRAFFIC_RECORDER, None)
+        await recorder.async_close()
+    tracer = hass.data.get(DATA_TRACER)
+    if tracer is not None and not hass.data.get(DOMAIN):
+        if tracer.unsub_stop is not None:
+            tracer.unsub_stop()
+        hass.data.pop(DATA_TRACER, None)
+        await tracer.async_close()
+
+    if hub_empty:
+        # Siste rom på denne kontoen - frigi hub, batcher og delt session
+        key = (hub.api_url, hub.api_key)
+        hass.data.get(DATA_HUBS, {}).pop(key, None)
+        hass.data.get(DATA_BATCHERS, {}).pop(key, None)
+        pool = hass.data.get(DATA_SESSION_POOL)
+        if pool is not None:
+            await pool.async_release(hub.api_url)
+    return True
 
-    # 5. Fortell HA at vi har en klimaanordning (climate.py)
-    await hass.config_entries.async_forward_entry_setups(entry, ["climate"])
-    return True
\ No newline at end of file
+async def async_remove_entry(hass: HomeAssistant, entry):
+    """Rommet slettes: fjern bufferet, den termiske modellen og siste plan fra HA storage."""
+    for key in (STORAGE_KEY_BACKLOG, STORAGE_KEY_THERMAL_MODEL, STORAGE_KEY_LAST_RESPONSE):
+        await Store(hass, STORAGE_VERSION, key.format(entry_id=entry.entry_id)).async_remove()
\ No newline at end of file
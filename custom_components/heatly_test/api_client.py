@@ -3,94 +3,741 @@ import async_timeout
 import time
 import logging
 import asyncio
-from .const import SCHEDULE_CACHE_SECONDS
+import contextvars
+import json
+import random
+from .const import (
+    SCHEDULE_CACHE_SECONDS, API_REQUEST_TIMEOUT_SECONDS, API_CONNECTION_LIMIT,
+    API_CONNECTION_LIMIT_PER_HOST, API_KEEPALIVE_SECONDS, BATCH_WINDOW_SECONDS,
+    API_RETRY_ATTEMPTS, API_RETRY_BASE_SECONDS, API_RETRY_MAX_SECONDS,
+    CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_SECONDS,
+    PUSH_IDLE_TIMEOUT_SECONDS, PUSH_RECONNECT_MIN_SECONDS, PUSH_RECONNECT_MAX_SECONDS
+)
+from .metrics import RequestMetrics
+from .tracing import traced
 
 _LOGGER = logging.getLogger(__name__)
 
+
+class HeatlySessionPool:
+    """Long-lived keep-alive aiohttp sessions, one per API base URL.
+
+    Every config entry talking to the same API URL shares one session (and
+    therefore one connection pool). Sessions are reference counted and closed
+    when the last entry releases them, or all at once on shutdown.
+    """
+
+    def __init__(
+        self,
+        limit: int = API_CONNECTION_LIMIT,
+        limit_per_host: int = API_CONNECTION_LIMIT_PER_HOST,
+        keepalive_timeout: float = API_KEEPALIVE_SECONDS,
+    ):
+        self._limit = limit
+        self._limit_per_host = limit_per_host
+        self._keepalive_timeout = keepalive_timeout
+        self._sessions = {}
+        self._refcounts = {}
+
+    def acquire(self, api_url: str) -> aiohttp.ClientSession:
+        """Get (or create) the shared session for an API URL. Must run in the event loop."""
+        base_url = api_url.rstrip('/')
+        session = self._sessions.get(base_url)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self._limit,
+                limit_per_host=self._limit_per_host,
+                keepalive_timeout=self._keepalive_timeout,
+            )
+            session = aiohttp.ClientSession(connector=connector)
+            self._sessions[base_url] = session
+            _LOGGER.debug(f"Opened shared API session for {base_url}")
+        self._refcounts[base_url] = self._refcounts.get(base_url, 0) + 1
+        return session
+
+    async def async_release(self, api_url: str):
+        """Release one reference to a session and close it when unused."""
+        base_url = api_url.rstrip('/')
+        count = self._refcounts.get(base_url, 0) - 1
+        if count > 0:
+            self._refcounts[base_url] = count
+            return
+        self._refcounts.pop(base_url, None)
+        session = self._sessions.pop(base_url, None)
+        if session is not None and not session.closed:
+            await session.close()
+            _LOGGER.debug(f"Closed shared API session for {base_url}")
+
+    async def async_close(self):
+        """Close every session in the pool (HA shutdown)."""
+        sessions = list(self._sessions.values())
+        self._sessions.clear()
+        self._refcounts.clear()
+        for session in sessions:
+            if not session.closed:
+                await session.close()
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request while the API host's circuit is open."""
+
+
+class CircuitBreaker:
+    """Shared failure tracker for one API host.
+
+    closed    -> requests flow; consecutive failures are counted.
+    open      -> after CIRCUIT_FAILURE_THRESHOLD failures every request fails
+                 fast for CIRCUIT_RESET_SECONDS.
+    half_open -> one probe request is let through; success closes the circuit,
+                 failure opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        host: str,
+        failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+        reset_timeout: float = CIRCUIT_RESET_SECONDS,
+    ):
+        self.host = host
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    def allow_request(self) -> bool:
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN:
+            if time.monotonic() - self._opened_at < self._reset_timeout:
+                return False
+            self.state = self.HALF_OPEN
+            self._probe_in_flight = False
+            _LOGGER.info(f"Circuit for {self.host} half-open - probing API")
+        if self._probe_in_flight:
+            return False
+        self._probe_in_flight = True
+        return True
+
+    def record_success(self):
+        if self.state != self.CLOSED:
+            _LOGGER.info(f"Circuit for {self.host} closed - API is reachable again")
+        self.state = self.CLOSED
+        self.failures = 0
+        self._probe_in_flight = False
+
+    def release_probe(self):
+        """Let the next request probe again if this one ended without an outcome (e.g. cancelled)."""
+        self._probe_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._probe_in_flight = False
+        if self.state == self.HALF_OPEN or (
+            self.state == self.CLOSED and self.failures >= self._failure_threshold
+        ):
+            if self.state == self.CLOSED:
+                _LOGGER.warning(
+                    f"Circuit for {self.host} opened after {self.failures} failures - "
+                    f"failing fast for {self._reset_timeout:.0f}s"
+                )
+            self.state = self.OPEN
+            self._opened_at = time.monotonic()
+
+
+class HeatlySensorBatcher:
+    """Uploads sensor readings for all rooms on one API URL/key in a single request.
+
+    Rooms submit their reading and wait for their own control response. Readings
+    that arrive within BATCH_WINDOW_SECONDS of each other go out together as one
+    POST to /api/rooms/sensor, and the per-room responses are handed back to
+    each caller. If the server has no batch endpoint, the batcher falls back to
+    one request per room for the rest of its lifetime.
+
+    A batched upload counts once in the host's request metrics and once in the
+    metrics of every room it carried.
+    """
+
+    # Statuses meaning "this server does not know the batch endpoint"
+    UNSUPPORTED_STATUSES = (404, 405, 501)
+
+    def __init__(self, base_url: str, api_key: str = None, window: float = BATCH_WINDOW_SECONDS):
+        self.base_url = base_url.rstrip('/')
+        self.api_key = api_key
+        self._window = window
+        self._pending = {}  # room_id -> [client, payload, future]
+        self._flush_handle = None
+        self._flush_tasks = set()  # Batches being sent, cancelled on close
+        self.supported = True
+
+    async def submit(self, client, payload: dict):
+        """Queue a reading for the next batch and wait for this room's response."""
+        if not self.supported:
+            return await client._post_sensor_payload(payload)
+
+        entry = self._pending.get(client.room_id)
+        if entry is not None:
+            # Newer reading for the same room replaces the queued one
+            entry[1] = payload
+            return await asyncio.shield(entry[2])
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending[client.room_id] = [client, payload, future]
+        if self._flush_handle is None:
+            # The batch belongs to no single room - don't inherit this caller's context (its trace)
+            self._flush_handle = loop.call_later(self._window, self._start_flush, context=contextvars.Context())
+        return await asyncio.shield(future)
+
+    def _start_flush(self):
+        task = asyncio.get_running_loop().create_task(self._flush())
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def _flush(self):
+        """Send everything queued so far in one request."""
+        self._flush_handle = None
+        pending, self._pending = self._pending, {}
+        if not pending:
+            return
+
+        results = {}
+        try:
+            results = await self._send_batch(pending)
+            if results is None:
+                # Batch endpoint unavailable - send the queued readings one by one
+                results = dict(zip(
+                    pending.keys(),
+                    await asyncio.gather(*(
+                        client._post_sensor_payload(payload)
+                        for client, payload, _ in pending.values()
+                    ))
+                ))
+        finally:
+            # Always release the waiting rooms, even if the flush itself failed
+            for room_id, (_, _, future) in pending.items():
+                if not future.done():
+                    future.set_result((results or {}).get(room_id))
+
+    def discard(self, room_id: str):
+        """Drop a queued reading for a room that is being unloaded."""
+        entry = self._pending.pop(room_id, None)
+        if entry is not None and not entry[2].done():
+            entry[2].set_result(None)
+
+    def close(self):
+        """Cancel the pending flush and batches in flight, and release anyone still waiting."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        for task in list(self._flush_tasks):
+            # _flush releases its rooms (with no response) as it unwinds
+            task.cancel()
+        for room_id in list(self._pending):
+            self.discard(room_id)
+
+    async def _send_batch(self, pending: dict):
+        """POST the batch. Returns {room_id: response}, or None to request per-room fallback."""
+        first_client = next(iter(pending.values()))[0]
+        readings = [
+            {"room_id": room_id, **payload}
+            for room_id, (_, payload, _) in pending.items()
+        ]
+        headers = {'Content-Type': 'application/json'}
+        if self.api_key:
+            headers['X-Heatly-User-API-Key'] = self.api_key
+
+        try:
+            status, data = await first_client._request(
+                "POST", f"{self.base_url}/api/rooms/sensor",
+                room_metrics=[client.metrics for client, _, _ in pending.values()],
+                json={"readings": readings}, headers=headers
+            )
+        except CircuitOpenError:
+            return {}
+        except asyncio.TimeoutError:
+            _LOGGER.error(f"API timeout for batched upload of {len(readings)} rooms")
+            return {}
+        except Exception as e:
+            _LOGGER.error(f"API error for batched upload of {len(readings)} rooms: {e}")
+            return {}
+
+        if status == 200:
+            rooms = (data or {}).get("rooms", {})
+            missing = [room_id for room_id in pending if not rooms.get(room_id)]
+            if missing:
+                _LOGGER.warning(f"Batched upload returned no response for rooms: {missing}")
+            return rooms
+        if status in self.UNSUPPORTED_STATUSES:
+            _LOGGER.info(
+                f"API at {self.base_url} does not support batched uploads (status {status}) - "
+                f"falling back to one request per room"
+            )
+            self.supported = False
+            return None
+        if status == 401 or status == 403:
+            _LOGGER.error(f"Authentication failed for batched upload. Please check your API key. Status: {status}")
+        else:
+            _LOGGER.warning(f"API returned status {status} for batched upload of {len(readings)} rooms")
+        return {}
+
+
+class ScheduleCache:
+    """Shared cache of the global /api/schedules document for one API URL.
+
+    - Concurrent callers share a single in-flight request.
+    - Refreshes are conditional (If-None-Match / If-Modified-Since), so an
+      unchanged document costs a 304 and no body.
+    - Once the cache is older than SCHEDULE_CACHE_SECONDS, the stale copy is
+      returned immediately while a refresh runs in the background.
+    - On API errors the last good copy is kept; None is only returned if no
+      schedules have ever been fetched.
+
+    Refreshes get the session to use from the caller, not a room's client, so
+    a shared refresh outlives the room that started it without holding on to
+    its client.
+    """
+
+    def __init__(self, base_url: str, max_age: float = SCHEDULE_CACHE_SECONDS):
+        self.base_url = base_url.rstrip('/')
+        self._max_age = max_age
+        self.schedules = None
+        self._fetched_at = 0.0
+        self._etag = None
+        self._last_modified = None
+        self._refresh_task = None
+
+    @property
+    def is_fresh(self) -> bool:
+        return self.schedules is not None and (time.monotonic() - self._fetched_at) < self._max_age
+
+    async def async_get(self, session: aiohttp.ClientSession, headers: dict = None):
+        """Return the schedules, refreshing on the given session if needed."""
+        if self.is_fresh:
+            return self.schedules
+
+        task = self._start_refresh(session, headers)
+        if self.schedules is not None:
+            # Stale-while-revalidate: answer now, refresh in the background
+            return self.schedules
+        return await asyncio.shield(task)
+
+    def invalidate(self):
+        """Mark the cached copy stale so the next caller triggers a refresh."""
+        self._fetched_at = 0.0
+
+    async def async_refresh(self, session: aiohttp.ClientSession, headers: dict = None):
+        """Refresh now (sharing any refresh already in flight) and return the schedules."""
+        self.invalidate()
+        return await asyncio.shield(self._start_refresh(session, headers))
+
+    def _start_refresh(self, session: aiohttp.ClientSession, headers: dict = None):
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.get_running_loop().create_task(self._async_refresh(session, headers))
+        return self._refresh_task
+
+    async def _fetch(self, session: aiohttp.ClientSession, headers: dict):
+        """One GET of the schedules document. Returns (status, json_body, response_headers)."""
+        async with async_timeout.timeout(API_REQUEST_TIMEOUT_SECONDS):
+            async with session.get(f"{self.base_url}/api/schedules", headers=headers) as resp:
+                data = await resp.json() if resp.status == 200 else None
+                return resp.status, data, resp.headers
+
+    async def _async_refresh(self, session: aiohttp.ClientSession, headers: dict = None):
+        request_headers = dict(headers or {})
+        if self._etag:
+            request_headers["If-None-Match"] = self._etag
+        if self._last_modified:
+            request_headers["If-Modified-Since"] = self._last_modified
+
+        try:
+            status, data, resp_headers = await self._fetch(session, request_headers)
+            if status == 304 and self.schedules is None:
+                # Not modified, but there is no copy to keep - forget the validators and fetch it whole
+                self._etag = None
+                self._last_modified = None
+                status, data, resp_headers = await self._fetch(session, dict(headers or {}))
+        except asyncio.TimeoutError:
+            _LOGGER.error("Timeout fetching schedules from API")
+            return self.schedules
+        except Exception as e:
+            _LOGGER.error(f"Error fetching schedules: {e}")
+            return self.schedules
+
+        if status == 304 and self.schedules is not None:
+            _LOGGER.debug("Schedules not modified - keeping cached copy")
+            self._fetched_at = time.monotonic()
+        elif status == 200:
+            schedules = (data or {}).get("schedules", {})
+            if schedules:
+                self.schedules = schedules
+                self._fetched_at = time.monotonic()
+                self._etag = resp_headers.get("ETag")
+                self._last_modified = resp_headers.get("Last-Modified")
+            else:
+                _LOGGER.warning("API returned empty schedules")
+        else:
+            _LOGGER.warning(f"Failed to fetch schedules: status {status}")
+        return self.schedules
+
+
+class PushUnsupportedError(Exception):
+    """The API server has no push stream endpoint."""
+
+
+class HeatlyPushChannel:
+    """Server-sent event stream of control commands for one API URL/key.
+
+    Opens GET /api/stream (text/event-stream) on the shared session and hands
+    each event to on_event(event_type, data) as it arrives:
+
+        event: control    data: {"room_id": ..., <same body as a sensor response>}
+        event: schedule   data: {"room_id": ..., "active_schedule": ...}
+        event: schedules  data: {}   (the schedule list changed)
+
+    The server should send a comment line (": ping") at least every
+    PUSH_IDLE_TIMEOUT_SECONDS; a silent stream counts as dead. Dropped streams
+    are reopened with jittered exponential backoff, resuming from the last
+    event id. If the server has no stream endpoint the channel stops for good.
+    Polling keeps running either way - the stream only makes it less urgent.
+    """
+
+    UNSUPPORTED_STATUSES = (404, 405, 501)
+
+    def __init__(self, base_url: str, api_key: str = None, session: aiohttp.ClientSession = None, on_event=None):
+        self.base_url = base_url.rstrip('/')
+        self.api_key = api_key
+        self._session = session
+        self._on_event = on_event
+        self._last_event_id = None
+        self.connected = False
+        self.supported = True
+
+        # Counters
+        self.connects = 0
+        self.events = 0
+
+    async def async_run(self):
+        """Keep the stream open until cancelled or the server turns out not to support it."""
+        attempt = 0
+        while True:
+            try:
+                if await self._async_stream():
+                    attempt = 0  # The stream worked - start the backoff over
+            except PushUnsupportedError:
+                self.supported = False
+                _LOGGER.info(f"{self.base_url} has no push stream - using polling only")
+                return
+            except (asyncio.TimeoutError, aiohttp.ClientError) as e:
+                _LOGGER.debug(f"Push stream to {self.base_url} dropped: {e!r}")
+            except Exception as e:
+                _LOGGER.error(f"Push stream error: {e}")
+            finally:
+                self.connected = False
+
+            delay = PUSH_RECONNECT_MIN_SECONDS + random.uniform(
+                0, min(PUSH_RECONNECT_MAX_SECONDS, PUSH_RECONNECT_MIN_SECONDS * 2 ** attempt)
+            )
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def _async_stream(self) -> bool:
+        """Read one stream until it ends. Returns True if it was opened successfully."""
+        headers = {"Accept": "text/event-stream"}
+        if self.api_key:
+            headers["X-Heatly-User-API-Key"] = self.api_key
+        if self._last_event_id is not None:
+            headers["Last-Event-ID"] = self._last_event_id
+
+        # No total timeout - the stream is meant to stay open; idleness is checked per line
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=API_REQUEST_TIMEOUT_SECONDS)
+        async with self._session.get(f"{self.base_url}/api/stream", headers=headers, timeout=timeout) as resp:
+            if resp.status in self.UNSUPPORTED_STATUSES:
+                raise PushUnsupportedError()
+            if resp.status != 200:
+                _LOGGER.warning(f"Push stream refused: status {resp.status}")
+                return False
+
+            self.connected = True
+            self.connects += 1
+            _LOGGER.debug(f"Push stream to {self.base_url} open")
+            event_type, data_lines = "message", []
+            while True:
+                line = await asyncio.wait_for(resp.content.readline(), PUSH_IDLE_TIMEOUT_SECONDS)
+                if not line:
+                    return True  # Server closed the stream
+                line = line.decode("utf-8").rstrip("\r\n")
+                if not line:
+                    # A blank line ends an event
+                    if data_lines:
+                        await self._dispatch(event_type, "\n".join(data_lines))
+                    event_type, data_lines = "message", []
+                elif line.startswith(":"):
+                    continue  # Heartbeat comment
+                else:
+                    field, _, value = line.partition(":")
+                    value = value[1:] if value.startswith(" ") else value
+                    if field == "event":
+                        event_type = value
+                    elif field == "data":
+                        data_lines.append(value)
+                    elif field == "id":
+                        self._last_event_id = value
+
+    async def _dispatch(self, event_type: str, payload: str):
+        try:
+            data = json.loads(payload)
+        except ValueError:
+            _LOGGER.debug(f"Ignoring push event with invalid JSON: {payload[:100]}")
+            return
+        self.events += 1
+        if self._on_event is None:
+            return
+        try:
+            await self._on_event(event_type, data)
+        except Exception as e:
+            _LOGGER.error(f"Handling push event {event_type} failed: {e}")
+
+    def as_dict(self) -> dict:
+        return {
+            "supported": self.supported,
+            "connected": self.connected,
+            "connects": self.connects,
+            "events": self.events,
+        }
+
+
 class HeatlyApiClient:
-    def __init__(self, room_id: str, api_url: str, api_key: str = None):
+    # Statuses worth retrying - the request may succeed on a later attempt
+    RETRY_STATUSES = (429, 502, 503, 504)
+
+    def __init__(
+        self,
+        room_id: str,
+        api_url: str,
+        api_key: str = None,
+        session: aiohttp.ClientSession = None,
+        batcher: HeatlySensorBatcher = None,
+        schedule_cache: ScheduleCache = None,
+        circuit_breaker: CircuitBreaker = None,
+        host_metrics: RequestMetrics = None,
+        recorder=None,
+    ):
         self.room_id = room_id
         self.base_url = api_url.rstrip('/')
         self.url = f"{self.base_url}/api/room/{room_id}"
         self.api_key = api_key
-        self._available_schedules = None
-        self._last_schedule_fetch = 0
+        self._session = session
+        self._batcher = batcher
+        self._owns_session = False
+        self._schedule_cache = schedule_cache or ScheduleCache(self.base_url)
+        self._circuit = circuit_breaker or CircuitBreaker(self.base_url)
+        self.metrics = RequestMetrics()  # This room's requests
+        self.host_metrics = host_metrics or RequestMetrics()  # Shared by all rooms on the API host
+        self._recorder = recorder  # Optional ApiTrafficRecorder shared by all clients
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Return the shared session, or a private one if none was provided."""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession()
+            self._owns_session = True
+        return self._session
+
+    async def async_close(self):
+        """Close the session if this client created it. Shared sessions are left to the pool."""
+        if self._owns_session and self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._owns_session = False
+
+    @property
+    def circuit_state(self) -> str:
+        """State of the shared circuit breaker for this API host."""
+        return self._circuit.state
+
+    async def _request(self, method: str, url: str, with_headers: bool = False, room_metrics=None, **kwargs):
+        """Perform a request with retries, guarded by the host's circuit breaker.
+
+        Returns (status, json_body), or (status, json_body, response_headers)
+        when with_headers is set; the body is only parsed for status 200.
+        Timeouts, connection errors and 429/5xx statuses are retried up to
+        API_RETRY_ATTEMPTS times with capped, jittered exponential backoff.
+        Raises CircuitOpenError while the circuit is open; the last timeout or
+        connection error is raised to the caller once retries run out.
+        Outcomes are counted for the host and for room_metrics (default: this
+        client's own metrics) - the batcher passes every room in the batch.
+        """
+        all_metrics = (*(room_metrics or (self.metrics,)), self.host_metrics)
+        attempt = 0
+        while True:
+            if not self._circuit.allow_request():
+                for metrics in all_metrics:
+                    metrics.record_circuit_rejection()
+                raise CircuitOpenError(f"Circuit open for {self._circuit.host}")
+            try:
+                result = await self._request_once(method, url, with_headers, all_metrics, **kwargs)
+            except (asyncio.TimeoutError, aiohttp.ClientConnectionError):
+                self._circuit.record_failure()
+                if attempt >= API_RETRY_ATTEMPTS:
+                    raise
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # HTML maintenance page, broken payload, ... - a failure, but not worth retrying
+                self._circuit.record_failure()
+                raise
+            else:
+                status = result[0]
+                if status < 500 and status != 429:
+                    self._circuit.record_success()
+                    return result
+                self._circuit.record_failure()
+                if attempt >= API_RETRY_ATTEMPTS or status not in self.RETRY_STATUSES:
+                    return result
+            finally:
+                # A half-open probe must never stay in flight, whatever ended the request
+                self._circuit.release_probe()
+
+            # Full jitter: uniform in [0, min(cap, base * 2^attempt)]
+            delay = random.uniform(0, min(API_RETRY_MAX_SECONDS, API_RETRY_BASE_SECONDS * 2 ** attempt))
+            attempt += 1
+            _LOGGER.debug(f"Retrying {method} {url} in {delay:.1f}s (attempt {attempt + 1})")
+            await asyncio.sleep(delay)
 
+    @traced("http_request")
+    async def _request_once(self, method: str, url: str, with_headers: bool, all_metrics: tuple, **kwargs):
+        """Perform one request on the shared session and record its latency and outcome."""
+        session = self._get_session()
+        start = time.monotonic()
+        try:
+            async with async_timeout.timeout(API_REQUEST_TIMEOUT_SECONDS):
+                async with session.request(method, url, **kwargs) as resp:
+                    data = await resp.json() if resp.status == 200 else None
+                    result = (resp.status, data, resp.headers) if with_headers else (resp.status, data)
+        except asyncio.TimeoutError:
+            self._observe(all_metrics, method, url, start, timeout=True)
+            self._record(method, url, kwargs, start, None, None, "timeout")
+            raise
+        except Exception as err:
+            self._observe(all_metrics, method, url, start, error=True)
+            self._record(method, url, kwargs, start, None, None, type(err).__name__)
+            raise
+        self._observe(all_metrics, method, url, start, status=result[0])
+        self._record(method, url, kwargs, start, result[0], result[1])
+        return result
+
+    def _record(self, method: str, url: str, kwargs: dict, start: float, status, body, error: str = None):
+        if self._recorder is not None:
+            self._recorder.record(method, url, kwargs.get("json"), status, body, time.monotonic() - start, error)
+
+    def _observe(self, all_metrics: tuple, method: str, url: str, start: float, status: int = None,
+                 timeout: bool = False, error: bool = False):
+        elapsed = time.monotonic() - start
+        for metrics in all_metrics:
+            if timeout:
+                metrics.record_timeout(elapsed)
+            elif error:
+                metrics.record_error(elapsed)
+            else:
+                metrics.record_response(status, elapsed)
+        _LOGGER.debug(f"{method} {url} took {elapsed * 1000:.1f} ms (status {status})")
+
+    @traced("send_sensor_data")
     async def send_sensor_data(self, temp: float, outdoor_temp: float = None):
         """Sender temperatur og mottar kontroll-instruksjoner."""
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with async_timeout.timeout(10):
-                    payload = {
-                        "temperature": temp,
-                        "timestamp": int(time.time())
-                    }
-                    if outdoor_temp is not None:
-                        payload["outdoor_temp"] = outdoor_temp
-                    
-                    # Prepare headers with API key if available
-                    headers = {'Content-Type': 'application/json'}
-                    if self.api_key:
-                        headers['X-Heatly-User-API-Key'] = self.api_key
-                    
-                    async with session.post(f"{self.url}/sensor", json=payload, headers=headers) as resp:
-                        if resp.status == 200:
-                            return await resp.json()
-                        elif resp.status == 401 or resp.status == 403:
-                            _LOGGER.error(
-                                f"Authentication failed for room '{self.room_id}'. "
-                                f"Please check your API key. Status: {resp.status}"
-                            )
-                            return None
-                        elif resp.status == 404:
-                            _LOGGER.error(
-                                f"Room '{self.room_id}' not found in API. "
-                                f"Please ensure room exists in heatly-api database. "
-                                f"URL: {self.url}/sensor"
-                            )
-                            return None
-                        else:
-                            _LOGGER.warning(
-                                f"API returned status {resp.status} for room '{self.room_id}'. "
-                                f"URL: {self.url}/sensor"
-                            )
-                            return None
-            except asyncio.TimeoutError:
-                _LOGGER.error(f"API timeout for room {self.room_id}")
+        payload = {
+            "temperature": temp,
+            "timestamp": int(time.time())
+        }
+        if outdoor_temp is not None:
+            payload["outdoor_temp"] = outdoor_temp
+
+        if self._batcher is not None:
+            return await self._batcher.submit(self, payload)
+        return await self._post_sensor_payload(payload)
+
+    async def _post_sensor_payload(self, payload: dict):
+        """Send one room's reading to /api/room/{room_id}/sensor."""
+        try:
+            # Prepare headers with API key if available
+            headers = {'Content-Type': 'application/json'}
+            if self.api_key:
+                headers['X-Heatly-User-API-Key'] = self.api_key
+
+            status, data = await self._request("POST", f"{self.url}/sensor", json=payload, headers=headers)
+            if status == 200:
+                return data
+            elif status == 401 or status == 403:
+                _LOGGER.error(
+                    f"Authentication failed for room '{self.room_id}'. "
+                    f"Please check your API key. Status: {status}"
+                )
                 return None
-            except Exception as e:
-                _LOGGER.error(f"API error for room {self.room_id}: %s", e)
+            elif status == 404:
+                _LOGGER.error(
+                    f"Room '{self.room_id}' not found in API. "
+                    f"Please ensure room exists in heatly-api database. "
+                    f"URL: {self.url}/sensor"
+                )
                 return None
-
-    async def get_available_schedules(self):
-        """Fetch available schedules from API. Cached for 5 minutes."""
-        now = time.time()
-        if self._available_schedules and (now - self._last_schedule_fetch) < SCHEDULE_CACHE_SECONDS:
-            return self._available_schedules
-        
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with async_timeout.timeout(10):
-                    async with session.get(f"{self.base_url}/api/schedules") as resp:
-                        if resp.status == 200:
-                            data = await resp.json()
-                            schedules = data.get("schedules", {})
-                            if schedules:
-                                self._available_schedules = schedules
-                                self._last_schedule_fetch = now
-                                return self._available_schedules
-                            else:
-                                _LOGGER.warning("API returned empty schedules")
-                                return None
-                        else:
-                            _LOGGER.warning(f"Failed to fetch schedules: status {resp.status}")
-                            return None
-            except asyncio.TimeoutError:
-                _LOGGER.error("Timeout fetching schedules from API")
+            else:
+                _LOGGER.warning(
+                    f"API returned status {status} for room '{self.room_id}'. "
+                    f"URL: {self.url}/sensor"
+                )
                 return None
-            except Exception as e:
-                _LOGGER.error(f"Error fetching schedules: {e}")
+        except CircuitOpenError:
+            _LOGGER.debug(f"API circuit open - skipping upload for room {self.room_id}")
+            return None
+        except asyncio.TimeoutError:
+            _LOGGER.error(f"API timeout for room {self.room_id}")
+            return None
+        except Exception as e:
+            _LOGGER.error(f"API error for room {self.room_id}: %s", e)
+            return None
+
+    async def send_backfill(self, readings: list):
+        """Upload buffered readings in one request. Returns True on success, None if unsupported."""
+        headers = {'Content-Type': 'application/json'}
+        if self.api_key:
+            headers['X-Heatly-User-API-Key'] = self.api_key
+
+        try:
+            status, _ = await self._request(
+                "POST", f"{self.url}/sensor/backfill", json={"readings": readings}, headers=headers
+            )
+            if status == 200:
+                return True
+            elif status == 404 or status == 405:
+                _LOGGER.warning(
+                    f"API does not accept backfill for room '{self.room_id}' (status {status}). "
+                    f"URL: {self.url}/sensor/backfill"
+                )
                 return None
+            else:
+                _LOGGER.warning(f"Backfill for room '{self.room_id}' failed: status {status}")
+                return False
+        except CircuitOpenError:
+            return False
+        except asyncio.TimeoutError:
+            _LOGGER.error(f"Timeout uploading backfill for room {self.room_id}")
+            return False
+        except Exception as e:
+            _LOGGER.error(f"Error uploading backfill for room {self.room_id}: {e}")
+            return False
+
+    async def get_available_schedules(self):
+        """Fetch available schedules from API via the shared schedule cache."""
+        return await self._schedule_cache.async_get(self._get_session())
+
+    async def async_refresh_schedules(self):
+        """Fetch the schedules now, bypassing the cache age (e.g. after a push notice)."""
+        return await self._schedule_cache.async_refresh(self._get_session())
 
     async def update_room_schedule(self, schedule_name: str):
         """Update the active schedule for the room."""
@@ -101,33 +748,34 @@ class HeatlyApiClient:
                 f"schedule_name is {'None' if schedule_name is None else 'empty or whitespace'}"
             )
             return False
-            
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with async_timeout.timeout(10):
-                    payload = {"active_schedule": schedule_name.strip()}
-                    async with session.post(f"{self.url}/schedule", json=payload) as resp:
-                        if resp.status == 200:
-                            _LOGGER.info(
-                                f"Successfully updated schedule to '{schedule_name.strip()}' for room {self.room_id}"
-                            )
-                            return True
-                        elif resp.status == 404:
-                            _LOGGER.error(
-                                f"Room '{self.room_id}' not found when updating schedule. "
-                                f"Please ensure room exists in heatly-api database. "
-                                f"URL: {self.url}/schedule"
-                            )
-                            return False
-                        else:
-                            _LOGGER.warning(
-                                f"Failed to update schedule for room '{self.room_id}': status {resp.status}. "
-                                f"URL: {self.url}/schedule"
-                            )
-                            return False
-            except asyncio.TimeoutError:
-                _LOGGER.error(f"Timeout updating schedule for room {self.room_id}")
+
+        try:
+            payload = {"active_schedule": schedule_name.strip()}
+            status, _ = await self._request("POST", f"{self.url}/schedule", json=payload)
+            if status == 200:
+                _LOGGER.info(
+                    f"Successfully updated schedule to '{schedule_name.strip()}' for room {self.room_id}"
+                )
+                return True
+            elif status == 404:
+                _LOGGER.error(
+                    f"Room '{self.room_id}' not found when updating schedule. "
+                    f"Please ensure room exists in heatly-api database. "
+                    f"URL: {self.url}/schedule"
+                )
                 return False
-            except Exception as e:
-                _LOGGER.error(f"Error updating schedule for room {self.room_id}: {e}")
-                return False
\ No newline at end of file
+            else:
+                _LOGGER.warning(
+                    f"Failed to update schedule for room '{self.room_id}': status {status}. "
+                    f"URL: {self.url}/schedule"
+                )
+                return False
+        except CircuitOpenError:
+            _LOGGER.error(f"Cannot update schedule for room {self.room_id}: API is unreachable (circuit open)")
+            return False
+        except asyncio.TimeoutError:
+            _LOGGER.error(f"Timeout updating schedule for room {self.room_id}")
+            return False
+        except Exception as e:
+            _LOGGER.error(f"Error updating schedule for room {self.room_id}: {e}")
+            return False
@@ -0,0 +1,124 @@
+"""Offline buffer of sensor readings that could not be delivered to the API."""
+from array import array
+import base64
+import math
+
+from .const import OFFLINE_BUFFER_SIZE, BACKFILL_RESOLUTION_SECONDS
+
+_NAN = float("nan")
+
+
+def _encode(values: array) -> str:
+    return base64.b64encode(values.tobytes()).decode("ascii")
+
+
+def _decode(data: str) -> array:
+    values = array("d")
+    values.frombytes(base64.b64decode(data))
+    return values
+
+
+class ReadingBuffer:
+    """Bounded ring buffer of (timestamp, indoor, outdoor) samples.
+
+    Backed by three fixed-size float arrays (8 bytes per value, no per-sample
+    objects); a missing outdoor temperature is stored as NaN. When full, the
+    oldest sample is overwritten.
+    """
+
+    def __init__(self, capacity: int = OFFLINE_BUFFER_SIZE):
+        self.capacity = capacity
+        self._timestamps = array("d", [0.0]) * capacity
+        self._indoor = array("d", [0.0]) * capacity
+        self._outdoor = array("d", [0.0]) * capacity
+        self._start = 0
+        self._len = 0
+        self.dropped = 0  # Samples overwritten because the buffer was full
+
+    def __len__(self) -> int:
+        return self._len
+
+    def append(self, timestamp: float, indoor: float, outdoor: float = None):
+        if self._len == self.capacity:
+            self._start = (self._start + 1) % self.capacity
+            self._len -= 1
+            self.dropped += 1
+        idx = (self._start + self._len) % self.capacity
+        self._timestamps[idx] = timestamp
+        self._indoor[idx] = indoor
+        self._outdoor[idx] = _NAN if outdoor is None else outdoor
+        self._len += 1
+
+    def __iter__(self):
+        """Samples oldest first, as (timestamp, indoor, outdoor-or-None)."""
+        for i in range(self._len):
+            idx = (self._start + i) % self.capacity
+            outdoor = self._outdoor[idx]
+            yield self._timestamps[idx], self._indoor[idx], None if math.isnan(outdoor) else outdoor
+
+    def drop_oldest(self, count: int):
+        count = min(count, self._len)
+        self._start = (self._start + count) % self.capacity
+        self._len -= count
+
+    def clear(self):
+        self._start = 0
+        self._len = 0
+
+    def downsample(self, resolution: float = BACKFILL_RESOLUTION_SECONDS):
+        """Average the samples into fixed time buckets.
+
+        Returns a list of (reading_dict, sample_count), oldest first. The sample
+        counts let the caller drop exactly the raw samples that were uploaded.
+        """
+        buckets = []
+        current = None
+        for timestamp, indoor, outdoor in self:
+            bucket = int(timestamp // resolution)
+            if current is None or current[0] != bucket:
+                current = [bucket, 0, 0.0, 0.0, 0, timestamp]
+                buckets.append(current)
+            current[1] += 1
+            current[2] += indoor
+            if outdoor is not None:
+                current[3] += outdoor
+                current[4] += 1
+            current[5] = timestamp
+
+        points = []
+        for _, count, indoor_sum, outdoor_sum, outdoor_count, last_timestamp in buckets:
+            reading = {
+                "timestamp": int(last_timestamp),
+                "temperature": round(indoor_sum / count, 2),
+            }
+            if outdoor_count:
+                reading["outdoor_temp"] = round(outdoor_sum / outdoor_count, 2)
+            points.append((reading, count))
+        return points
+
+    def as_dict(self) -> dict:
+        """Compact, JSON-serialisable form for HA storage (oldest first)."""
+        timestamps, indoor, outdoor = array("d"), array("d"), array("d")
+        for i in range(self._len):
+            idx = (self._start + i) % self.capacity
+            timestamps.append(self._timestamps[idx])
+            indoor.append(self._indoor[idx])
+            outdoor.append(self._outdoor[idx])
+        return {
+            "timestamps": _encode(timestamps),
+            "indoor": _encode(indoor),
+            "outdoor": _encode(outdoor),
+        }
+
+    def load_dict(self, data: dict):
+        """Restore samples saved by as_dict, keeping the newest if over capacity."""
+        self.clear()
+        try:
+            timestamps = _decode(data["timestamps"])
+            indoor = _decode(data["indoor"])
+            outdoor = _decode(data["outdoor"])
+        except (KeyError, TypeError, ValueError):
+            return
+        for timestamp, temp, out in zip(timestamps, indoor, outdoor):
+            self.append(timestamp, temp, None if math.isnan(out) else out)
+        self.dropped = 0
@@ -2,18 +2,36 @@ from homeassistant.components.climate import ClimateEntity, ClimateEntityFeature
 from homeassistant.const import UnitOfTemperature, ATTR_TEMPERATURE
 from homeassistant.helpers.restore_state import RestoreEntity
 from .const import (
-    DOMAIN, CONF_TEMP_SENSOR, CONF_HEATER_SWITCH, CONF_HEATER_SWITCHES,
-    CONF_COLD_TOLERANCE, CONF_HOT_TOLERANCE, DEFAULT_COLD_TOLERANCE, 
-    DEFAULT_HOT_TOLERANCE, MIN_SWITCH_INTERVAL_SECONDS
+    DOMAIN, CONF_TEMP_SENSOR, CONF_HEATER_SWITCH, CONF_HEATER_SWITCHES, CONF_OUTDOOR_SENSOR,
+    CONF_COLD_TOLERANCE, CONF_HOT_TOLERANCE, CONF_HEATER_WATTS, CONF_PRIORITY,
+    DEFAULT_HEATER_WATTS, DEFAULT_ROOM_PRIORITY, DATA_HEATER_DISPATCHER, DEFAULT_COLD_TOLERANCE, 
+    DEFAULT_HOT_TOLERANCE, MIN_SWITCH_INTERVAL_SECONDS, PLAN_POLL_INTERVAL_SECONDS,
+    STATE_ATTRIBUTE_DEADBANDS, HEAT_MODEL_ENABLED, HEAT_MODEL_HORIZON_SECONDS
 )
+from .control import hysteresis_step
+from .heaters import async_set_heaters
+from .metrics import RoomMetrics
+from .sensor_cache import SensorCache
+from .tracing import traced
+from .trajectory import TrajectoryPlan
 import logging
 import time
 
 _LOGGER = logging.getLogger(__name__)
 
+# Extra attributes published in every control mode (None where a mode has no value), so switching
+# between smart, plan, failsafe and local control never changes the attribute layout by itself
+ATTRIBUTE_KEYS = (
+    "control_mode", "heater_state", "api_available", "api_circuit",
+    "trajectory_points", "prediction_age", "plan_valid_until",
+    "target_temperature", "cold_threshold", "hot_threshold", "time_since_last_switch",
+    "predicted_low", "predicted_peak",
+)
+
 async def async_setup_entry(hass, entry, async_add_entities):
     """Kalles automatisk av __init__.py for å lage termostaten."""
-    config = entry.data
+    # Options (set via Configure) take precedence over the original setup data
+    config = {**entry.data, **entry.options}
     entry_id = entry.entry_id
     
     # Hent API-klienten som __init__.py lagret
@@ -32,10 +50,15 @@ async def async_setup_entry(hass, entry, async_add_entities):
 class HeatlyThermostat(ClimateEntity, RestoreEntity):
     """Hybrid thermostat that can operate in Smart (AUTO) or Dumb (HEAT) mode."""
 
+    # The hub and the room's update loop drive this entity - no platform polling
+    _attr_should_poll = False
+
     def __init__(self, hass, api_client, config, entry_id):
         self.hass = hass
         self._api = api_client
         self._sensor_id = config[CONF_TEMP_SENSOR]
+        self._outdoor_sensor_id = config.get(CONF_OUTDOOR_SENSOR)
+        self._sensors = SensorCache(hass, [self._sensor_id, self._outdoor_sensor_id])
         
         # Support multiple heaters - backward compatible with single heater
         if CONF_HEATER_SWITCHES in config:
@@ -51,6 +74,10 @@ class HeatlyThermostat(ClimateEntity, RestoreEntity):
         self._cold_tolerance = config.get(CONF_COLD_TOLERANCE, DEFAULT_COLD_TOLERANCE)
         self._hot_tolerance = config.get(CONF_HOT_TOLERANCE, DEFAULT_HOT_TOLERANCE)
         
+        # Whole-house dispatch: power drawn when this room heats, and who goes first
+        self._heater_watts = config.get(CONF_HEATER_WATTS, DEFAULT_HEATER_WATTS) * len(self._heater_ids)
+        self._priority = config.get(CONF_PRIORITY, DEFAULT_ROOM_PRIORITY)
+        
         self._attr_name = f"Heatly {config.get('room_id', 'Unknown')}"
         self._attr_unique_id = f"heatly_{config.get('room_id', 'unknown')}"
         
@@ -70,7 +97,7 @@ class HeatlyThermostat(ClimateEntity, RestoreEntity):
         self._attr_hvac_mode = HVACMode.AUTO  # Default to smart mode
         self._attr_preset_mode = None
         self._attr_preset_modes = []  # Will be populated from API
-        self._attr_extra_state_attributes = {}
+        self._attr_extra_state_attributes = dict.fromkeys(ATTRIBUTE_KEYS)
         
         # State for local controller
         self._local_heater_state = False
@@ -78,11 +105,23 @@ class HeatlyThermostat(ClimateEntity, RestoreEntity):
         self._last_api_success = None
         self._last_switch_time = 0  # Prevent rapid switching
         self._last_commanded_state = None  # Track last command sent to heaters
+        self._plan = None  # Latest API trajectory, executed locally between/without API responses
+        self._prediction_age = None  # prediction_age_seconds from the latest API response
+        self._heater_errors = {}  # entity_id -> last error when commanding that heater
+        self.metrics = RoomMetrics()
+        
+        # Last published state, used to skip writes when nothing meaningful changed
+        self._published_state = None
+        self._published_attributes = None
+        self._suppressed_writes = 0
 
     async def async_added_to_hass(self):
         """Restore state when entity is added to hass."""
         await super().async_added_to_hass()
         
+        # Subscribe to our sensors once - values are parsed on change, not on every read
+        self.async_on_remove(self._sensors.async_start())
+        
         # Restore previous state
         last_state = await self.async_get_last_state()
         if last_state is not None:
@@ -104,19 +143,60 @@ class HeatlyThermostat(ClimateEntity, RestoreEntity):
                 f"preset={self._attr_preset_mode}"
             )
         
-        # Fetch available schedules from API to populate preset modes
+        # Presets and the last plan from storage first - the API may be slow or down at boot
+        room = self._room
+        if room is not None:
+            if room.cached_presets:
+                self._attr_preset_modes = list(room.cached_presets)
+            if room.cached_response:
+                self._restore_response(*room.cached_response)
+        
+        # Fetch available schedules from API in the background; the entity updates when they land
+        refresh = self.hass.async_create_background_task(
+            self.async_refresh_presets(), f"heatly_presets_{self._entry_id}"
+        )
+        self.async_on_remove(refresh.cancel)
+
+    async def async_refresh_presets(self):
+        """Load the preset list from the (cached) API schedules.
+
+        Keeps the current (possibly restored) list if the API has nothing to offer.
+        """
         try:
             schedules = await self._api.get_available_schedules()
             if schedules:
                 self._attr_preset_modes = list(schedules.keys())
                 _LOGGER.info(f"Loaded {len(self._attr_preset_modes)} schedule presets")
+                room = self._room
+                if room is not None:
+                    room.remember_presets(self._attr_preset_modes)
+            elif self._attr_preset_modes:
+                _LOGGER.warning("No schedules available from API - keeping the stored preset list")
             else:
                 _LOGGER.warning("No schedules available from API - preset modes will be empty")
-                self._attr_preset_modes = []
         except Exception as e:
             _LOGGER.warning(f"Could not load schedules from API: {e}. Preset modes will be unavailable.")
-            self._attr_preset_modes = []
+        self._async_write_state_if_changed()
 
+    def _restore_response(self, received_at: float, response: dict):
+        """Take over the plan from a stored response; an expired plan is simply dropped."""
+        plan = TrajectoryPlan.from_response(response, received_at)
+        if plan is None or not plan.is_valid():
+            return
+        self._plan = plan
+        self._prediction_age = response.get("prediction_age_seconds")
+        self._last_api_success = received_at
+        self._set_attributes(**self._response_attributes(response))
+        _LOGGER.debug(f"{self._attr_name}: restored plan valid until {int(plan.expires_at)}")
+
+    def apply_remote_schedule(self, schedule_name: str):
+        """Reflect a schedule change made elsewhere (pushed by the API) without calling back."""
+        if not schedule_name or schedule_name == self._attr_preset_mode:
+            return
+        self._attr_preset_mode = schedule_name
+        self._async_write_state_if_changed()
+
+    @traced("update_from_response")
     async def update_from_response(self, response):
         """Mottar ordre fra API (via __init__.py) - only used in AUTO mode."""
         if not response:
@@ -126,30 +206,167 @@ class HeatlyThermostat(ClimateEntity, RestoreEntity):
         try:
             self._api_available = True
             self._last_api_success = time.time()
+            self.metrics.record_response(self._last_api_success)
             
             heater_state = response.get("heater_state", "off")
+            self._prediction_age = response.get("prediction_age_seconds")
+            self._plan = TrajectoryPlan.from_response(response, self._last_api_success)
             
             # Only apply API commands if in AUTO mode
             if self._attr_hvac_mode == HVACMode.AUTO:
                 await self._set_heater_state(heater_state == "on")
             
-            self._attr_extra_state_attributes = {
-                "trajectory": response.get("trajectory", []),
-                "strategy": response.get("strategy", {}),
-                "prediction_age": response.get("prediction_age_seconds", 0),
-                "control_mode": "smart" if self._attr_hvac_mode == HVACMode.AUTO else "local",
-                "api_available": self._api_available
-            }
-            self.async_write_ha_state()
+            # Trajectory and strategy go to the (unrecorded) forecast sensor, only when changed
+            self._publish_forecast(response.get("trajectory", []), response.get("strategy", {}))
+            
+            room = self._room
+            if room is not None:
+                room.remember_response(response, self._last_api_success)
+            
+            self._set_attributes(**self._response_attributes(response))
+            self._async_write_state_if_changed()
         except Exception as e:
             _LOGGER.error(f"Feil i termostat oppdatering: {e}")
             self._api_available = False
 
+    def _response_attributes(self, response: dict) -> dict:
+        """Summary attributes for the latest control response."""
+        return {
+            "trajectory_points": len(response.get("trajectory") or []),
+            "prediction_age": response.get("prediction_age_seconds", 0),
+            "control_mode": "smart" if self._attr_hvac_mode == HVACMode.AUTO else "local",
+            "heater_state": "on" if self._local_heater_state else "off",
+            "api_available": self._api_available,
+            "api_circuit": self._api.circuit_state,
+            "plan_valid_until": int(self._plan.expires_at) if self._plan else None
+        }
+
+    def _set_attributes(self, **values):
+        """Replace the extra attributes; keys of ATTRIBUTE_KEYS not given are published as None."""
+        self._attr_extra_state_attributes = {key: values.get(key) for key in ATTRIBUTE_KEYS}
+
+    @property
+    def hysteresis_thresholds(self):
+        """(cold, hot) switching thresholds around the target temperature."""
+        target = self._attr_target_temperature
+        return target - self._cold_tolerance, target + self._hot_tolerance
+
+    @property
+    def prediction_age(self):
+        """Age in seconds of the latest API prediction right now, or None if unknown."""
+        if self._prediction_age is None or self._last_api_success is None:
+            return None
+        try:
+            return float(self._prediction_age) + (time.time() - self._last_api_success)
+        except (TypeError, ValueError):
+            return None
+
+    @property
+    def has_valid_plan(self) -> bool:
+        """True while the latest API trajectory still covers the current time."""
+        return self._plan is not None and self._plan.is_valid()
+
+    def can_skip_api_poll(self) -> bool:
+        """True if a valid plan is in hand and the API was reached recently enough."""
+        return (
+            self.has_valid_plan
+            and self._last_api_success is not None
+            and time.time() - self._last_api_success < PLAN_POLL_INTERVAL_SECONDS
+        )
+
+    @traced("run_without_api")
+    async def async_run_without_api(self, api_failed: bool = True):
+        """AUTO mode without a fresh API response: follow the plan, else local failsafe.
+
+        Heater on/off follows the planned trajectory until it expires; only then
+        does the local hysteresis controller take over.
+        """
+        if api_failed:
+            self._api_available = False
+        if self._attr_hvac_mode != HVACMode.AUTO:
+            return
+
+        planned_state = self._plan.heater_state_at() if self._plan else None
+        if planned_state is not None:
+            await self._set_heater_state(planned_state)
+            self._attr_extra_state_attributes["control_mode"] = "plan"
+            self._attr_extra_state_attributes["heater_state"] = "on" if planned_state else "off"
+        else:
+            current_temp = self.current_temperature
+            if current_temp is None:
+                return
+            if self._plan is not None:
+                _LOGGER.warning(f"{self._attr_name}: API plan expired - falling back to local control")
+                self._plan = None
+            self.metrics.set_failsafe(True)
+            await self._run_local_controller(current_temp)
+            self._attr_extra_state_attributes["control_mode"] = "failsafe"
+
+        self._attr_extra_state_attributes["api_available"] = self._api_available
+        self._attr_extra_state_attributes["api_circuit"] = self._api.circuit_state
+        self._async_write_state_if_changed()
+
+    def _state_snapshot(self) -> tuple:
+        """Compact tuple of everything in the published state except the extra attributes."""
+        return (
+            self._attr_hvac_mode,
+            self._attr_target_temperature,
+            self._attr_preset_mode,
+            tuple(self._attr_preset_modes or ()),
+            self.current_temperature,
+        )
+
+    def _attributes_changed(self, attributes: dict) -> bool:
+        """Compare extra attributes against the published ones, honouring numeric dead-bands."""
+        published = self._published_attributes
+        if published is None or attributes.keys() != published.keys():
+            return True
+        for key, value in attributes.items():
+            old = published[key]
+            if value == old:
+                continue
+            deadband = STATE_ATTRIBUTE_DEADBANDS.get(key)
+            if (
+                deadband is not None
+                and isinstance(value, (int, float))
+                and isinstance(old, (int, float))
+                and abs(value - old) < deadband
+            ):
+                continue
+            return True
+        return False
+
+    def _async_write_state_if_changed(self) -> bool:
+        """Write HA state only if the state or attributes changed meaningfully."""
+        snapshot = self._state_snapshot()
+        if snapshot == self._published_state and not self._attributes_changed(self._attr_extra_state_attributes):
+            self._suppressed_writes += 1
+            return False
+
+        self._published_state = snapshot
+        self._published_attributes = dict(self._attr_extra_state_attributes)
+        self.async_write_ha_state()
+        return True
+
+    @property
+    def suppressed_writes(self) -> int:
+        """Number of state writes skipped because nothing meaningful changed."""
+        return self._suppressed_writes
+
+    def _publish_forecast(self, trajectory, strategy):
+        """Hand the full plan to this room's forecast sensor, if it is set up."""
+        data_store = self.hass.data.get(DOMAIN, {}).get(self._entry_id) or {}
+        forecast = data_store.get("forecast")
+        if forecast is not None and forecast.update_forecast(trajectory, strategy):
+            _LOGGER.debug(f"{self._attr_name}: new plan published ({len(trajectory or [])} points)")
+
+    @traced("local_update")
     async def async_update(self):
         """Periodic update - implements the control logic fork."""
         current_temp = self.current_temperature
         
         if current_temp is None:
+            await self.async_handle_missing_temperature()
             return
         
         # Branch based on HVAC mode
@@ -165,68 +382,111 @@ class HeatlyThermostat(ClimateEntity, RestoreEntity):
             if self._local_heater_state:
                 await self._set_heater_state(False)
         
-        self.async_write_ha_state()
+        self._async_write_state_if_changed()
+
+    async def async_handle_missing_temperature(self):
+        """No usable temperature (sensor unavailable or stale): don't keep heating blind."""
+        if not self._local_heater_state:
+            return
+        _LOGGER.warning(f"{self._attr_name}: no valid temperature from {self._sensor_id} - turning heaters off")
+        await self._set_heater_state(False)
+        self._last_switch_time = time.time()
+        self._attr_extra_state_attributes["heater_state"] = "off"
+        self._async_write_state_if_changed()
+
+    @property
+    def sensor_stale(self) -> bool:
+        """True if the temperature sensor has not updated for SENSOR_STALE_SECONDS."""
+        return self._sensors.is_stale(self._sensor_id)
+
+    @property
+    def heater_on(self) -> bool:
+        """Last heater state commanded by this thermostat."""
+        return self._local_heater_state
+
+    @property
+    def _room(self):
+        """The HeatlyRoom set up for this entry in __init__.py."""
+        data_store = self.hass.data.get(DOMAIN, {}).get(self._entry_id) or {}
+        return data_store.get("room")
+
+    @property
+    def _thermal_model(self):
+        """The room's learned thermal model, if it has enough data to be trusted."""
+        if not HEAT_MODEL_ENABLED:
+            return None
+        room = self._room
+        if room is None or not room.thermal_model.is_ready:
+            return None
+        return room.thermal_model
 
     async def _run_local_controller(self, current_temp: float):
-        """Run local bang-bang controller with hysteresis."""
+        """Run local bang-bang controller with hysteresis.
+
+        With a trained thermal model the decision uses where the temperature is
+        heading instead of where it is: the heater goes off once the expected
+        overshoot after switching off reaches the hot threshold, and on once the
+        room is expected to cool to the cold threshold within the horizon.
+        Never switches later than plain hysteresis would.
+        """
         target = self._attr_target_temperature
         
         # Prevent rapid switching - enforce minimum time between state changes
         now = time.time()
         time_since_last_switch = now - self._last_switch_time
         
+        decision_temp = current_temp
+        predicted = None
+        model = self._thermal_model
+        if model is not None:
+            predicted = model.coast_range(current_temp, self.outdoor_temperature, HEAT_MODEL_HORIZON_SECONDS)
+            decision_temp = max(current_temp, predicted[1]) if self._local_heater_state else min(current_temp, predicted[0])
+        
         # Hysteresis logic to prevent short cycling
-        should_turn_on = current_temp <= target - self._cold_tolerance
-        should_turn_off = current_temp >= target + self._hot_tolerance
+        should_turn_on = decision_temp <= target - self._cold_tolerance
+        should_turn_off = decision_temp >= target + self._hot_tolerance
+        new_state = bool(hysteresis_step(
+            decision_temp, target, self._cold_tolerance, self._hot_tolerance,
+            self._local_heater_state, time_since_last_switch, MIN_SWITCH_INTERVAL_SECONDS
+        ))
         
-        if should_turn_on and not self._local_heater_state:
-            # Too cold - turn on heater (if minimum interval has passed)
-            if time_since_last_switch >= MIN_SWITCH_INTERVAL_SECONDS:
-                _LOGGER.debug(
-                    f"Local controller: turning ON (temp={current_temp:.1f}°C, "
-                    f"target={target:.1f}°C, threshold={target - self._cold_tolerance:.1f}°C)"
-                )
-                await self._set_heater_state(True)
-                self._last_switch_time = now
-            else:
-                _LOGGER.debug(
-                    f"Local controller: delaying turn ON for {MIN_SWITCH_INTERVAL_SECONDS - time_since_last_switch:.0f}s "
-                    f"to prevent rapid cycling"
-                )
-        elif should_turn_off and self._local_heater_state:
-            # Too hot - turn off heater (if minimum interval has passed)
-            if time_since_last_switch >= MIN_SWITCH_INTERVAL_SECONDS:
-                _LOGGER.debug(
-                    f"Local controller: turning OFF (temp={current_temp:.1f}°C, "
-                    f"target={target:.1f}°C, threshold={target + self._hot_tolerance:.1f}°C)"
-                )
-                await self._set_heater_state(False)
-                self._last_switch_time = now
-            else:
-                _LOGGER.debug(
-                    f"Local controller: delaying turn OFF for {MIN_SWITCH_INTERVAL_SECONDS - time_since_last_switch:.0f}s "
-                    f"to prevent rapid cycling"
-                )
+        if new_state != self._local_heater_state:
+            threshold = target - self._cold_tolerance if new_state else target + self._hot_tolerance
+            _LOGGER.debug(
+                f"Local controller: turning {'ON' if new_state else 'OFF'} (temp={current_temp:.1f}°C, "
+                f"expected={decision_temp:.1f}°C, target={target:.1f}°C, threshold={threshold:.1f}°C)"
+            )
+            await self._set_heater_state(new_state)
+            self._last_switch_time = now
+        elif (should_turn_on and not self._local_heater_state) or (should_turn_off and self._local_heater_state):
+            # Too cold/hot, but the minimum interval since the last switch has not passed
+            _LOGGER.debug(
+                f"Local controller: delaying turn {'ON' if should_turn_on else 'OFF'} for "
+                f"{MIN_SWITCH_INTERVAL_SECONDS - time_since_last_switch:.0f}s to prevent rapid cycling"
+            )
         # else: within deadband, maintain current state
         
-        self._attr_extra_state_attributes = {
-            "control_mode": "local",
-            "target_temperature": target,
-            "cold_threshold": target - self._cold_tolerance,
-            "hot_threshold": target + self._hot_tolerance,
-            "heater_state": "on" if self._local_heater_state else "off",
-            "time_since_last_switch": int(time_since_last_switch)
-        }
+        self._set_attributes(
+            control_mode="local",
+            target_temperature=target,
+            cold_threshold=target - self._cold_tolerance,
+            hot_threshold=target + self._hot_tolerance,
+            heater_state="on" if self._local_heater_state else "off",
+            time_since_last_switch=int(time_since_last_switch),
+            predicted_low=round(predicted[0], 1) if predicted is not None else None,
+            predicted_peak=round(predicted[1], 1) if predicted is not None else None,
+        )
 
     @property
     def current_temperature(self):
-        state = self.hass.states.get(self._sensor_id)
-        if state and state.state not in ["unknown", "unavailable", None]:
-            try:
-                return float(state.state)
-            except ValueError:
-                pass
-        return None
+        return self._sensors.get(self._sensor_id)
+
+    @property
+    def outdoor_temperature(self):
+        """Cached outdoor temperature, or None if not configured or unavailable."""
+        if not self._outdoor_sensor_id:
+            return None
+        return self._sensors.get(self._outdoor_sensor_id)
 
     async def async_set_temperature(self, **kwargs):
         """Set target temperature."""
@@ -240,7 +500,7 @@ class HeatlyThermostat(ClimateEntity, RestoreEntity):
                 if current_temp is not None:
                     await self._run_local_controller(current_temp)
             
-            self.async_write_ha_state()
+            self._async_write_state_if_changed()
 
     async def async_set_hvac_mode(self, hvac_mode):
         """Set HVAC mode - switching between Smart (AUTO) and Local (HEAT) control."""
@@ -248,6 +508,9 @@ class HeatlyThermostat(ClimateEntity, RestoreEntity):
         self._attr_hvac_mode = hvac_mode
         
         _LOGGER.info(f"HVAC mode changed from {old_mode} to {hvac_mode}")
+        if hvac_mode != HVACMode.AUTO:
+            # Failsafe only exists in AUTO mode
+            self.metrics.set_failsafe(False)
         
         if hvac_mode == HVACMode.OFF:
             # Turn off all heaters
@@ -261,7 +524,7 @@ class HeatlyThermostat(ClimateEntity, RestoreEntity):
             # Switch to smart mode - will be controlled by API
             _LOGGER.info("Switched to AUTO mode - waiting for API control")
         
-        self.async_write_ha_state()
+        self._async_write_state_if_changed()
 
     async def async_set_preset_mode(self, preset_mode: str):
         """Set preset mode (schedule selection)."""
@@ -278,8 +541,9 @@ class HeatlyThermostat(ClimateEntity, RestoreEntity):
         else:
             _LOGGER.error(f"Failed to update schedule to {preset_mode}")
         
-        self.async_write_ha_state()
+        self._async_write_state_if_changed()
 
+    @traced("set_heater_state")
     async def _set_heater_state(self, state: bool):
         """Set heater state for all configured heaters. Only sends commands if state changes."""
         # Check if state actually changed before sending commands
@@ -289,29 +553,44 @@ class HeatlyThermostat(ClimateEntity, RestoreEntity):
         
         self._local_heater_state = state
         self._last_commanded_state = state
+        self.metrics.record_switch()
         
+        # Én service call per domene, alle grupper samtidig - påslag køes av dispatcheren ved behov
+        dispatcher = self.hass.data.get(DATA_HEATER_DISPATCHER)
+        if dispatcher is None:
+            self._record_heater_errors(await async_set_heaters(self.hass, self._heater_ids, state))
+        else:
+            await dispatcher.async_request(
+                self._entry_id, self._heater_ids, state,
+                watts=self._heater_watts,
+                priority=self._priority,
+                deficit_fn=self._comfort_deficit,
+                on_done=self._record_heater_errors
+            )
+
+    def _comfort_deficit(self):
+        """Degrees below target right now (negative when above), or None if unknown."""
+        current_temp = self.current_temperature
+        if current_temp is None or self._attr_target_temperature is None:
+            return None
+        return self._attr_target_temperature - current_temp
+
+    def _record_heater_errors(self, errors: dict):
         for heater_id in self._heater_ids:
-            domain = heater_id.split(".")[0]
-            try:
-                if domain == "climate":
-                    # Climate entities use set_hvac_mode instead of turn_on/turn_off
-                    hvac_mode = "heat" if state else "off"
-                    await self.hass.services.async_call(
-                        "climate",
-                        "set_hvac_mode",
-                        {"entity_id": heater_id, "hvac_mode": hvac_mode},
-                        blocking=False
-                    )
-                    _LOGGER.info(f"Set {heater_id} to hvac_mode={hvac_mode}")
-                else:
-                    # Switch, input_boolean, light use turn_on/turn_off
-                    service = "turn_on" if state else "turn_off"
-                    await self.hass.services.async_call(
-                        domain, 
-                        service, 
-                        {"entity_id": heater_id},
-                        blocking=False
-                    )
-                    _LOGGER.info(f"Called {service} on {heater_id}")
-            except Exception as e:
-                _LOGGER.error(f"Failed to control {heater_id}: {e}")
\ No newline at end of file
+            if heater_id in errors:
+                self._heater_errors[heater_id] = errors[heater_id]
+            else:
+                self._heater_errors.pop(heater_id, None)
+
+    @property
+    def heater_errors(self) -> dict:
+        """Last error per heater entity that failed to switch."""
+        return dict(self._heater_errors)
+
+    @property
+    def heater_drift(self) -> dict:
+        """Times each of this room's heaters was found out of step with its last command."""
+        dispatcher = self.hass.data.get(DATA_HEATER_DISPATCHER)
+        if dispatcher is None:
+            return {}
+        return {heater_id: dispatcher.drift_counts.get(heater_id, 0) for heater_id in self._heater_ids}
@@ -0,0 +1,67 @@
+"""Single-flight coalescing of sensor-triggered API calls."""
+import asyncio
+import logging
+
+from .const import SENSOR_DEBOUNCE_SECONDS
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class SingleFlightDebouncer:
+    """Run an async job with at most one call in flight.
+
+    Triggers that arrive while the job is running are coalesced into a single
+    trailing run, started after a short debounce once the current run finishes.
+    The job reads the sensors itself, so the trailing run always sends the
+    newest reading.
+    """
+
+    def __init__(self, job, name: str = "", debounce_seconds: float = SENSOR_DEBOUNCE_SECONDS):
+        self._job = job
+        self._name = name
+        self._debounce_seconds = debounce_seconds
+        self._running = False
+        self._pending = False
+
+        # Counters
+        self.triggered = 0
+        self.executed = 0
+        self.coalesced = 0
+
+    @property
+    def in_flight(self) -> bool:
+        return self._running
+
+    async def async_trigger(self):
+        """Run the job now, or mark a trailing run if one is already in flight."""
+        self.triggered += 1
+        if self._running:
+            # Folded into the trailing run instead of starting its own request
+            self.coalesced += 1
+            self._pending = True
+            return
+
+        self._running = True
+        try:
+            while True:
+                self._pending = False
+                try:
+                    await self._job()
+                except Exception as e:
+                    _LOGGER.error(f"Update for {self._name} failed: {e}")
+                self.executed += 1
+
+                if not self._pending:
+                    break
+                # Trailing edge: let a burst of sensor events settle before sending again
+                if self._debounce_seconds:
+                    await asyncio.sleep(self._debounce_seconds)
+        finally:
+            self._running = False
+
+    def as_dict(self) -> dict:
+        return {
+            "triggered": self.triggered,
+            "executed": self.executed,
+            "coalesced": self.coalesced,
+        }
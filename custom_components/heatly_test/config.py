@@ -6,10 +6,108 @@ This makes it easier to adjust parameters during pilot testing.
 """
 
 # Scan and Schedule Configuration
-SCAN_INTERVAL_SECONDS = 60  # Send sensor data every 60 seconds
-SCHEDULE_CACHE_SECONDS = 600  # 10 minutes - cache schedules from API
+SCAN_INTERVAL_SECONDS = 60  # Base poll interval; adapted per room between the POLL_* bounds below
+SCHEDULE_CACHE_SECONDS = 600  # 10 minutes - serve cached schedules, then revalidate in the background
 MIN_SWITCH_INTERVAL_SECONDS = 60  # Minimum time between heater state changes
 
+# API Connection Configuration
+API_REQUEST_TIMEOUT_SECONDS = 10  # Timeout for a single API request
+API_CONNECTION_LIMIT = 100  # Max open connections in the shared pool (per API URL)
+API_CONNECTION_LIMIT_PER_HOST = 20  # Max open connections to a single API host
+API_KEEPALIVE_SECONDS = 120  # Keep idle connections open this long for reuse
+API_RETRY_ATTEMPTS = 2  # Extra attempts for timeouts, connection errors and 429/502/503/504
+API_RETRY_BASE_SECONDS = 1.0  # Backoff before the first retry; doubles per attempt (with full jitter)
+API_RETRY_MAX_SECONDS = 8.0  # Cap on a single backoff delay
+CIRCUIT_FAILURE_THRESHOLD = 5  # Consecutive failures before the API host's circuit opens
+CIRCUIT_RESET_SECONDS = 120  # Fail fast this long, then let one probe request through (half-open)
+
+# API Traffic Recording (for benchmarks/replay.py)
+API_RECORD_FILE = None  # File name in the HA config dir, e.g. "heatly_traffic.jsonl" (None = off)
+API_RECORD_MAX_BYTES = 5_000_000  # Rotate the recording when it reaches this size
+API_RECORD_BACKUPS = 3  # Rotated files kept (file.1 ... file.3); older ones are deleted
+API_RECORD_FLUSH_SECONDS = 5  # Buffer records this long before appending them to the file
+
+# Batched Sensor Upload Configuration
+BATCH_SENSOR_UPLOADS = True  # Send readings for all rooms on the same API URL/key in one request
+BATCH_WINDOW_SECONDS = 1.0  # Collect readings this long before sending a batch
+
+# Sensor Event Coalescing
+SENSOR_DEBOUNCE_SECONDS = 2.0  # Wait this long before the trailing update after a burst of sensor events
+
+# Push Channel (server-sent events)
+PUSH_ENABLED = True  # Listen for control commands on GET /api/stream; polling continues as fallback
+PUSH_IDLE_TIMEOUT_SECONDS = 90  # A stream with no data or heartbeat for this long is reconnected
+PUSH_RECONNECT_MIN_SECONDS = 5  # Minimum wait before reconnecting a dropped stream
+PUSH_RECONNECT_MAX_SECONDS = 300  # Cap on the jittered exponential reconnect backoff
+
+# Local Trajectory Execution (AUTO mode)
+PLAN_MAX_AGE_SECONDS = 1800  # Follow the API's planned trajectory locally for at most 30 minutes
+PLAN_POLL_INTERVAL_SECONDS = 180  # While a valid plan is in hand, poll the API only this often
+
+# Adaptive Polling Configuration
+POLL_MIN_INTERVAL_SECONDS = 20  # Poll at least this far apart, even near a threshold
+POLL_MAX_INTERVAL_SECONDS = 300  # Poll at least this often, even when the temperature is flat
+POLL_SLOPE_WINDOW = 10  # Number of recent readings used to estimate the temperature slope
+POLL_STALE_PREDICTION_SECONDS = 600  # API prediction older than this - fall back to SCAN_INTERVAL_SECONDS
+
+# Significance-Based Reporting (AUTO mode)
+REPORT_SIGNIFICANT_ONLY = True  # Skip uploads that carry no new information (see below)
+REPORT_TEMP_DEADBAND = 0.2  # °C change in indoor temperature since the last upload that triggers a new one
+REPORT_OUTDOOR_DEADBAND = 1.0  # °C change in outdoor temperature that triggers an upload
+REPORT_HEARTBEAT_SECONDS = 300  # Upload at least this often, even if nothing changed
+
+# Offline Buffer Configuration
+OFFLINE_BUFFER_SIZE = 2880  # Readings kept per room while the API is unreachable (48 h at one per minute)
+OFFLINE_BUFFER_SAVE_INTERVAL_SECONDS = 60  # Write the buffer to HA storage at most this often while it changes
+BACKFILL_RESOLUTION_SECONDS = 300  # Downsample buffered readings to 5-minute averages before upload
+BACKFILL_CHUNK_SIZE = 288  # Readings per backfill request (24 h at 5-minute resolution)
+
+# Startup Cache
+LAST_RESPONSE_SAVE_INTERVAL_SECONDS = 60  # Write the last plan and presets to HA storage at most this often
+
+# Sensor Cache
+SENSOR_STALE_SECONDS = 3600  # A sensor without updates for 60 minutes counts as unavailable
+
+# State Write Suppression
+# Numeric attributes that only trigger a state write when they move at least this much
+STATE_ATTRIBUTE_DEADBANDS = {
+    "time_since_last_switch": 300,  # seconds
+    "prediction_age": 300,  # seconds
+    "plan_valid_until": 300,  # seconds - moves with every response for a rolling plan
+    "predicted_peak": 0.2,  # °C
+    "predicted_low": 0.2,  # °C
+}
+
+# Local Thermal Model (HEAT mode and failsafe)
+HEAT_MODEL_ENABLED = True  # Let the learned room model switch heaters early (overshoot/undershoot)
+HEAT_MODEL_SAMPLE_SECONDS = 300  # Fit the temperature slope over at least this long per sample
+HEAT_MODEL_MAX_GAP_SECONDS = 1800  # Readings further apart than this start a new interval
+HEAT_MODEL_HEATER_LAG_SECONDS = 600  # Time constant of the heater's effect on the room (radiator mass)
+HEAT_MODEL_FORGETTING = 0.995  # RLS forgetting factor per sample (~17 h memory at 5-minute samples)
+HEAT_MODEL_MIN_SAMPLES = 24  # Samples (2 h at 5 minutes) before the model may influence the controller
+HEAT_MODEL_MAX_RATE = 10.0  # °C/h - faster changes (open window etc.) are not learned from
+HEAT_MODEL_DEFAULT_OUTDOOR = 5.0  # °C assumed outdoors for rooms without an outdoor sensor
+HEAT_MODEL_HORIZON_SECONDS = 900  # Look this far ahead when deciding to switch early
+HEAT_MODEL_SAVE_INTERVAL_SECONDS = 600  # Write the model to HA storage at most this often while it learns
+
+# Whole-House Heater Dispatch
+HEATER_POWER_BUDGET_WATTS = None  # Max combined power of heaters switched on by Heatly (None = no limit)
+HEATER_MAX_ACTIVE = None  # Max number of heater entities on at once (None = no limit)
+HEATER_STAGGER_SECONDS = 1.0  # Release queued turn-ons at least this far apart; turn-offs are never delayed
+DEFAULT_HEATER_WATTS = 1000  # Assumed power per heater entity when the room doesn't say
+DEFAULT_ROOM_PRIORITY = 0  # Higher priority rooms get heat first when turn-ons are queued
+HEATER_RECONCILE_INTERVAL_SECONDS = 300  # Check all heaters against their last command this often (0 = off)
+HEATER_RECONCILE_GRACE_SECONDS = 30  # Don't correct heaters commanded less than this long ago
+
+# Update Loop Tracing
+TRACE_SAMPLE_RATE = 0.0  # Fraction of room updates traced span by span (0 = off; tick timing always runs)
+TRACE_FILE = "heatly_trace.json"  # Chrome trace event file in the HA config dir (open in ui.perfetto.dev)
+TRACE_MAX_EVENTS = 20000  # Newest trace events kept in memory and written to the file
+TRACE_EXPORT_SECONDS = 60  # Rewrite the trace file this often while new events arrive
+TICK_BUDGET_SECONDS = 5.0  # Warn when one room update takes longer than this
+LOOP_LAG_INTERVAL_SECONDS = 1.0  # Measure event-loop lag this often (0 = off)
+LOOP_LAG_WARN_SECONDS = 0.5  # Warn when the lag timer fires this late
+
 # Tolerance Configuration
 DEFAULT_COLD_TOLERANCE = 0.5  # Degrees C below target to turn on heater
 DEFAULT_HOT_TOLERANCE = 0.5  # Degrees C above target to turn off heater
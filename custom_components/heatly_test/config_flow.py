@@ -4,8 +4,8 @@ from homeassistant.core import callback
 from .const import (
     DOMAIN, CONF_ROOM_ID, CONF_TEMP_SENSOR, CONF_HEATER_SWITCH, 
     CONF_HEATER_SWITCHES, CONF_OUTDOOR_SENSOR, CONF_API_URL, CONF_API_KEY,
-    CONF_COLD_TOLERANCE, CONF_HOT_TOLERANCE,
-    DEFAULT_API_URL, DEFAULT_COLD_TOLERANCE, DEFAULT_HOT_TOLERANCE
+    CONF_COLD_TOLERANCE, CONF_HOT_TOLERANCE, CONF_HEATER_WATTS, CONF_PRIORITY,
+    DEFAULT_API_URL, DEFAULT_COLD_TOLERANCE, DEFAULT_HOT_TOLERANCE, DEFAULT_HEATER_WATTS, DEFAULT_ROOM_PRIORITY
 )
 import voluptuous as vol
 from homeassistant.helpers import selector
@@ -76,8 +76,8 @@ class HeatlyOptionsFlow(config_entries.OptionsFlow):
             # Update the config entry with new options
             return self.async_create_entry(title="", data=user_input)
 
-        # Get current values
-        current_data = self.config_entry.data
+        # Get current values - earlier options win over the original setup data
+        current_data = {**self.config_entry.data, **self.config_entry.options}
         
         options_schema = vol.Schema({
             vol.Optional(
@@ -92,6 +92,14 @@ class HeatlyOptionsFlow(config_entries.OptionsFlow):
                 CONF_API_URL,
                 default=current_data.get(CONF_API_URL, DEFAULT_API_URL)
             ): str,
+            vol.Optional(
+                CONF_HEATER_WATTS,
+                default=current_data.get(CONF_HEATER_WATTS, DEFAULT_HEATER_WATTS)
+            ): vol.All(vol.Coerce(float), vol.Range(min=0, max=10000)),
+            vol.Optional(
+                CONF_PRIORITY,
+                default=current_data.get(CONF_PRIORITY, DEFAULT_ROOM_PRIORITY)
+            ): vol.All(vol.Coerce(int), vol.Range(min=0, max=10)),
         })
 
         return self.async_show_form(
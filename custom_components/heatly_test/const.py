@@ -8,13 +8,93 @@ CONF_API_URL = "api_url"
 CONF_API_KEY = "api_key"  # User API key for authentication
 CONF_COLD_TOLERANCE = "cold_tolerance"
 CONF_HOT_TOLERANCE = "hot_tolerance"
+CONF_HEATER_WATTS = "heater_watts"  # Power per heater, for the whole-house budget
+CONF_PRIORITY = "priority"  # Room priority when heater turn-ons are queued
 DEFAULT_API_URL = "http://localhost:5364"
 
+# HA storage (helpers.storage.Store)
+STORAGE_VERSION = 1
+STORAGE_KEY_BACKLOG = f"{DOMAIN}.{{entry_id}}.backlog"
+STORAGE_KEY_THERMAL_MODEL = f"{DOMAIN}.{{entry_id}}.thermal_model"
+STORAGE_KEY_LAST_RESPONSE = f"{DOMAIN}.{{entry_id}}.last_response"
+
+# Keys for integration-wide objects in hass.data
+DATA_SESSION_POOL = f"{DOMAIN}_session_pool"
+DATA_BATCHERS = f"{DOMAIN}_batchers"
+DATA_SCHEDULE_CACHES = f"{DOMAIN}_schedule_caches"
+DATA_CIRCUIT_BREAKERS = f"{DOMAIN}_circuit_breakers"
+DATA_HOST_METRICS = f"{DOMAIN}_host_metrics"
+DATA_HUBS = f"{DOMAIN}_hubs"
+DATA_HEATER_DISPATCHER = f"{DOMAIN}_heater_dispatcher"
+DATA_TRAFFIC_RECORDER = f"{DOMAIN}_traffic_recorder"
+DATA_TRACER = f"{DOMAIN}_tracer"
+
 # Import timing configuration from config module
 from .config import (
     DEFAULT_COLD_TOLERANCE,
     DEFAULT_HOT_TOLERANCE,
+    DEFAULT_HEATER_WATTS,
+    DEFAULT_ROOM_PRIORITY,
     SCAN_INTERVAL_SECONDS,
     SCHEDULE_CACHE_SECONDS,
-    MIN_SWITCH_INTERVAL_SECONDS
+    MIN_SWITCH_INTERVAL_SECONDS,
+    API_REQUEST_TIMEOUT_SECONDS,
+    API_CONNECTION_LIMIT,
+    API_CONNECTION_LIMIT_PER_HOST,
+    API_KEEPALIVE_SECONDS,
+    API_RECORD_FILE,
+    API_RECORD_MAX_BYTES,
+    API_RECORD_BACKUPS,
+    API_RECORD_FLUSH_SECONDS,
+    TRACE_SAMPLE_RATE,
+    TRACE_FILE,
+    TRACE_MAX_EVENTS,
+    TRACE_EXPORT_SECONDS,
+    TICK_BUDGET_SECONDS,
+    LOOP_LAG_INTERVAL_SECONDS,
+    LOOP_LAG_WARN_SECONDS,
+    BATCH_SENSOR_UPLOADS,
+    BATCH_WINDOW_SECONDS,
+    SENSOR_DEBOUNCE_SECONDS,
+    PUSH_ENABLED,
+    PUSH_IDLE_TIMEOUT_SECONDS,
+    PUSH_RECONNECT_MIN_SECONDS,
+    PUSH_RECONNECT_MAX_SECONDS,
+    PLAN_MAX_AGE_SECONDS,
+    PLAN_POLL_INTERVAL_SECONDS,
+    POLL_MIN_INTERVAL_SECONDS,
+    POLL_MAX_INTERVAL_SECONDS,
+    POLL_SLOPE_WINDOW,
+    POLL_STALE_PREDICTION_SECONDS,
+    REPORT_SIGNIFICANT_ONLY,
+    REPORT_TEMP_DEADBAND,
+    REPORT_OUTDOOR_DEADBAND,
+    REPORT_HEARTBEAT_SECONDS,
+    OFFLINE_BUFFER_SIZE,
+    OFFLINE_BUFFER_SAVE_INTERVAL_SECONDS,
+    BACKFILL_RESOLUTION_SECONDS,
+    BACKFILL_CHUNK_SIZE,
+    STATE_ATTRIBUTE_DEADBANDS,
+    HEATER_POWER_BUDGET_WATTS,
+    HEATER_MAX_ACTIVE,
+    HEATER_STAGGER_SECONDS,
+    HEATER_RECONCILE_INTERVAL_SECONDS,
+    HEATER_RECONCILE_GRACE_SECONDS,
+    SENSOR_STALE_SECONDS,
+    LAST_RESPONSE_SAVE_INTERVAL_SECONDS,
+    API_RETRY_ATTEMPTS,
+    API_RETRY_BASE_SECONDS,
+    API_RETRY_MAX_SECONDS,
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_RESET_SECONDS,
+    HEAT_MODEL_ENABLED,
+    HEAT_MODEL_SAMPLE_SECONDS,
+    HEAT_MODEL_MAX_GAP_SECONDS,
+    HEAT_MODEL_HEATER_LAG_SECONDS,
+    HEAT_MODEL_FORGETTING,
+    HEAT_MODEL_MIN_SAMPLES,
+    HEAT_MODEL_MAX_RATE,
+    HEAT_MODEL_DEFAULT_OUTDOOR,
+    HEAT_MODEL_HORIZON_SECONDS,
+    HEAT_MODEL_SAVE_INTERVAL_SECONDS
 )
\ No newline at end of file
@@ -0,0 +1,22 @@
+"""Hysteresis decision logic shared by the thermostat and the offline simulator.
+
+Kept free of Home Assistant and package imports so tools can load this file on
+its own.
+"""
+
+
+def hysteresis_step(temp, target, cold_tolerance, hot_tolerance, heater_on, since_switch, min_switch_interval):
+    """Return the next heater state of the local bang-bang controller.
+
+    Turns on at or below target - cold_tolerance, off at or above
+    target + hot_tolerance, keeps the current state in between, and never
+    switches sooner than min_switch_interval after the previous switch.
+
+    Written with & | and > instead of and/or/not so it works unchanged on
+    scalars and elementwise on NumPy arrays.
+    """
+    can_switch = since_switch >= min_switch_interval
+    turn_on = (temp <= target - cold_tolerance) & can_switch
+    turn_off = (temp >= target + hot_tolerance) & can_switch
+    # "(on or turn_on) and not turn_off" - for booleans, a > b means a and not b
+    return (heater_on | turn_on) > turn_off
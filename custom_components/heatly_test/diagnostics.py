@@ -0,0 +1,72 @@
+"""Diagnostics download for a Heatly config entry."""
+from homeassistant.components.diagnostics import async_redact_data
+from .const import DOMAIN, CONF_API_KEY, DATA_HEATER_DISPATCHER, DATA_TRAFFIC_RECORDER, DATA_TRACER
+
+TO_REDACT = {CONF_API_KEY}
+
+async def async_get_config_entry_diagnostics(hass, entry):
+    """Return config and performance counters for one room."""
+    data_store = hass.data.get(DOMAIN, {}).get(entry.entry_id) or {}
+    api = data_store.get("api")
+    room = data_store.get("room")
+    thermostat = data_store.get("thermostat")
+
+    diagnostics = {
+        "entry": async_redact_data(dict(entry.data), TO_REDACT),
+        "options": async_redact_data(dict(entry.options), TO_REDACT),
+    }
+
+    if api is not None:
+        diagnostics["api"] = {
+            "base_url": api.base_url,
+            "circuit": api.circuit_state,
+            "room_requests": api.metrics.as_dict(),
+            "host_requests": api.host_metrics.as_dict(),
+        }
+
+    hub = data_store.get("hub")
+    if hub is not None:
+        diagnostics["hub"] = hub.as_dict()
+
+    dispatcher = hass.data.get(DATA_HEATER_DISPATCHER)
+    if dispatcher is not None:
+        diagnostics["heater_dispatch"] = dispatcher.as_dict()
+
+    recorder = hass.data.get(DATA_TRAFFIC_RECORDER)
+    if recorder is not None:
+        diagnostics["traffic_recording"] = recorder.as_dict()
+
+    tracer = hass.data.get(DATA_TRACER)
+    if tracer is not None:
+        diagnostics["update_timing"] = tracer.as_dict()
+
+    if room is not None:
+        diagnostics["updates"] = {
+            "coalescing": room.updater.as_dict(),
+            "poll_interval_seconds": round(room.scheduler.last_interval, 1),
+            "backlog_readings": len(room.backlog),
+            "backlog_dropped": room.backlog.dropped,
+            "reporting": room.reporting.as_dict(),
+        }
+        diagnostics["thermal_model"] = {
+            "ready": room.thermal_model.is_ready,
+            "samples": room.thermal_model.samples,
+            "loss_per_hour": round(room.thermal_model.loss, 4),
+            "heating_rate_per_hour": round(room.thermal_model.gain, 3),
+        }
+
+    if thermostat is not None:
+        diagnostics["thermostat"] = {
+            "hvac_mode": thermostat.hvac_mode,
+            "current_temperature": thermostat.current_temperature,
+            "sensor_stale": thermostat.sensor_stale,
+            "target_temperature": thermostat.target_temperature,
+            "has_valid_plan": thermostat.has_valid_plan,
+            "prediction_age": thermostat.prediction_age,
+            "suppressed_writes": thermostat.suppressed_writes,
+            "heater_errors": thermostat.heater_errors,
+            "heater_drift": thermostat.heater_drift,
+            "metrics": thermostat.metrics.as_dict(),
+        }
+
+    return diagnostics
@@ -0,0 +1,260 @@
+"""Grouped, concurrent service calls for heater entities, gated by a whole-house dispatcher."""
+from homeassistant.core import callback
+from homeassistant.helpers.event import async_call_later
+import asyncio
+import logging
+import time
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def heater_is_on(state_value: str, entity_id: str):
+    """Actual on/off state of a heater entity from its HA state, or None if unknown."""
+    if state_value in (None, "unknown", "unavailable"):
+        return None
+    if entity_id.split(".")[0] == "climate":
+        # A climate entity's state is its HVAC mode
+        return state_value == "heat"
+    return state_value == "on"
+
+
+def build_heater_calls(entity_ids, state: bool) -> dict:
+    """Group heater entities into as few service calls as possible.
+
+    Returns {(domain, service, service_data_items): [entity_id, ...]}.
+    Climate entities use set_hvac_mode; switch, input_boolean and light use
+    turn_on/turn_off.
+    """
+    groups = {}
+    for entity_id in entity_ids:
+        domain = entity_id.split(".")[0]
+        if domain == "climate":
+            key = ("climate", "set_hvac_mode", (("hvac_mode", "heat" if state else "off"),))
+        else:
+            key = (domain, "turn_on" if state else "turn_off", ())
+        groups.setdefault(key, []).append(entity_id)
+    return groups
+
+
+async def _async_call(hass, domain: str, service: str, extra: tuple, entity_ids: list):
+    await hass.services.async_call(
+        domain,
+        service,
+        {"entity_id": entity_ids, **dict(extra)},
+        blocking=False
+    )
+
+
+async def _async_call_group(hass, key: tuple, entity_ids: list) -> dict:
+    """Run one grouped call; on failure retry per entity to find which ones fail."""
+    domain, service, extra = key
+    try:
+        await _async_call(hass, domain, service, extra, entity_ids)
+        _LOGGER.info(f"Called {domain}.{service} {dict(extra) or ''} on {', '.join(entity_ids)}")
+        return {}
+    except Exception as e:
+        if len(entity_ids) == 1:
+            return {entity_ids[0]: str(e)}
+
+    errors = {}
+    results = await asyncio.gather(
+        *(_async_call(hass, domain, service, extra, [entity_id]) for entity_id in entity_ids),
+        return_exceptions=True
+    )
+    for entity_id, result in zip(entity_ids, results):
+        if isinstance(result, Exception):
+            errors[entity_id] = str(result)
+    return errors
+
+
+async def async_set_heaters(hass, entity_ids, state: bool) -> dict:
+    """Switch heaters with one call per domain/service, all groups concurrently.
+
+    Returns {entity_id: error message} for the entities that failed.
+    """
+    groups = build_heater_calls(entity_ids, state)
+    results = await asyncio.gather(
+        *(_async_call_group(hass, key, ids) for key, ids in groups.items())
+    )
+    errors = {}
+    for group_errors in results:
+        errors.update(group_errors)
+    for entity_id, error in errors.items():
+        _LOGGER.error(f"Failed to control {entity_id}: {error}")
+    return errors
+
+
+class HeaterDispatcher:
+    """Whole-house gate for heater commands from every room.
+
+    Turn-offs go out immediately. Turn-ons are queued and released one room
+    at a time, at least stagger_seconds apart, and only while the rooms
+    already heating stay within the power budget (max_watts) and heater count
+    (max_heaters); None means no limit. The queue is ordered by room
+    priority, then by comfort deficit (target minus current temperature)
+    evaluated at release time, so the coldest room goes first. A room whose
+    turn-on doesn't fit waits at the head of the queue until enough heating
+    is switched off.
+
+    Only heaters commanded through the dispatcher are counted; anything
+    already on when Home Assistant starts is not.
+
+    The dispatcher also remembers each room's last command, so
+    async_reconcile can compare every heater's actual state against it in one
+    sweep and correct the ones that drifted (switched by hand, missed
+    command) with grouped service calls.
+    """
+
+    def __init__(self, hass, max_watts: float = None, max_heaters: int = None, stagger_seconds: float = 0.0):
+        self.hass = hass
+        self.max_watts = max_watts
+        self.max_heaters = max_heaters
+        self.stagger_seconds = stagger_seconds
+        self._active = {}  # entry_id -> (heater count, watts) of rooms commanded on
+        self._queue = {}  # entry_id -> [priority, deficit_fn, heater_ids, watts, on_done, queued_at]
+        self._cancel_stagger = None
+        self._commanded = {}  # entry_id -> (heater_ids, state, monotonic time) of the last command sent
+        self.unsub_reconcile = None  # Set by whoever schedules the periodic sweep
+        self.drift_counts = {}  # heater entity_id -> times found in the wrong state
+
+        # Counters
+        self.turn_ons = 0
+        self.turn_offs = 0
+        self.deferred = 0  # Turn-ons that could not go out right away
+        self.max_wait_seconds = 0.0
+        self.sweeps = 0
+        self.corrections = 0
+
+    @property
+    def active_watts(self) -> float:
+        return sum(watts for _, watts in self._active.values())
+
+    @property
+    def active_heaters(self) -> int:
+        return sum(count for count, _ in self._active.values())
+
+    async def async_request(self, entry_id: str, heater_ids, state: bool, watts: float = 0.0,
+                            priority: int = 0, deficit_fn=None, on_done=None):
+        """Command a room's heaters. on_done(errors) is called once the service calls ran."""
+        if not state:
+            self._queue.pop(entry_id, None)
+            self._active.pop(entry_id, None)
+            self._commanded[entry_id] = (list(heater_ids), False, time.monotonic())
+            self.turn_offs += 1
+            errors = await async_set_heaters(self.hass, heater_ids, False)
+            if on_done is not None:
+                on_done(errors)
+            self._release()
+            return
+
+        if entry_id in self._active:
+            # Already counted as heating - just reissue the command
+            self._commanded[entry_id] = (list(heater_ids), True, time.monotonic())
+            errors = await async_set_heaters(self.hass, heater_ids, True)
+            if on_done is not None:
+                on_done(errors)
+            return
+
+        self._queue[entry_id] = [priority, deficit_fn, list(heater_ids), watts, on_done, time.monotonic()]
+        self._release()
+        if entry_id in self._queue:
+            self.deferred += 1
+            _LOGGER.debug(f"Heater turn-on for {entry_id} queued ({len(self._queue)} waiting)")
+
+    def forget(self, entry_id: str):
+        """Drop a room that is being unloaded."""
+        self._queue.pop(entry_id, None)
+        self._active.pop(entry_id, None)
+        self._commanded.pop(entry_id, None)
+        self._release()
+
+    def _fits(self, heater_count: int, watts: float) -> bool:
+        # With nothing else heating a room always fits, even one bigger than the budget on its own
+        if self.max_heaters is not None and self._active and self.active_heaters + heater_count > self.max_heaters:
+            return False
+        if self.max_watts is not None and self._active and self.active_watts + watts > self.max_watts:
+            return False
+        return True
+
+    def _next_in_line(self):
+        def sort_key(item):
+            priority, deficit_fn = item[1][0], item[1][1]
+            deficit = deficit_fn() if deficit_fn is not None else None
+            return (-priority, -(deficit if deficit is not None else 0.0))
+        return min(self._queue.items(), key=sort_key)[0]
+
+    def _release(self):
+        """Start the next queued turn-on if the stagger interval and the budget allow it."""
+        if not self._queue or self._cancel_stagger is not None:
+            return
+        entry_id = self._next_in_line()
+        priority, deficit_fn, heater_ids, watts, on_done, queued_at = self._queue[entry_id]
+        if not self._fits(len(heater_ids), watts):
+            return
+
+        del self._queue[entry_id]
+        self._active[entry_id] = (len(heater_ids), watts)
+        self._commanded[entry_id] = (heater_ids, True, time.monotonic())
+        self.turn_ons += 1
+        self.max_wait_seconds = max(self.max_wait_seconds, time.monotonic() - queued_at)
+        self.hass.async_create_task(self._async_turn_on(heater_ids, on_done))
+
+        if self.stagger_seconds > 0:
+            self._cancel_stagger = async_call_later(self.hass, self.stagger_seconds, self._stagger_done)
+        else:
+            self._release()
+
+    async def _async_turn_on(self, heater_ids, on_done):
+        errors = await async_set_heaters(self.hass, heater_ids, True)
+        if on_done is not None:
+            on_done(errors)
+
+    @callback
+    def _stagger_done(self, _now):
+        self._cancel_stagger = None
+        self._release()
+
+    async def async_reconcile(self, _now=None, grace_seconds: float = 0.0) -> dict:
+        """Re-send commands for heaters whose actual state differs from the last command.
+
+        Reads every commanded heater's state in one pass, skipping rooms
+        commanded within grace_seconds (the non-blocking call may not have
+        landed yet) and entities whose state is unknown. Drifted heaters from
+        all rooms are fixed with as few grouped service calls as possible.
+        Returns {entity_id: error} for corrections that failed.
+        """
+        self.sweeps += 1
+        cutoff = time.monotonic() - grace_seconds
+        drifted = {True: [], False: []}
+        for heater_ids, state, commanded_at in self._commanded.values():
+            if commanded_at > cutoff:
+                continue
+            for entity_id in heater_ids:
+                current = self.hass.states.get(entity_id)
+                actual = heater_is_on(current.state if current is not None else None, entity_id)
+                if actual is None or actual == state:
+                    continue
+                drifted[state].append(entity_id)
+                self.drift_counts[entity_id] = self.drift_counts.get(entity_id, 0) + 1
+
+        errors = {}
+        for state, entity_ids in drifted.items():
+            if entity_ids:
+                _LOGGER.info(f"Heater reconciliation: turning {'on' if state else 'off'} {', '.join(entity_ids)}")
+                self.corrections += len(entity_ids)
+                errors.update(await async_set_heaters(self.hass, entity_ids, state))
+        return errors
+
+    def as_dict(self) -> dict:
+        return {
+            "active_rooms": len(self._active),
+            "active_heaters": self.active_heaters,
+            "active_watts": self.active_watts,
+            "queued_rooms": len(self._queue),
+            "turn_ons": self.turn_ons,
+            "turn_offs": self.turn_offs,
+            "deferred": self.deferred,
+            "max_wait_seconds": round(self.max_wait_seconds, 1),
+            "reconcile_sweeps": self.sweeps,
+            "reconcile_corrections": self.corrections,
+        }
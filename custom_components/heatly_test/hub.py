@@ -0,0 +1,245 @@
+"""One update loop per Heatly account (API URL + key) instead of one per room."""
+from homeassistant.components.climate import HVACMode
+from homeassistant.helpers.event import async_call_later, async_track_state_change_event
+import asyncio
+import logging
+import math
+import time
+import zlib
+
+from .api_client import HeatlyPushChannel
+from .const import PUSH_ENABLED, SCAN_INTERVAL_SECONDS
+
+_LOGGER = logging.getLogger(__name__)
+
+# Rooms due within this many seconds of the timer are run in the same tick
+_TICK_SLACK_SECONDS = 1.0
+
+
+class HeatlyHub:
+    """Coordinates every room that talks to the same API URL with the same key.
+
+    The hub owns the shared session and sensor batcher, one state-change
+    subscription covering all rooms' temperature sensors, a single timer armed
+    for whichever room is due next, and the optional push stream that delivers
+    control commands between polls. Each room still decides its own poll
+    interval (AdaptivePollScheduler) and runs through its own single-flight
+    updater; the hub only decides when, so 50 rooms cost one timer and one
+    listener instead of 50 independent loops.
+
+    Accounts are spread over the base interval by a deterministic phase (CRC32
+    of the API URL and key), so households don't all hit the API in the same
+    second. With a batcher, rooms share their account's phase: their first
+    polls land in the same tick and go out as one batch. Without one, each
+    room keeps its own phase, so N rooms don't send N requests in one burst.
+    """
+
+    def __init__(self, hass, api_url: str, api_key: str = None, session=None, batcher=None):
+        self.hass = hass
+        self.api_url = api_url.rstrip('/')
+        self.api_key = api_key
+        self.session = session
+        self.batcher = batcher
+
+        self._rooms = {}  # entry_id -> HeatlyRoom
+        self._due = {}  # entry_id -> monotonic time of next poll, None while running
+        self._sensor_rooms = {}  # temperature sensor entity_id -> set of entry_ids
+        self._unsub_state = None
+        self._cancel_timer = None
+        self._timer_due = None
+        self.push = None
+        self._push_task = None
+        self._tasks = {}  # entry_id -> set of running update tasks, cancelled when the room goes
+        phase = zlib.crc32(f"{self.api_url} {api_key or ''}".encode()) / 0xFFFFFFFF
+        self._first_poll = time.monotonic() + max(1.0, phase * SCAN_INTERVAL_SECONDS)
+
+        # Counters
+        self.ticks = 0
+        self.sensor_events = 0
+
+    def __len__(self) -> int:
+        return len(self._rooms)
+
+    def _first_due(self) -> float:
+        """Next slot on the account's phase: every room added by then is polled in the same tick."""
+        now = time.monotonic()
+        if self._first_poll < now + 1.0:
+            periods = math.ceil((now + 1.0 - self._first_poll) / SCAN_INTERVAL_SECONDS)
+            self._first_poll += periods * SCAN_INTERVAL_SECONDS
+        return self._first_poll
+
+    def add_room(self, room, sensor_id: str):
+        """Register a room; its first poll is on the account's phase when batching, else on the room's own."""
+        self._rooms[room.entry_id] = room
+        if self.batcher is not None and self.batcher.supported:
+            self._due[room.entry_id] = self._first_due()
+        else:
+            self._due[room.entry_id] = time.monotonic() + room.scheduler.initial_delay()
+        self._sensor_rooms.setdefault(sensor_id, set()).add(room.entry_id)
+        self._subscribe()
+        self._schedule()
+        self._start_push()
+        _LOGGER.debug(f"Hub {self.api_url}: added room {room.room_id} ({len(self._rooms)} rooms)")
+
+    def remove_room(self, entry_id: str) -> bool:
+        """Unregister a room and cancel its in-flight updates. Returns True when the hub has no rooms left."""
+        room = self._rooms.pop(entry_id, None)
+        self._due.pop(entry_id, None)
+        for task in self._tasks.pop(entry_id, ()):
+            task.cancel()
+        if room is not None and self.batcher is not None:
+            self.batcher.discard(room.room_id)
+        for sensor_id in [s for s, entries in self._sensor_rooms.items() if entry_id in entries]:
+            self._sensor_rooms[sensor_id].discard(entry_id)
+            if not self._sensor_rooms[sensor_id]:
+                del self._sensor_rooms[sensor_id]
+        if self._rooms:
+            self._subscribe()
+            self._schedule()
+            return False
+        self.async_shutdown()
+        return True
+
+    async def async_remove_room(self, entry_id: str) -> bool:
+        """remove_room, then wait until the room's cancelled updates have unwound."""
+        tasks = list(self._tasks.get(entry_id, ()))
+        hub_empty = self.remove_room(entry_id)
+        if tasks:
+            await asyncio.wait(tasks)
+        return hub_empty
+
+    def async_shutdown(self):
+        """Drop the state subscription, the timer, the push stream and the batcher's queue."""
+        if self.batcher is not None:
+            self.batcher.close()
+        if self._unsub_state is not None:
+            self._unsub_state()
+            self._unsub_state = None
+        self._cancel()
+        if self._push_task is not None:
+            self._push_task.cancel()
+            self._push_task = None
+
+    @property
+    def push_connected(self) -> bool:
+        return self.push is not None and self.push.connected
+
+    def _start_push(self):
+        if not PUSH_ENABLED or self._push_task is not None or self.session is None:
+            return
+        if self.push is None:
+            self.push = HeatlyPushChannel(self.api_url, self.api_key, self.session, self._async_push_event)
+        if self.push.supported:
+            self._push_task = self.hass.async_create_background_task(
+                self.push.async_run(), f"heatly_push_{self.api_url}"
+            )
+
+    def _room_by_id(self, room_id):
+        for room in self._rooms.values():
+            if room.room_id == room_id:
+                return room
+        return None
+
+    async def _async_push_event(self, event_type: str, data: dict):
+        """Apply a command pushed by the server, as if it came with a poll response."""
+        if event_type == "schedules":
+            # Global schedule list changed - fetch it once, then update every thermostat
+            rooms = list(self._rooms.values())
+            if rooms:
+                await rooms[0].api.async_refresh_schedules()
+            for room in rooms:
+                if room.thermostat is not None:
+                    await room.thermostat.async_refresh_presets()
+            return
+
+        room = self._room_by_id(data.get("room_id"))
+        thermostat = room.thermostat if room is not None else None
+        if thermostat is None:
+            return
+        if event_type == "control":
+            if thermostat.hvac_mode == HVACMode.AUTO:
+                await thermostat.update_from_response(data)
+        elif event_type == "schedule":
+            thermostat.apply_remote_schedule(data.get("active_schedule"))
+
+    def _subscribe(self):
+        """(Re)subscribe one listener to the temperature sensors of all rooms."""
+        if self._unsub_state is not None:
+            self._unsub_state()
+            self._unsub_state = None
+        if self._sensor_rooms:
+            self._unsub_state = async_track_state_change_event(
+                self.hass, list(self._sensor_rooms), self._async_sensor_changed
+            )
+
+    async def _async_sensor_changed(self, event):
+        new_state = event.data.get("new_state")
+        if not new_state or new_state.state in ["unknown", "unavailable"]:
+            return
+        self.sensor_events += 1
+        for entry_id in self._sensor_rooms.get(event.data.get("entity_id"), ()):
+            room = self._rooms.get(entry_id)
+            if room is not None:
+                self._track(entry_id, room.updater.async_trigger())
+
+    def _track(self, entry_id: str, coro):
+        """Run an update for a room as a task that remove_room can cancel."""
+        task = self.hass.async_create_task(coro)
+        tasks = self._tasks.setdefault(entry_id, set())
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    def _cancel(self):
+        if self._cancel_timer is not None:
+            self._cancel_timer()
+            self._cancel_timer = None
+            self._timer_due = None
+
+    def _schedule(self):
+        """Arm the single timer for the earliest due room (no-op if already armed for it)."""
+        pending = [due for due in self._due.values() if due is not None]
+        if not pending:
+            self._cancel()
+            return
+        next_due = min(pending)
+        if self._cancel_timer is not None and self._timer_due is not None and self._timer_due <= next_due:
+            return
+        self._cancel()
+        self._timer_due = next_due
+        self._cancel_timer = async_call_later(self.hass, max(0.0, next_due - time.monotonic()), self._async_tick)
+
+    async def _async_tick(self, _now):
+        self._cancel_timer = None
+        self._timer_due = None
+        self.ticks += 1
+        horizon = time.monotonic() + _TICK_SLACK_SECONDS
+        for entry_id, due in list(self._due.items()):
+            if due is not None and due <= horizon:
+                self._due[entry_id] = None
+                self._track(entry_id, self._async_poll_room(entry_id))
+        self._schedule()
+
+    async def _async_poll_room(self, entry_id: str):
+        room = self._rooms.get(entry_id)
+        if room is None:
+            return
+        try:
+            await room.updater.async_trigger()
+        finally:
+            # Rommet kan ha blitt fjernet mens oppdateringen kjørte
+            if self._rooms.get(entry_id) is room:
+                self._due[entry_id] = time.monotonic() + room.next_poll_interval(self.push_connected)
+                self._schedule()
+
+    def as_dict(self) -> dict:
+        now = time.monotonic()
+        next_due = [due for due in self._due.values() if due is not None]
+        return {
+            "rooms": len(self._rooms),
+            "sensors": len(self._sensor_rooms),
+            "ticks": self.ticks,
+            "sensor_events": self.sensor_events,
+            "rooms_running": sum(1 for due in self._due.values() if due is None),
+            "next_tick_in_seconds": round(min(next_due) - now, 1) if next_due else None,
+            "push": self.push.as_dict() if self.push is not None else None,
+        }
@@ -0,0 +1,144 @@
+"""Cheap, always-on performance counters for rooms and API hosts."""
+from array import array
+from bisect import bisect_left
+import time
+
+# Upper bounds (ms) of the request latency histogram buckets; the last bucket is open-ended
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class FixedHistogram:
+    """Histogram with fixed bucket bounds; observing a value only bumps a counter."""
+
+    __slots__ = ("bounds", "counts", "count", "sum", "max")
+
+    def __init__(self, bounds=LATENCY_BUCKETS_MS):
+        self.bounds = tuple(bounds)
+        self.counts = array("Q", [0]) * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, fraction: float):
+        """Upper bound of the bucket holding the given fraction of samples (None if empty)."""
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                return self.bounds[i] if i < len(self.bounds) else float("inf")
+        return float("inf")
+
+    def as_dict(self) -> dict:
+        labels = [f"le_{bound}" for bound in self.bounds] + ["inf"]
+        p50, p95 = self.percentile(0.5), self.percentile(0.95)
+        return {
+            "count": self.count,
+            "mean": round(self.sum / self.count, 1) if self.count else None,
+            "max": round(self.max, 1) if self.count else None,
+            # A percentile in the open-ended bucket has no upper bound to report
+            "p50": None if p50 == float("inf") else p50,
+            "p95": None if p95 == float("inf") else p95,
+            "buckets": dict(zip(labels, self.counts.tolist())),
+        }
+
+
+class RequestMetrics:
+    """Request counters for one room's client or one API host."""
+
+    __slots__ = ("by_status", "timeouts", "errors", "circuit_rejections", "latency_ms")
+
+    def __init__(self):
+        self.by_status = {}  # HTTP status -> count (a handful of keys, created once)
+        self.timeouts = 0
+        self.errors = 0
+        self.circuit_rejections = 0
+        self.latency_ms = FixedHistogram()
+
+    @property
+    def requests(self) -> int:
+        return sum(self.by_status.values()) + self.timeouts + self.errors
+
+    def record_response(self, status: int, seconds: float):
+        self.by_status[status] = self.by_status.get(status, 0) + 1
+        self.latency_ms.observe(seconds * 1000)
+
+    def record_timeout(self, seconds: float):
+        self.timeouts += 1
+        self.latency_ms.observe(seconds * 1000)
+
+    def record_error(self, seconds: float):
+        self.errors += 1
+        self.latency_ms.observe(seconds * 1000)
+
+    def record_circuit_rejection(self):
+        self.circuit_rejections += 1
+
+    def as_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "by_status": {str(status): count for status, count in sorted(self.by_status.items())},
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+            "circuit_rejections": self.circuit_rejections,
+            "latency_ms": self.latency_ms.as_dict(),
+        }
+
+
+class RoomMetrics:
+    """Control-side counters for one room."""
+
+    __slots__ = ("heater_switches", "_failsafe_since", "_failsafe_total", "last_response_at")
+
+    def __init__(self):
+        self.heater_switches = 0
+        self._failsafe_since = None
+        self._failsafe_total = 0.0
+        self.last_response_at = None
+
+    def record_switch(self):
+        self.heater_switches += 1
+
+    def record_response(self, now: float = None):
+        self.last_response_at = time.time() if now is None else now
+        self.set_failsafe(False, self.last_response_at)
+
+    def set_failsafe(self, active: bool, now: float = None):
+        now = time.time() if now is None else now
+        if active and self._failsafe_since is None:
+            self._failsafe_since = now
+        elif not active and self._failsafe_since is not None:
+            self._failsafe_total += now - self._failsafe_since
+            self._failsafe_since = None
+
+    @property
+    def in_failsafe(self) -> bool:
+        return self._failsafe_since is not None
+
+    def failsafe_seconds(self, now: float = None) -> float:
+        now = time.time() if now is None else now
+        running = now - self._failsafe_since if self._failsafe_since is not None else 0.0
+        return self._failsafe_total + running
+
+    def last_response_age(self, now: float = None):
+        if self.last_response_at is None:
+            return None
+        return (time.time() if now is None else now) - self.last_response_at
+
+    def as_dict(self) -> dict:
+        age = self.last_response_age()
+        return {
+            "heater_switches": self.heater_switches,
+            "in_failsafe": self.in_failsafe,
+            "failsafe_seconds": round(self.failsafe_seconds(), 1),
+            "last_response_age_seconds": round(age, 1) if age is not None else None,
+        }
@@ -0,0 +1,71 @@
+"""Decides which sensor readings are worth uploading to the API."""
+import time
+
+from .const import REPORT_TEMP_DEADBAND, REPORT_OUTDOOR_DEADBAND, REPORT_HEARTBEAT_SECONDS
+
+
+class SignificanceFilter:
+    """Send-on-delta policy for one room's sensor uploads.
+
+    A reading is sent if the indoor temperature moved at least
+    REPORT_TEMP_DEADBAND since the last reading that was sent, the outdoor
+    temperature moved at least REPORT_OUTDOOR_DEADBAND, the heater state
+    changed, or REPORT_HEARTBEAT_SECONDS have passed. Changes are measured
+    against the last *sent* reading, so slow drift is still reported once it
+    adds up. After a failed upload the next reading is always sent.
+    """
+
+    __slots__ = ("_deadband", "_outdoor_deadband", "_heartbeat", "_last", "sent", "suppressed", "reasons")
+
+    def __init__(
+        self,
+        deadband: float = REPORT_TEMP_DEADBAND,
+        outdoor_deadband: float = REPORT_OUTDOOR_DEADBAND,
+        heartbeat: float = REPORT_HEARTBEAT_SECONDS,
+    ):
+        self._deadband = deadband
+        self._outdoor_deadband = outdoor_deadband
+        self._heartbeat = heartbeat
+        self._last = None  # (monotonic time, temp, outdoor, heater_on) of the last sent reading
+
+        # Counters
+        self.sent = 0
+        self.suppressed = 0
+        self.reasons = {}  # reason -> uploads sent for it
+
+    def reason(self, temp: float, outdoor: float, heater_on: bool, now: float = None):
+        """Why this reading should be sent, or None if it can be skipped."""
+        if self._last is None:
+            return "first"
+        now = time.monotonic() if now is None else now
+        sent_at, last_temp, last_outdoor, last_heater_on = self._last
+        if now - sent_at >= self._heartbeat:
+            return "heartbeat"
+        if abs(temp - last_temp) >= self._deadband:
+            return "temperature"
+        if outdoor is not None and (last_outdoor is None or abs(outdoor - last_outdoor) >= self._outdoor_deadband):
+            return "outdoor"
+        if heater_on != last_heater_on:
+            return "heater"
+        return None
+
+    def record_sent(self, reason: str, temp: float, outdoor: float, heater_on: bool, now: float = None):
+        self._last = (time.monotonic() if now is None else now, temp, outdoor, heater_on)
+        self.sent += 1
+        self.reasons[reason] = self.reasons.get(reason, 0) + 1
+
+    def record_suppressed(self):
+        self.suppressed += 1
+
+    def reset(self):
+        """Forget the last sent reading, so the next one goes out regardless."""
+        self._last = None
+
+    def as_dict(self) -> dict:
+        total = self.sent + self.suppressed
+        return {
+            "sent": self.sent,
+            "suppressed": self.suppressed,
+            "suppressed_ratio": round(self.suppressed / total, 3) if total else None,
+            "reasons": dict(self.reasons),
+        }
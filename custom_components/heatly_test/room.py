@@ -0,0 +1,232 @@
+"""Per-room update cycle: sensor values -> Heatly API -> thermostat."""
+from homeassistant.components.climate import HVACMode
+import logging
+import time
+
+from .backlog import ReadingBuffer
+from .coalescer import SingleFlightDebouncer
+from .reporting import SignificanceFilter
+from .scheduler import AdaptivePollScheduler
+from .storage import PeriodicStoreWriter
+from .thermal_model import RoomThermalModel
+from .trajectory import plan_fields
+from .tracing import traced_tick
+from .const import (
+    DOMAIN, SCAN_INTERVAL_SECONDS, OFFLINE_BUFFER_SAVE_INTERVAL_SECONDS, BACKFILL_CHUNK_SIZE,
+    HEAT_MODEL_SAVE_INTERVAL_SECONDS, LAST_RESPONSE_SAVE_INTERVAL_SECONDS, REPORT_SIGNIFICANT_ONLY
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class HeatlyRoom:
+    """Everything one config entry needs to run its update loop.
+
+    Holds the API client, the offline reading buffer, the learned thermal model,
+    the plan from the last API response and the preset list (restored at startup
+    so the thermostat doesn't wait for the API), the single-flight updater and
+    the adaptive poll scheduler. The thermostat is looked up in hass.data,
+    since climate.py creates it after the room is set up.
+    """
+
+    def __init__(
+        self, hass, entry_id: str, room_id: str, api_client,
+        backlog_store=None, model_store=None, response_store=None, tracer=None
+    ):
+        self.hass = hass
+        self.entry_id = entry_id
+        self.room_id = room_id
+        self.api = api_client
+        self.backlog = ReadingBuffer()
+        self._backlog_store = backlog_store
+        self._backlog_writer = (
+            PeriodicStoreWriter(hass, backlog_store, self.backlog.as_dict, OFFLINE_BUFFER_SAVE_INTERVAL_SECONDS)
+            if backlog_store is not None else None
+        )
+        self._backfill_running = False
+        self._backfill_task = None
+        self.thermal_model = RoomThermalModel()
+        self._model_store = model_store
+        self._model_writer = (
+            PeriodicStoreWriter(hass, model_store, self.thermal_model.as_dict, HEAT_MODEL_SAVE_INTERVAL_SECONDS)
+            if model_store is not None else None
+        )
+        self._response_writer = (
+            PeriodicStoreWriter(hass, response_store, self._response_as_dict, LAST_RESPONSE_SAVE_INTERVAL_SECONDS)
+            if response_store is not None else None
+        )
+        self._response_store = response_store
+        self.cached_presets = None  # Preset names from the last successful schedule fetch
+        self.cached_response = None  # (received_at, plan fields) of the last control response with a plan
+
+        # Maks én forespørsel per rom om gangen - nye hendelser slås sammen
+        self.updater = SingleFlightDebouncer(self.async_send_sensor_update, name=room_id)
+        self.scheduler = AdaptivePollScheduler(room_id)
+        self.reporting = SignificanceFilter()
+        self.tracer = tracer  # Shared UpdateTracer: tick timing and sampled spans
+
+    @property
+    def thermostat(self):
+        data_store = self.hass.data.get(DOMAIN, {}).get(self.entry_id)
+        if not data_store:
+            return None
+        return data_store.get("thermostat")
+
+    async def async_load(self):
+        """Restore buffered readings, the thermal model and the last API response from HA storage."""
+        if self._backlog_store is not None:
+            stored_backlog = await self._backlog_store.async_load()
+            if stored_backlog:
+                self.backlog.load_dict(stored_backlog)
+                _LOGGER.info(f"Restored {len(self.backlog)} buffered readings for room {self.room_id}")
+        if self._model_store is not None:
+            stored_model = await self._model_store.async_load()
+            if stored_model:
+                self.thermal_model.load_dict(stored_model)
+                _LOGGER.debug(f"Restored thermal model for room {self.room_id} ({self.thermal_model.samples} samples)")
+        if self._response_store is not None:
+            stored_response = await self._response_store.async_load()
+            if stored_response:
+                self.cached_presets = stored_response.get("presets")
+                if stored_response.get("response"):
+                    self.cached_response = (stored_response.get("received_at") or 0.0, stored_response["response"])
+
+    def _save_backlog(self):
+        if self._backlog_writer is not None:
+            self._backlog_writer.schedule()
+
+    async def async_shutdown(self):
+        """Stop background work and write pending state to storage right away (entry unload)."""
+        if self._backfill_task is not None and not self._backfill_task.done():
+            self._backfill_task.cancel()
+        self._backfill_task = None
+        if self._backlog_writer is not None:
+            await self._backlog_writer.async_flush()
+        if self._model_writer is not None:
+            await self._model_writer.async_flush()
+        if self._response_writer is not None:
+            await self._response_writer.async_flush()
+        await self.api.async_close()
+
+    def remember_response(self, response: dict, received_at: float):
+        """Keep the plan of the latest control response for the next startup.
+
+        Only what the plan restore reads is kept; a response without a plan
+        clears the stored one, so an older plan is not restored in its place.
+        """
+        fields = plan_fields(response)
+        if fields is None and self.cached_response is None:
+            return
+        self.cached_response = (received_at, fields) if fields is not None else None
+        self._save_response()
+
+    def remember_presets(self, presets: list):
+        if presets != self.cached_presets:
+            self.cached_presets = list(presets)
+            self._save_response()
+
+    def _save_response(self):
+        if self._response_writer is not None:
+            self._response_writer.schedule()
+
+    def _response_as_dict(self) -> dict:
+        received_at, response = self.cached_response or (None, None)
+        return {"presets": self.cached_presets, "received_at": received_at, "response": response}
+
+    def _observe(self, thermostat, temp: float, outdoor_temp: float):
+        """Feed the reading and current heater state to the thermal model (all modes)."""
+        if self.thermal_model.observe(time.time(), temp, outdoor_temp, thermostat.heater_on):
+            if self._model_writer is not None:
+                self._model_writer.schedule()
+
+    @traced_tick
+    async def async_send_sensor_update(self):
+        """Send current sensor data to API and update thermostat."""
+        thermostat = self.thermostat
+        if not thermostat:
+            return
+
+        # Verdiene leses fra termostatens sensor-cache (None hvis ukjent eller utdatert)
+        temp = thermostat.current_temperature
+        if temp is None:
+            await thermostat.async_handle_missing_temperature()
+            return
+        outdoor_temp = thermostat.outdoor_temperature
+        self._observe(thermostat, temp, outdoor_temp)
+
+        # If in AUTO mode, send to API and get control commands
+        if thermostat.hvac_mode == HVACMode.AUTO:
+            if thermostat.can_skip_api_poll():
+                # Gyldig plan fra API - kjør den lokalt og spar et kall
+                await thermostat.async_run_without_api(api_failed=False)
+                return
+            heater_on = thermostat.heater_on
+            reason = self.reporting.reason(temp, outdoor_temp, heater_on) if REPORT_SIGNIFICANT_ONLY else "always"
+            if reason is None:
+                # Ingenting nytt å melde - siste kommando (eller planen) gjelder fortsatt
+                self.reporting.record_suppressed()
+                if thermostat.has_valid_plan:
+                    await thermostat.async_run_without_api(api_failed=False)
+                return
+            try:
+                response = await self.api.send_sensor_data(temp, outdoor_temp)
+                if response:
+                    self.reporting.record_sent(reason, temp, outdoor_temp, heater_on)
+                    await thermostat.update_from_response(response)
+                    if len(self.backlog) and not self._backfill_running:
+                        self._backfill_task = self.hass.async_create_task(self.async_flush_backlog())
+                else:
+                    _LOGGER.warning("No response from API - following last plan or local failsafe")
+                    self.reporting.reset()
+                    self.backlog.append(time.time(), temp, outdoor_temp)
+                    self._save_backlog()
+                    await thermostat.async_run_without_api()
+            except Exception as e:
+                self.reporting.reset()
+                _LOGGER.error(f"API error: {e}")
+
+        # If in HEAT mode (local control), run local update
+        elif thermostat.hvac_mode == HVACMode.HEAT:
+            await thermostat.async_update()
+
+    async def async_flush_backlog(self):
+        """Upload buffered readings in downsampled chunks once the API is reachable again."""
+        if self._backfill_running or not len(self.backlog):
+            return
+        self._backfill_running = True
+        try:
+            points = self.backlog.downsample()
+            for start in range(0, len(points), BACKFILL_CHUNK_SIZE):
+                chunk = points[start:start + BACKFILL_CHUNK_SIZE]
+                result = await self.api.send_backfill([reading for reading, _ in chunk])
+                if result is None:
+                    # Server has no backfill endpoint - nothing to wait for
+                    self.backlog.clear()
+                    break
+                if not result:
+                    break
+                self.backlog.drop_oldest(sum(count for _, count in chunk))
+            _LOGGER.debug(f"Backfill for room {self.room_id} done, {len(self.backlog)} readings left")
+        finally:
+            self._backfill_running = False
+            self._save_backlog()
+
+    def next_poll_interval(self, push_connected: bool = False) -> float:
+        """Adapt the interval to slope, threshold distance and prediction age.
+
+        While the push stream is up, commands arrive without polling, so a room
+        without a plan doesn't need to be polled at the base interval.
+        """
+        thermostat = self.thermostat
+        if thermostat is None:
+            return SCAN_INTERVAL_SECONDS
+        temp = thermostat.current_temperature
+        if temp is not None:
+            self.scheduler.add_sample(temp)
+        low, high = thermostat.hysteresis_thresholds
+
+        max_interval = None
+        if thermostat.hvac_mode == HVACMode.AUTO and not thermostat.has_valid_plan and not push_connected:
+            # Without a plan the API is our only source of commands
+            max_interval = SCAN_INTERVAL_SECONDS
+        return self.scheduler.next_interval(temp, low, high, thermostat.prediction_age, max_interval)
@@ -0,0 +1,92 @@
+"""Adaptive, jittered per-room polling intervals."""
+from collections import deque
+import time
+import zlib
+
+from .const import (
+    SCAN_INTERVAL_SECONDS, POLL_MIN_INTERVAL_SECONDS, POLL_MAX_INTERVAL_SECONDS,
+    POLL_SLOPE_WINDOW, POLL_STALE_PREDICTION_SECONDS
+)
+
+# Slopes below this (°C per second, ~0.06 °C/h) count as flat
+_FLAT_SLOPE = 1.0e-5
+
+
+class AdaptivePollScheduler:
+    """Decides when a room should be polled next.
+
+    The interval is roughly half the estimated time until the temperature
+    crosses the nearest hysteresis threshold at the current slope, clamped to
+    [POLL_MIN_INTERVAL_SECONDS, POLL_MAX_INTERVAL_SECONDS]. A room near or past
+    a threshold is polled at the minimum interval, a flat room at the maximum.
+    A stale API prediction caps the interval at SCAN_INTERVAL_SECONDS.
+
+    Without a sensor batcher, rooms are spread over the base interval by a
+    deterministic per-room phase (CRC32 of the room id), so they don't all fire
+    in the same second; with one, the hub lines them up on the account's phase.
+    """
+
+    def __init__(
+        self,
+        room_id: str,
+        base_interval: float = SCAN_INTERVAL_SECONDS,
+        min_interval: float = POLL_MIN_INTERVAL_SECONDS,
+        max_interval: float = POLL_MAX_INTERVAL_SECONDS,
+    ):
+        self.room_id = room_id
+        self._base_interval = base_interval
+        self._min_interval = min_interval
+        self._max_interval = max_interval
+        self._samples = deque(maxlen=POLL_SLOPE_WINDOW)  # (monotonic time, temperature)
+        self._phase = zlib.crc32(str(room_id).encode()) / 0xFFFFFFFF
+        self.last_interval = base_interval
+
+    def initial_delay(self) -> float:
+        """Deterministic offset within the base interval for this room's first poll."""
+        return max(1.0, self._phase * self._base_interval)
+
+    def add_sample(self, temp: float, now: float = None):
+        self._samples.append((time.monotonic() if now is None else now, temp))
+
+    def slope(self) -> float:
+        """Least-squares temperature slope over the recent samples, in °C per second."""
+        n = len(self._samples)
+        if n < 2:
+            return 0.0
+        t0 = self._samples[0][0]
+        mean_t = sum(t - t0 for t, _ in self._samples) / n
+        mean_y = sum(y for _, y in self._samples) / n
+        var_t = sum((t - t0 - mean_t) ** 2 for t, _ in self._samples)
+        if var_t <= 0:
+            return 0.0
+        cov = sum((t - t0 - mean_t) * (y - mean_y) for t, y in self._samples)
+        return cov / var_t
+
+    def next_interval(
+        self,
+        temp: float,
+        low_threshold: float,
+        high_threshold: float,
+        prediction_age: float = None,
+        max_interval: float = None,
+    ) -> float:
+        """Seconds until this room should be polled again."""
+        upper = self._max_interval if max_interval is None else min(self._max_interval, max_interval)
+        if prediction_age is not None and prediction_age >= POLL_STALE_PREDICTION_SECONDS:
+            upper = min(upper, self._base_interval)
+
+        if temp is None:
+            interval = self._base_interval
+        elif temp <= low_threshold or temp >= high_threshold:
+            interval = self._min_interval
+        else:
+            slope = self.slope()
+            if abs(slope) < _FLAT_SLOPE:
+                interval = upper
+            else:
+                distance = (high_threshold - temp) if slope > 0 else (temp - low_threshold)
+                interval = 0.5 * distance / abs(slope)
+
+        interval = max(self._min_interval, min(upper, interval))
+        self.last_interval = interval
+        return interval
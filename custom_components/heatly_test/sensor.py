@@ -0,0 +1,158 @@
+from homeassistant.components.sensor import SensorEntity, SensorStateClass
+from homeassistant.const import EntityCategory, UnitOfTime
+from .const import DOMAIN, CONF_ROOM_ID
+from datetime import timedelta
+import hashlib
+import json
+import logging
+import math
+
+_LOGGER = logging.getLogger(__name__)
+
+# Diagnostic sensors only read in-memory counters, so polling them is cheap
+SCAN_INTERVAL = timedelta(seconds=60)
+
+async def async_setup_entry(hass, entry, async_add_entities):
+    """Lager sensorene for et rom (kalles av __init__.py)."""
+    entry_id = entry.entry_id
+    if DOMAIN not in hass.data or entry_id not in hass.data[DOMAIN]:
+        return
+
+    forecast = HeatlyForecastSensor(entry.data, entry_id)
+    hass.data[DOMAIN][entry_id]["forecast"] = forecast
+
+    diagnostics = [
+        HeatlyDiagnosticSensor(hass, entry.data, entry_id, *description)
+        for description in DIAGNOSTIC_SENSORS
+    ]
+    async_add_entities([forecast, *diagnostics])
+
+def _content_hash(trajectory, strategy) -> str:
+    """Stable hash of the plan content, used to skip writes when nothing changed."""
+    payload = json.dumps([trajectory, strategy], sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+class HeatlyForecastSensor(SensorEntity):
+    """Holds the API's planned trajectory and strategy for one room.
+
+    The bulky trajectory/strategy attributes are excluded from the recorder and
+    the entity is only written when the plan content actually changes, so the
+    climate entity can stay small.
+    """
+
+    _unrecorded_attributes = frozenset({"trajectory", "strategy"})
+    _attr_should_poll = False
+    _attr_icon = "mdi:chart-bell-curve-cumulative"
+
+    def __init__(self, config, entry_id):
+        room_id = config.get(CONF_ROOM_ID, "unknown")
+        self._attr_name = f"Heatly {config.get(CONF_ROOM_ID, 'Unknown')} forecast"
+        self._attr_unique_id = f"heatly_{room_id}_forecast"
+        self._entry_id = entry_id
+        self._attr_native_value = None  # Number of points in the current plan
+        self._attr_extra_state_attributes = {}
+        self._plan_hash = None
+
+    @property
+    def plan_hash(self):
+        return self._plan_hash
+
+    def update_forecast(self, trajectory, strategy) -> bool:
+        """Publish a new plan. Returns False (and writes nothing) if the content is unchanged."""
+        trajectory = trajectory or []
+        strategy = strategy or {}
+        plan_hash = _content_hash(trajectory, strategy)
+        if plan_hash == self._plan_hash:
+            return False
+
+        self._plan_hash = plan_hash
+        self._attr_native_value = len(trajectory)
+        self._attr_extra_state_attributes = {
+            "trajectory": trajectory,
+            "strategy": strategy,
+            "plan_hash": plan_hash[:12],
+        }
+        if self.hass is not None:
+            self.async_write_ha_state()
+        return True
+
+
+def _finite(value):
+    return None if value is None or math.isinf(value) else value
+
+def _room_metrics(data_store):
+    thermostat = data_store.get("thermostat")
+    return thermostat.metrics if thermostat is not None else None
+
+# (key, name, unit, state class, enabled by default, value function, attributes function)
+DIAGNOSTIC_SENSORS = (
+    (
+        "api_requests", "API requests", None, SensorStateClass.TOTAL_INCREASING, True,
+        lambda d: d["api"].metrics.requests,
+        lambda d: {
+            "by_status": d["api"].metrics.as_dict()["by_status"],
+            "circuit_rejections": d["api"].metrics.circuit_rejections,
+            "host_requests": d["api"].host_metrics.requests,
+        },
+    ),
+    (
+        "api_timeouts", "API timeouts", None, SensorStateClass.TOTAL_INCREASING, True,
+        lambda d: d["api"].metrics.timeouts,
+        lambda d: {"host_timeouts": d["api"].host_metrics.timeouts},
+    ),
+    (
+        "api_latency_p95", "API latency p95", UnitOfTime.MILLISECONDS, SensorStateClass.MEASUREMENT, False,
+        lambda d: _finite(d["api"].metrics.latency_ms.percentile(0.95)),
+        lambda d: {"host_p95": _finite(d["api"].host_metrics.latency_ms.percentile(0.95))},
+    ),
+    (
+        "uploads_suppressed", "Sensor uploads suppressed", None, SensorStateClass.TOTAL_INCREASING, False,
+        lambda d: d["room"].reporting.suppressed,
+        lambda d: {"sent": d["room"].reporting.sent, "reasons": dict(d["room"].reporting.reasons)},
+    ),
+    (
+        "heater_switches", "Heater switches", None, SensorStateClass.TOTAL_INCREASING, True,
+        lambda d: _room_metrics(d).heater_switches if _room_metrics(d) else None,
+        None,
+    ),
+    (
+        "failsafe_time", "Time in failsafe", UnitOfTime.SECONDS, SensorStateClass.TOTAL_INCREASING, True,
+        lambda d: int(_room_metrics(d).failsafe_seconds()) if _room_metrics(d) else None,
+        None,
+    ),
+    (
+        "last_response_age", "Last API response age", UnitOfTime.SECONDS, SensorStateClass.MEASUREMENT, False,
+        lambda d: _room_age(d),
+        None,
+    ),
+)
+
+def _room_age(data_store):
+    metrics = _room_metrics(data_store)
+    age = metrics.last_response_age() if metrics else None
+    return int(age) if age is not None else None
+
+class HeatlyDiagnosticSensor(SensorEntity):
+    """Exposes one of the room's in-memory performance counters."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def __init__(self, hass, config, entry_id, key, name, unit, state_class, enabled, value_fn, attrs_fn):
+        room_id = config.get(CONF_ROOM_ID, "unknown")
+        self.hass = hass
+        self._entry_id = entry_id
+        self._value_fn = value_fn
+        self._attrs_fn = attrs_fn
+        self._attr_name = f"Heatly {config.get(CONF_ROOM_ID, 'Unknown')} {name}"
+        self._attr_unique_id = f"heatly_{room_id}_{key}"
+        self._attr_native_unit_of_measurement = unit
+        self._attr_state_class = state_class
+        self._attr_entity_registry_enabled_default = enabled
+
+    async def async_update(self):
+        data_store = self.hass.data.get(DOMAIN, {}).get(self._entry_id)
+        if not data_store:
+            return
+        self._attr_native_value = self._value_fn(data_store)
+        if self._attrs_fn is not None:
+            self._attr_extra_state_attributes = self._attrs_fn(data_store)
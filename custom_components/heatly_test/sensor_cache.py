@@ -0,0 +1,119 @@
+"""Event-driven cache of parsed sensor values."""
+import logging
+import time
+
+from homeassistant.core import callback
+from homeassistant.helpers.event import async_track_state_change_event
+
+try:
+    from homeassistant.helpers.event import async_track_state_report_event
+except ImportError:  # Older HA versions have no state_reported events
+    async_track_state_report_event = None
+
+from .const import SENSOR_STALE_SECONDS
+
+_LOGGER = logging.getLogger(__name__)
+
+_INVALID_STATES = ("unknown", "unavailable", None)
+
+
+class SensorReading:
+    """Last parsed value of one sensor."""
+
+    __slots__ = ("value", "updated_at", "valid", "stale_warned")
+
+    def __init__(self):
+        self.value = None
+        self.updated_at = 0.0  # Epoch seconds of the last update/report from the sensor
+        self.valid = False
+        self.stale_warned = False
+
+
+class SensorCache:
+    """Keeps parsed float values for a few sensors, updated from state events.
+
+    Values are parsed once per state change instead of on every read. On HA
+    versions with state_reported events, a sensor that has not reported for
+    stale_after seconds is treated as unavailable. Older versions only see
+    state changes, so a working sensor with a flat reading looks the same as a
+    dead one; there staleness is only reported (is_stale) and the last value
+    is still used.
+    """
+
+    def __init__(self, hass, entity_ids, stale_after: float = SENSOR_STALE_SECONDS):
+        self.hass = hass
+        self._stale_after = stale_after
+        self._readings = {entity_id: SensorReading() for entity_id in entity_ids if entity_id}
+        self.reports_supported = async_track_state_report_event is not None
+
+    @callback
+    def async_start(self):
+        """Prime the cache from the current states and subscribe. Returns an unsubscribe callable."""
+        for entity_id in self._readings:
+            self._update(entity_id, self.hass.states.get(entity_id))
+
+        entity_ids = list(self._readings)
+        unsubs = [async_track_state_change_event(self.hass, entity_ids, self._async_state_event)]
+        if async_track_state_report_event is not None:
+            unsubs.append(async_track_state_report_event(self.hass, entity_ids, self._async_state_event))
+
+        @callback
+        def unsubscribe():
+            for unsub in unsubs:
+                unsub()
+
+        return unsubscribe
+
+    @callback
+    def _async_state_event(self, event):
+        self._update(event.data.get("entity_id"), event.data.get("new_state"))
+
+    def _update(self, entity_id, state):
+        reading = self._readings.get(entity_id)
+        if reading is None:
+            return
+        if state is None or state.state in _INVALID_STATES:
+            reading.valid = False
+            return
+
+        try:
+            reading.value = float(state.state)
+            reading.valid = True
+        except (ValueError, TypeError):
+            reading.valid = False
+            return
+
+        last_seen = getattr(state, "last_reported", None) or state.last_updated
+        reading.updated_at = last_seen.timestamp() if last_seen else time.time()
+        reading.stale_warned = False
+
+    def is_stale(self, entity_id, now: float = None) -> bool:
+        reading = self._readings.get(entity_id)
+        if reading is None or not reading.valid:
+            return False
+        now = time.time() if now is None else now
+        return now - reading.updated_at > self._stale_after
+
+    def get(self, entity_id):
+        """Parsed value, or None if the sensor is unknown, unparseable or (reliably) stale."""
+        reading = self._readings.get(entity_id)
+        if reading is None or not reading.valid:
+            return None
+        if self.is_stale(entity_id):
+            if not self.reports_supported:
+                # Kan ikke skille flat verdi fra død sensor - bruk siste verdi
+                if not reading.stale_warned:
+                    reading.stale_warned = True
+                    _LOGGER.info(
+                        f"Sensor {entity_id} has not changed for {self._stale_after / 60:.0f} minutes - "
+                        f"still using its last value"
+                    )
+                return reading.value
+            if not reading.stale_warned:
+                reading.stale_warned = True
+                _LOGGER.warning(
+                    f"Sensor {entity_id} has not reported for {self._stale_after / 60:.0f} minutes - "
+                    f"treating it as unavailable"
+                )
+            return None
+        return reading.value
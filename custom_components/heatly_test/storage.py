@@ -0,0 +1,62 @@
+"""Writes of room state to HA storage on a fixed cadence."""
+from homeassistant.const import EVENT_HOMEASSISTANT_FINAL_WRITE
+from homeassistant.helpers.event import async_call_later
+
+
+class PeriodicStoreWriter:
+    """Saves a Store at most once per interval while its data keeps changing.
+
+    Store.async_delay_save restarts its delay on every call, so data that
+    changes more often than the delay is never written. Here the first change
+    arms a timer and later changes ride along with it: data that keeps
+    changing is written every `interval` seconds, and a change is on disk at
+    most `interval` seconds after it happened. Like async_delay_save, pending
+    changes are also written when HA stops (config entries are not unloaded
+    then), on EVENT_HOMEASSISTANT_FINAL_WRITE.
+    """
+
+    def __init__(self, hass, store, data_func, interval: float):
+        self.hass = hass
+        self.store = store
+        self._data_func = data_func
+        self._interval = interval
+        self._dirty = False
+        self._cancel_timer = None
+        self._unsub_final_write = None
+
+        # Counters
+        self.saves = 0
+
+    def schedule(self):
+        """Mark the data changed; it is written when the current interval ends."""
+        self._dirty = True
+        if self._cancel_timer is None:
+            self._cancel_timer = async_call_later(self.hass, self._interval, self._async_timer)
+        if self._unsub_final_write is None:
+            self._unsub_final_write = self.hass.bus.async_listen_once(
+                EVENT_HOMEASSISTANT_FINAL_WRITE, self._async_final_write
+            )
+
+    async def _async_timer(self, _now):
+        self._cancel_timer = None
+        await self.async_flush()
+
+    async def _async_final_write(self, _event):
+        self._unsub_final_write = None  # A fired listen_once is already gone
+        await self.async_flush()
+
+    async def async_flush(self):
+        """Write pending changes now (timer, entry unload or HA shutdown)."""
+        self.cancel()
+        if self._dirty:
+            self._dirty = False
+            await self.store.async_save(self._data_func())
+            self.saves += 1
+
+    def cancel(self):
+        if self._cancel_timer is not None:
+            self._cancel_timer()
+            self._cancel_timer = None
+        if self._unsub_final_write is not None:
+            self._unsub_final_write()
+            self._unsub_final_write = None
@@ -0,0 +1,166 @@
+"""Online thermal model of a room, learned from the sensor stream and heater state."""
+import math
+
+from .const import (
+    HEAT_MODEL_SAMPLE_SECONDS, HEAT_MODEL_MAX_GAP_SECONDS, HEAT_MODEL_HEATER_LAG_SECONDS,
+    HEAT_MODEL_FORGETTING, HEAT_MODEL_MIN_SAMPLES, HEAT_MODEL_MAX_RATE, HEAT_MODEL_DEFAULT_OUTDOOR
+)
+
+_FEATURES = 2
+_INITIAL_COVARIANCE = 100.0
+_MAX_COVARIANCE_TRACE = 1.0e4  # Stop inflating P when the input carries no new information
+_PREDICT_STEP_SECONDS = 60.0
+
+
+def _identity(scale: float) -> list:
+    return [[scale if i == j else 0.0 for j in range(_FEATURES)] for i in range(_FEATURES)]
+
+
+class RoomThermalModel:
+    """First-order room model estimated by recursive least squares.
+
+        dT/dt [°C/h] = loss * (T_out - T) + gain * effort
+
+    effort is the heater state (0/1) passed through a first-order lag of
+    HEAT_MODEL_HEATER_LAG_SECONDS, so a radiator keeps heating for a while after
+    it is switched off. Each sample costs a fixed 2x2 update with exponential
+    forgetting; nothing is kept per sample. Without an outdoor sensor T_out is
+    taken as HEAT_MODEL_DEFAULT_OUTDOOR. There is deliberately no constant
+    term: the indoor temperature barely moves under control, so a constant
+    would be indistinguishable from the loss term.
+
+    Samples are formed from readings at least HEAT_MODEL_SAMPLE_SECONDS apart,
+    which keeps the 0.1 °C sensor resolution from dominating the slope.
+    """
+
+    __slots__ = (
+        "theta", "covariance", "samples", "effort",
+        "_anchor_time", "_anchor_temp", "_last_time", "_heater_on", "_outdoor",
+        "_effort_integral", "_outdoor_integral",
+    )
+
+    def __init__(self):
+        self.theta = [0.0] * _FEATURES  # loss (1/h), gain (°C/h)
+        self.covariance = _identity(_INITIAL_COVARIANCE)
+        self.samples = 0
+        self.effort = 0.0
+        self._outdoor = HEAT_MODEL_DEFAULT_OUTDOOR
+        self._heater_on = False
+        self._reset_anchor(None, None)
+
+    def _reset_anchor(self, now, temp):
+        self._anchor_time = now
+        self._anchor_temp = temp
+        self._last_time = now
+        self._effort_integral = 0.0
+        self._outdoor_integral = 0.0
+
+    @property
+    def loss(self) -> float:
+        return self.theta[0]
+
+    @property
+    def gain(self) -> float:
+        return self.theta[1]
+
+    @property
+    def is_ready(self) -> bool:
+        """True once the model has seen enough data and its parameters make physical sense."""
+        return self.samples >= HEAT_MODEL_MIN_SAMPLES and self.loss > 0 and self.gain > 0
+
+    def observe(self, now: float, temp: float, outdoor: float, heater_on: bool) -> bool:
+        """Feed one reading. Returns True if it completed a sample and updated the model."""
+        if outdoor is not None:
+            self._outdoor = outdoor
+        if self._last_time is None or now - self._last_time > HEAT_MODEL_MAX_GAP_SECONDS or now < self._last_time:
+            # First reading, or a gap we can't integrate over - start a new interval
+            self._reset_anchor(now, temp)
+            self._heater_on = heater_on
+            return False
+
+        # Zero-order hold: the heater state since the previous reading drives the lag
+        dt = now - self._last_time
+        target = 1.0 if self._heater_on else 0.0
+        decay = math.exp(-dt / HEAT_MODEL_HEATER_LAG_SECONDS)
+        previous_effort = self.effort
+        self.effort = target + (previous_effort - target) * decay
+        self._effort_integral += 0.5 * (previous_effort + self.effort) * dt
+        self._outdoor_integral += self._outdoor * dt
+        self._last_time = now
+        self._heater_on = heater_on
+
+        elapsed = now - self._anchor_time
+        if elapsed < HEAT_MODEL_SAMPLE_SECONDS:
+            return False
+
+        rate = (temp - self._anchor_temp) / (elapsed / 3600.0)
+        features = [
+            self._outdoor_integral / elapsed - 0.5 * (temp + self._anchor_temp),
+            self._effort_integral / elapsed,
+        ]
+        self._reset_anchor(now, temp)
+        if abs(rate) > HEAT_MODEL_MAX_RATE:
+            # Window opened, sensor moved, ... - not something the model should learn
+            return False
+        self._update(features, rate)
+        return True
+
+    def _update(self, x: list, y: float):
+        """One recursive least squares step with forgetting."""
+        P = self.covariance
+        Px = [sum(P[i][j] * x[j] for j in range(_FEATURES)) for i in range(_FEATURES)]
+        denominator = HEAT_MODEL_FORGETTING + sum(x[i] * Px[i] for i in range(_FEATURES))
+        k = [value / denominator for value in Px]
+        error = y - sum(self.theta[i] * x[i] for i in range(_FEATURES))
+        self.theta = [self.theta[i] + k[i] * error for i in range(_FEATURES)]
+
+        inflate = 1.0
+        if sum(P[i][i] for i in range(_FEATURES)) < _MAX_COVARIANCE_TRACE:
+            inflate = 1.0 / HEAT_MODEL_FORGETTING
+        self.covariance = [
+            [(P[i][j] - k[i] * Px[j]) * inflate for j in range(_FEATURES)]
+            for i in range(_FEATURES)
+        ]
+        self.samples += 1
+
+    def coast_range(self, temp: float, outdoor: float, horizon: float):
+        """(min, max) temperature over the horizon if the heater is switched off now.
+
+        The lagged effort decays from its current value, so with a slow radiator
+        the maximum lies above the current temperature (the overshoot to expect).
+        """
+        outdoor = self._outdoor if outdoor is None else outdoor
+        loss, gain = self.theta
+        effort = self.effort
+        low = high = temp
+        steps = max(1, int(horizon // _PREDICT_STEP_SECONDS))
+        dt_hours = _PREDICT_STEP_SECONDS / 3600.0
+        decay = math.exp(-_PREDICT_STEP_SECONDS / HEAT_MODEL_HEATER_LAG_SECONDS)
+        for _ in range(steps):
+            temp += dt_hours * (loss * (outdoor - temp) + gain * effort)
+            effort *= decay
+            low = min(low, temp)
+            high = max(high, temp)
+        return low, high
+
+    def as_dict(self) -> dict:
+        """JSON-serialisable model state for HA storage and diagnostics."""
+        return {
+            "theta": list(self.theta),
+            "covariance": [list(row) for row in self.covariance],
+            "samples": self.samples,
+        }
+
+    def load_dict(self, data: dict):
+        """Restore parameters saved by as_dict; ignore anything malformed."""
+        try:
+            theta = [float(value) for value in data["theta"]]
+            covariance = [[float(value) for value in row] for row in data["covariance"]]
+            samples = int(data["samples"])
+        except (KeyError, TypeError, ValueError):
+            return
+        if len(theta) != _FEATURES or len(covariance) != _FEATURES or any(len(row) != _FEATURES for row in covariance):
+            return
+        self.theta = theta
+        self.covariance = covariance
+        self.samples = samples
@@ -0,0 +1,257 @@
+"""Sampled tracing of the room update path, slow-tick detection and event-loop lag.
+
+Traces are written in the Chrome trace event format (JSON), which Perfetto
+(ui.perfetto.dev) and chrome://tracing open directly.
+"""
+import asyncio
+import contextvars
+import functools
+import json
+import logging
+import random
+import time
+from collections import deque
+
+from .metrics import FixedHistogram
+from .const import (
+    TRACE_SAMPLE_RATE, TRACE_MAX_EVENTS, TRACE_EXPORT_SECONDS, TICK_BUDGET_SECONDS,
+    LOOP_LAG_INTERVAL_SECONDS, LOOP_LAG_WARN_SECONDS
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Upper bounds (ms) of the event-loop lag histogram buckets
+LOOP_LAG_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+# The trace the current task is recording into, None when the tick isn't sampled
+_active_trace = contextvars.ContextVar("heatly_active_trace", default=None)
+
+
+class _Trace:
+    """One sampled tick: where its spans go and which lane (tid) they are drawn in."""
+
+    __slots__ = ("tracer", "tid")
+
+    def __init__(self, tracer, tid: int):
+        self.tracer = tracer
+        self.tid = tid
+
+
+def traced(name: str):
+    """Decorator that records an async method as a span when the current tick is sampled.
+
+    Unsampled calls cost one context variable lookup.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            trace = _active_trace.get()
+            if trace is None:
+                return await func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                trace.tracer.add_span(name, trace.tid, start, time.perf_counter())
+        return wrapper
+    return decorator
+
+
+def traced_tick(func):
+    """Decorator for HeatlyRoom.async_send_sensor_update: the root span of one room tick.
+
+    Every tick is timed against the tick budget and the room's poll interval;
+    a sample of ticks also records the spans of everything it awaits.
+    """
+    @functools.wraps(func)
+    async def wrapper(room, *args, **kwargs):
+        tracer = room.tracer
+        if tracer is None:
+            return await func(room, *args, **kwargs)
+        trace = tracer.sample(room.room_id)
+        token = _active_trace.set(trace) if trace is not None else None
+        start = time.perf_counter()
+        try:
+            return await func(room, *args, **kwargs)
+        finally:
+            end = time.perf_counter()
+            if token is not None:
+                _active_trace.reset(token)
+            tracer.end_tick(room.room_id, trace, start, end, room.scheduler.last_interval)
+    return wrapper
+
+
+class UpdateTracer:
+    """Integration-wide tick timing and sampled span recorder.
+
+    A fraction TRACE_SAMPLE_RATE of room ticks is traced: each traced method
+    the tick awaits (API upload, HTTP attempts, response handling, heater
+    commands) becomes a complete ("X") event in that room's lane. Events are
+    kept in a ring buffer of TRACE_MAX_EVENTS and the file at `path` is
+    rewritten from it every TRACE_EXPORT_SECONDS while new events arrive.
+
+    Independently of sampling, every tick is timed: one longer than
+    TICK_BUDGET_SECONDS, or longer than the room's poll interval (so it ran
+    into the next poll), is logged and counted. Event-loop lag is measured by
+    how late a LOOP_LAG_INTERVAL_SECONDS timer fires.
+    """
+
+    def __init__(
+        self,
+        path: str = None,
+        sample_rate: float = TRACE_SAMPLE_RATE,
+        max_events: int = TRACE_MAX_EVENTS,
+        tick_budget: float = TICK_BUDGET_SECONDS,
+        lag_interval: float = LOOP_LAG_INTERVAL_SECONDS,
+    ):
+        self.path = path
+        self.sample_rate = sample_rate if path else 0.0
+        self._tick_budget = tick_budget
+        self._lag_interval = lag_interval
+        self._events = deque(maxlen=max_events)
+        self._lanes = {}  # room_id -> tid
+        self._origin = time.perf_counter()
+        self._dirty = False
+        self._lag_handle = None
+        self._lag_expected = None
+        self._export_handle = None
+        self._export_task = None
+        self.unsub_stop = None  # Set by whoever closes the tracer at shutdown
+
+        # Counters
+        self.ticks = 0
+        self.sampled = 0
+        self.slow_ticks = 0
+        self.overlapping_ticks = 0
+        self.max_tick_seconds = 0.0
+        self.loop_lag_ms = FixedHistogram(LOOP_LAG_BUCKETS_MS)
+        self.max_loop_lag_ms = 0.0
+        self.exports = 0
+
+    def _ts(self, when: float) -> float:
+        """perf_counter time as trace microseconds."""
+        return round((when - self._origin) * 1e6, 1)
+
+    def _lane(self, room_id: str) -> int:
+        tid = self._lanes.get(room_id)
+        if tid is None:
+            tid = self._lanes[room_id] = len(self._lanes) + 1
+        return tid
+
+    def sample(self, room_id: str):
+        """Decide whether this tick is traced; returns the trace to record into, or None."""
+        if not self.sample_rate or random.random() >= self.sample_rate:
+            return None
+        self.sampled += 1
+        return _Trace(self, self._lane(room_id))
+
+    def add_span(self, name: str, tid: int, start: float, end: float, args: dict = None):
+        event = {"name": name, "ph": "X", "ts": self._ts(start), "dur": round((end - start) * 1e6, 1), "pid": 1, "tid": tid}
+        if args:
+            event["args"] = args
+        self._events.append(event)
+        self._mark_dirty()
+
+    def end_tick(self, room_id: str, trace, start: float, end: float, interval: float = None):
+        duration = end - start
+        self.ticks += 1
+        self.max_tick_seconds = max(self.max_tick_seconds, duration)
+        slow = duration > self._tick_budget
+        overlapping = interval is not None and duration > interval
+        if slow or overlapping:
+            self.slow_ticks += slow
+            self.overlapping_ticks += overlapping
+            limits = [f"budget {self._tick_budget}s"] if slow else []
+            if overlapping:
+                limits.append(f"poll interval {interval:.0f}s")
+            _LOGGER.warning(f"Update for room {room_id} took {duration:.2f}s ({', '.join(limits)} exceeded)")
+        if trace is not None:
+            self.add_span("send_sensor_update", trace.tid, start, end, {
+                "room_id": room_id, "slow": slow, "overlapping": overlapping
+            })
+
+    def start(self):
+        """Start the loop lag timer. Must be called from the event loop."""
+        if self._lag_interval and self._lag_handle is None:
+            loop = asyncio.get_running_loop()
+            self._lag_expected = loop.time() + self._lag_interval
+            self._lag_handle = loop.call_at(self._lag_expected, self._measure_lag)
+
+    def _measure_lag(self):
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        lag_ms = max(0.0, now - self._lag_expected) * 1000
+        self.loop_lag_ms.observe(lag_ms)
+        self.max_loop_lag_ms = max(self.max_loop_lag_ms, lag_ms)
+        if lag_ms >= LOOP_LAG_WARN_SECONDS * 1000:
+            _LOGGER.warning(f"Event loop was blocked for {lag_ms:.0f} ms")
+        if self.sample_rate:
+            self._events.append({"name": "loop_lag_ms", "ph": "C", "ts": self._ts(time.perf_counter()), "pid": 1,
+                                 "args": {"lag": round(lag_ms, 2)}})
+        self._lag_expected = now + self._lag_interval
+        self._lag_handle = loop.call_at(self._lag_expected, self._measure_lag)
+
+    def _mark_dirty(self):
+        self._dirty = True
+        if self._export_handle is None and self._export_task is None and self.path:
+            self._export_handle = asyncio.get_running_loop().call_later(TRACE_EXPORT_SECONDS, self._start_export)
+
+    def _start_export(self):
+        self._export_handle = None
+        self._export_task = asyncio.get_running_loop().create_task(self.async_export())
+
+    def as_trace(self) -> dict:
+        """Buffered events as a Chrome trace event document."""
+        lanes = [
+            {"name": "thread_name", "ph": "M", "pid": 1, "tid": tid, "args": {"name": room_id}}
+            for room_id, tid in self._lanes.items()
+        ]
+        return {
+            "traceEvents": [{"name": "process_name", "ph": "M", "pid": 1, "args": {"name": "heatly"}}, *lanes, *self._events],
+            "displayTimeUnit": "ms",
+        }
+
+    async def async_export(self):
+        """Write the buffered events to the trace file (in the executor)."""
+        try:
+            if not self.path or not self._dirty:
+                return
+            self._dirty = False
+            text = json.dumps(self.as_trace(), separators=(",", ":"))
+            await asyncio.get_running_loop().run_in_executor(None, self._write, text)
+        finally:
+            self._export_task = None
+
+    def _write(self, text: str):
+        try:
+            with open(self.path, "w", encoding="utf-8") as f:
+                f.write(text)
+            self.exports += 1
+        except OSError as err:
+            _LOGGER.warning(f"Could not write trace to {self.path}: {err}")
+
+    async def async_close(self):
+        """Stop the timers and write out what is buffered."""
+        for handle in (self._lag_handle, self._export_handle):
+            if handle is not None:
+                handle.cancel()
+        self._lag_handle = None
+        self._export_handle = None
+        if self._export_task is not None:
+            await self._export_task
+        await self.async_export()
+
+    def as_dict(self) -> dict:
+        return {
+            "sample_rate": self.sample_rate,
+            "path": self.path,
+            "ticks": self.ticks,
+            "sampled": self.sampled,
+            "slow_ticks": self.slow_ticks,
+            "overlapping_ticks": self.overlapping_ticks,
+            "max_tick_seconds": round(self.max_tick_seconds, 3),
+            "buffered_events": len(self._events),
+            "exports": self.exports,
+            "loop_lag_ms": self.loop_lag_ms.as_dict(),
+            "max_loop_lag_ms": round(self.max_loop_lag_ms, 1),
+        }
@@ -0,0 +1,164 @@
+"""Optional recording of API traffic to a compact, rotated JSON-lines file.
+
+The recording can be replayed against the local stand-in server with
+benchmarks/replay.py to reproduce production traffic without the cloud.
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+from urllib.parse import urlsplit
+
+from .const import API_RECORD_MAX_BYTES, API_RECORD_BACKUPS, API_RECORD_FLUSH_SECONDS
+
+_LOGGER = logging.getLogger(__name__)
+
+# Records held in memory while a write is slow; beyond this new ones are dropped
+_MAX_PENDING_RECORDS = 5000
+
+
+def recording_files(path: str) -> list:
+    """Existing files of a recording, oldest first (path.N ... path.1, path)."""
+    files = []
+    index = 1
+    while os.path.exists(f"{path}.{index}"):
+        files.append(f"{path}.{index}")
+        index += 1
+    files.reverse()
+    if os.path.exists(path):
+        files.append(path)
+    return files
+
+
+def read_recording(path: str):
+    """Yield the records of a recording, oldest first, skipping truncated lines."""
+    for name in recording_files(path):
+        with open(name, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+
+class ApiTrafficRecorder:
+    """Appends one JSON line per API request to a file with size-based rotation.
+
+    Each record holds the wall-clock time (t), method (m), URL path (p),
+    request body (q), status (s, None for timeouts/connection errors),
+    latency in ms (l), response body (r) and error type (e); empty fields are
+    left out. Headers are never recorded, so the API key stays out of the
+    file. Records are buffered and written from the executor every
+    API_RECORD_FLUSH_SECONDS. When the file would pass max_bytes it is
+    rotated to path.1 (path.1 to path.2, ...), keeping `backups` old files,
+    so a recording never takes more than (backups + 1) * max_bytes on disk.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int = API_RECORD_MAX_BYTES,
+        backups: int = API_RECORD_BACKUPS,
+        flush_seconds: float = API_RECORD_FLUSH_SECONDS,
+    ):
+        self.path = path
+        self._max_bytes = max_bytes
+        self._backups = backups
+        self._flush_seconds = flush_seconds
+        self._pending = []
+        self._flush_handle = None
+        self._flush_task = None
+        self.unsub_stop = None  # Set by whoever closes the recorder at shutdown
+
+        # Counters
+        self.records = 0
+        self.dropped = 0
+        self.bytes_written = 0
+        self.rotations = 0
+        self.write_errors = 0
+
+    def record(self, method: str, url: str, request_body, status, response_body, elapsed: float, error: str = None):
+        """Queue one request/response for writing. Never raises and never blocks on disk."""
+        if len(self._pending) >= _MAX_PENDING_RECORDS:
+            self.dropped += 1
+            return
+        entry = {
+            "t": round(time.time(), 3),
+            "m": method,
+            "p": urlsplit(url).path,
+            "s": status,
+            "l": round(elapsed * 1000, 1),
+        }
+        if request_body is not None:
+            entry["q"] = request_body
+        if response_body is not None:
+            entry["r"] = response_body
+        if error is not None:
+            entry["e"] = error
+        try:
+            line = json.dumps(entry, separators=(",", ":"), ensure_ascii=False) + "\n"
+        except (TypeError, ValueError):
+            self.dropped += 1
+            return
+        self._pending.append(line)
+        self.records += 1
+        if self._flush_handle is None and self._flush_task is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self._flush_seconds, self._start_flush)
+
+    def _start_flush(self):
+        self._flush_handle = None
+        self._flush_task = asyncio.get_running_loop().create_task(self._async_flush())
+
+    async def _async_flush(self):
+        try:
+            while self._pending:
+                lines, self._pending = self._pending, []
+                await asyncio.get_running_loop().run_in_executor(None, self._write, lines)
+        finally:
+            self._flush_task = None
+
+    def _write(self, lines: list):
+        """Append lines to the file, rotating first if they would not fit (runs in the executor)."""
+        data = "".join(lines).encode("utf-8")
+        try:
+            size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+            if size and size + len(data) > self._max_bytes:
+                self._rotate()
+            with open(self.path, "ab") as f:
+                f.write(data)
+            self.bytes_written += len(data)
+        except OSError as err:
+            self.write_errors += 1
+            self.dropped += len(lines)
+            _LOGGER.warning(f"Could not write API recording to {self.path}: {err}")
+
+    def _rotate(self):
+        if self._backups <= 0:
+            os.remove(self.path)
+        else:
+            for index in range(self._backups - 1, 0, -1):
+                if os.path.exists(f"{self.path}.{index}"):
+                    os.replace(f"{self.path}.{index}", f"{self.path}.{index + 1}")
+            os.replace(self.path, f"{self.path}.1")
+        self.rotations += 1
+
+    async def async_close(self):
+        """Write whatever is still buffered."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._flush_task is not None:
+            await self._flush_task
+        await self._async_flush()
+
+    def as_dict(self) -> dict:
+        return {
+            "path": self.path,
+            "records": self.records,
+            "pending": len(self._pending),
+            "dropped": self.dropped,
+            "bytes_written": self.bytes_written,
+            "rotations": self.rotations,
+            "write_errors": self.write_errors,
+        }
@@ -0,0 +1,120 @@
+"""Local execution of the heater plan (trajectory) returned by the Heatly API."""
+from bisect import bisect_right
+from datetime import datetime
+import time
+
+from .const import PLAN_MAX_AGE_SECONDS
+
+
+def _parse_timestamp(value):
+    """Return a point's timestamp as epoch seconds, or None if it can't be parsed."""
+    if isinstance(value, (int, float)):
+        # Accept both seconds and milliseconds since epoch
+        return float(value) / 1000 if value > 1e12 else float(value)
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+        except ValueError:
+            return None
+    return None
+
+
+def _parse_heater_state(point: dict):
+    """Return a point's planned heater state as bool, or None if it has none."""
+    if "heater_state" in point:
+        value = point["heater_state"]
+        if isinstance(value, str):
+            return value.lower() == "on"
+        return bool(value)
+    if "heater_on" in point:
+        return bool(point["heater_on"])
+    return None
+
+
+def plan_fields(response: dict):
+    """The parts of a control response that TrajectoryPlan.from_response reads, or None if it has no plan.
+
+    Used to persist a response for restore without its temperature forecast.
+    """
+    points = []
+    for point in response.get("trajectory") or []:
+        if not isinstance(point, dict):
+            continue
+        heater_state = _parse_heater_state(point)
+        if heater_state is not None:
+            points.append({
+                "timestamp": point.get("timestamp", point.get("time")),
+                "heater_state": "on" if heater_state else "off",
+            })
+    if not points:
+        return None
+    fields = {"trajectory": points}
+    for key in ("heater_state", "heater_on", "prediction_age_seconds"):
+        if key in response:
+            fields[key] = response[key]
+    return fields
+
+
+class TrajectoryPlan:
+    """Time-indexed heater plan, executed locally until it expires.
+
+    The API trajectory is stored as two parallel sorted lists (timestamps and
+    heater states); a lookup is a binary search. Each point's state holds until
+    the next point. The plan expires PLAN_MAX_AGE_SECONDS after the prediction
+    was made (received time minus prediction_age_seconds), or one step after the
+    last point, whichever comes first.
+    """
+
+    __slots__ = ("timestamps", "heater_states", "generated_at", "expires_at")
+
+    def __init__(self, timestamps, heater_states, generated_at: float, max_age: float = PLAN_MAX_AGE_SECONDS):
+        self.timestamps = timestamps
+        self.heater_states = heater_states
+        self.generated_at = generated_at
+
+        last_step = timestamps[-1] - timestamps[-2] if len(timestamps) > 1 else 0
+        self.expires_at = min(generated_at + max_age, timestamps[-1] + last_step)
+
+    @classmethod
+    def from_response(cls, response: dict, now: float = None):
+        """Build a plan from an API control response. Returns None if it has no usable points."""
+        now = time.time() if now is None else now
+        points = []
+        for point in response.get("trajectory") or []:
+            if not isinstance(point, dict):
+                continue
+            timestamp = _parse_timestamp(point.get("timestamp", point.get("time")))
+            heater_state = _parse_heater_state(point)
+            if timestamp is not None and heater_state is not None:
+                points.append((timestamp, heater_state))
+
+        points.sort(key=lambda p: p[0])
+
+        # The instantaneous command covers the gap until the first planned point
+        current_state = _parse_heater_state(response)
+        if current_state is not None and points and now < points[0][0]:
+            points.insert(0, (now, current_state))
+
+        if not points:
+            return None
+
+        try:
+            prediction_age = float(response.get("prediction_age_seconds") or 0)
+        except (TypeError, ValueError):
+            prediction_age = 0.0
+        return cls(
+            [p[0] for p in points],
+            [p[1] for p in points],
+            generated_at=now - prediction_age,
+        )
+
+    def is_valid(self, now: float = None) -> bool:
+        now = time.time() if now is None else now
+        return self.timestamps[0] <= now < self.expires_at
+
+    def heater_state_at(self, now: float = None):
+        """Planned heater state at a given time, or None if outside the plan."""
+        now = time.time() if now is None else now
+        if not self.is_valid(now):
+            return None
+        return self.heater_states[bisect_right(self.timestamps, now) - 1]
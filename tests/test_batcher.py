@@ -0,0 +1,80 @@
+"""The sensor batcher: metrics per room and host, its own trace context, and nothing left running after close."""
+import asyncio
+
+from benchmarks.hass_stub import HassStub
+from benchmarks.load_test import build_rooms, set_temperature
+from benchmarks.stand_in_server import StandInApi, StandInConfig, start_stand_in_server
+from custom_components.heatly_test.tracing import UpdateTracer, _Trace, _active_trace
+
+
+def test_batch_counts_for_every_room_and_once_for_the_host():
+    async def run():
+        api = StandInApi(StandInConfig(latency_ms=1, latency_jitter_ms=0))
+        runner, base_url = await start_stand_in_server(api)
+        hass = HassStub()
+        pool, rooms = build_rooms(hass, base_url, 5, 1, 0.05)
+        try:
+            for room, thermostat, config in rooms:
+                set_temperature(hass, thermostat, config["temp_sensor"], 20.0)
+            await asyncio.gather(*(room.api.send_sensor_data(20.0) for room, _, _ in rooms))
+        finally:
+            await pool.async_close()
+            await runner.cleanup()
+
+        assert api.counters["batch"] == 1
+        assert [room.api.metrics.requests for room, _, _ in rooms] == [1, 1, 1, 1, 1]
+        assert rooms[0][0].api.host_metrics.requests == 1
+        assert rooms[0][0].api.metrics.by_status == {200: 1}
+
+    asyncio.run(run())
+
+
+def test_flush_does_not_run_in_the_first_rooms_trace():
+    async def run():
+        hass = HassStub()
+        pool, rooms = build_rooms(hass, "http://127.0.0.1:9", 2, 1, 0.01)
+        batcher = rooms[0][0].api._batcher
+        tracer = UpdateTracer()
+        seen = []
+
+        async def send_batch(pending):
+            seen.append(_active_trace.get())
+            return {}
+
+        batcher._send_batch = send_batch
+
+        async def upload(room, trace):
+            _active_trace.set(trace)
+            return await room.api.send_sensor_data(20.0)
+
+        try:
+            await asyncio.gather(*(upload(room, _Trace(tracer, tid)) for tid, (room, _, _) in enumerate(rooms, 1)))
+        finally:
+            await pool.async_close()
+        assert seen == [None]
+
+    asyncio.run(run())
+
+
+def test_close_cancels_a_batch_in_flight_and_releases_its_rooms():
+    async def run():
+        api = StandInApi(StandInConfig(latency_ms=2000, latency_jitter_ms=0))
+        runner, base_url = await start_stand_in_server(api)
+        hass = HassStub()
+        pool, rooms = build_rooms(hass, base_url, 3, 1, 0.01)
+        batcher = rooms[0][0].api._batcher
+        try:
+            uploads = [asyncio.ensure_future(room.api.send_sensor_data(20.0)) for room, _, _ in rooms]
+            await asyncio.sleep(0.1)
+            tasks = list(batcher._flush_tasks)
+            assert len(tasks) == 1
+
+            batcher.close()
+            assert await asyncio.wait_for(asyncio.gather(*uploads), 1.0) == [None, None, None]
+            assert tasks[0].cancelled()
+            assert not batcher._flush_tasks
+        finally:
+            await pool.async_close()
+            await runner.cleanup()
+
+    asyncio.run(run())
@@ -0,0 +1,69 @@
+"""Rooms on one account share the account's poll phase when batching, and keep their own otherwise."""
+import asyncio
+import time
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.heatly_test.api_client import HeatlySensorBatcher
+from custom_components.heatly_test.const import SCAN_INTERVAL_SECONDS
+from custom_components.heatly_test.hub import HeatlyHub
+from custom_components.heatly_test.scheduler import AdaptivePollScheduler
+from custom_components.heatly_test import hub as hub_module
+
+
+class _Room:
+    def __init__(self, index: int):
+        self.entry_id = f"entry_{index}"
+        self.room_id = f"room_{index}"
+        self.scheduler = AdaptivePollScheduler(self.room_id)
+
+
+def test_rooms_on_one_account_are_first_polled_together(tmp_path, monkeypatch):
+    monkeypatch.setattr(hub_module, "PUSH_ENABLED", False)
+
+    async def run():
+        hass = HomeAssistant(str(tmp_path))
+        hub = HeatlyHub(hass, "http://127.0.0.1:9", "key", batcher=HeatlySensorBatcher("http://127.0.0.1:9", "key"))
+        for index in range(50):
+            hub.add_room(_Room(index), f"sensor.room_{index}")
+        first_polls = set(hub._due.values())
+        assert len(first_polls) == 1
+        assert 1.0 <= first_polls.pop() - time.monotonic() <= SCAN_INTERVAL_SECONDS
+
+        # Another account gets its own, deterministic phase
+        other = HeatlyHub(hass, "http://127.0.0.1:9", "other-key")
+        again = HeatlyHub(hass, "http://127.0.0.1:9", "other-key")
+        assert abs(other._first_poll - again._first_poll) < 0.1
+        assert abs(other._first_poll - hub._first_poll) > 1.0
+
+        # A room added once the phase has passed joins the account's next slot
+        phase = hub._first_poll
+        hub._first_poll -= SCAN_INTERVAL_SECONDS
+        hub.add_room(_Room(50), "sensor.room_50")
+        assert hub._due["entry_50"] == phase
+
+        hub.async_shutdown()
+        await hass.async_stop(force=True)
+
+    asyncio.run(run())
+
+
+def test_rooms_without_a_batcher_keep_their_own_phase(tmp_path, monkeypatch):
+    monkeypatch.setattr(hub_module, "PUSH_ENABLED", False)
+
+    async def run():
+        hass = HomeAssistant(str(tmp_path))
+        unsupported = HeatlySensorBatcher("http://127.0.0.1:9", "key")
+        unsupported.supported = False
+        for batcher in (None, unsupported):
+            hub = HeatlyHub(hass, "http://127.0.0.1:9", "key", batcher=batcher)
+            for index in range(50):
+                hub.add_room(_Room(index), f"sensor.room_{index}")
+            first_polls = sorted(hub._due.values())
+            assert len(set(first_polls)) == 50
+            # Spread over the base interval, not one burst
+            assert first_polls[-1] - first_polls[0] > SCAN_INTERVAL_SECONDS / 2
+            hub.async_shutdown()
+        await hass.async_stop(force=True)
+
+    asyncio.run(run())
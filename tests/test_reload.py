@@ -0,0 +1,199 @@
+"""Reloading an entry leaves exactly one update loop behind, unloading the last one releases it,
+and removing an entry deletes what it stored.
+
+Runs async_setup_entry/async_unload_entry on a real HomeAssistant core so
+timers and state listeners are HA's own; the climate/sensor platforms are
+not set up, apart from a thermostat attached by hand where a test needs one.
+"""
+import asyncio
+import logging
+
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from benchmarks.stand_in_server import StandInApi, StandInConfig, start_stand_in_server
+from custom_components import heatly_test
+from custom_components.heatly_test import async_setup_entry, async_unload_entry, async_remove_entry, hub as hub_module
+from custom_components.heatly_test.climate import HeatlyThermostat
+from custom_components.heatly_test.const import (
+    DOMAIN, CONF_ROOM_ID, CONF_TEMP_SENSOR, CONF_HEATER_SWITCHES, CONF_API_URL, CONF_API_KEY,
+    DATA_HUBS, DATA_BATCHERS, DATA_SESSION_POOL,
+    STORAGE_VERSION, STORAGE_KEY_BACKLOG, STORAGE_KEY_THERMAL_MODEL, STORAGE_KEY_LAST_RESPONSE
+)
+
+API_URL = "http://127.0.0.1:9"
+RELOADS = 5
+
+
+class _ConfigEntries:
+    def __init__(self, hass, teardown_seconds: float = 0.0):
+        self.hass = hass
+        self._teardown_seconds = teardown_seconds
+
+    async def async_forward_entry_setups(self, entry, platforms):
+        return True
+
+    async def async_unload_platforms(self, entry, platforms):
+        # Like entity removal: the thermostat loses hass, and tearing the platforms down takes a moment
+        thermostat = self.hass.data.get(DOMAIN, {}).get(entry.entry_id, {}).get("thermostat")
+        if thermostat is not None:
+            thermostat.hass = None
+        await asyncio.sleep(self._teardown_seconds)
+        return True
+
+
+class _Entry:
+    def __init__(self, entry_id: str, room_id: str, api_url: str = API_URL):
+        self.entry_id = entry_id
+        self.data = {
+            CONF_ROOM_ID: room_id,
+            CONF_TEMP_SENSOR: f"sensor.{room_id}_temperature",
+            CONF_HEATER_SWITCHES: [f"switch.{room_id}_heater"],
+            CONF_API_URL: api_url,
+            CONF_API_KEY: "key",
+        }
+        self.options = {}
+        self._on_unload = []
+
+    def async_on_unload(self, func):
+        self._on_unload.append(func)
+
+    def add_update_listener(self, listener):
+        return lambda: None
+
+    async def async_setup(self, hass):
+        assert await async_setup_entry(hass, self)
+
+    async def async_unload(self, hass):
+        # ConfigEntry runs the on-unload callbacks after async_unload_entry
+        assert await async_unload_entry(hass, self)
+        while self._on_unload:
+            self._on_unload.pop()()
+
+
+def _timers(hass) -> int:
+    return sum(1 for handle in hass.loop._scheduled if not handle.cancelled())
+
+
+def _state_listeners(hass) -> int:
+    return hass.bus.async_listeners().get(EVENT_STATE_CHANGED, 0)
+
+
+def test_reloads_leave_one_loop_and_unload_releases_it(tmp_path, monkeypatch):
+    monkeypatch.setattr(hub_module, "PUSH_ENABLED", False)
+
+    async def run():
+        hass = HomeAssistant(str(tmp_path))
+        hass.config_entries = _ConfigEntries(hass)
+        baseline_timers = _timers(hass)
+        kitchen, bedroom = _Entry("entry_kitchen", "kitchen"), _Entry("entry_bedroom", "bedroom")
+        await kitchen.async_setup(hass)
+        await bedroom.async_setup(hass)
+        timers = _timers(hass)
+
+        for _ in range(RELOADS):
+            await kitchen.async_unload(hass)
+            await kitchen.async_setup(hass)
+
+        hubs = list(hass.data[DATA_HUBS].values())
+        assert len(hubs) == 1
+        hub = hubs[0]
+        assert len(hub) == 2
+        assert hub._cancel_timer is not None
+        assert _timers(hass) == timers
+        assert _state_listeners(hass) == 1
+        assert len(hass.data[DATA_BATCHERS]) == 1
+        assert hub.batcher._pending == {}
+        session = hub.session
+
+        await kitchen.async_unload(hass)
+        await bedroom.async_unload(hass)
+        await hass.async_block_till_done()
+
+        assert hass.data[DOMAIN] == {}
+        assert hass.data[DATA_HUBS] == {}
+        assert hass.data[DATA_BATCHERS] == {}
+        assert hub._cancel_timer is None
+        assert hub.batcher._flush_handle is None
+        assert _state_listeners(hass) == 0
+        assert _timers(hass) == baseline_timers
+        assert session.closed
+        assert hass.data[DATA_SESSION_POOL]._sessions == {}
+        await hass.async_stop(force=True)
+
+    asyncio.run(run())
+
+
+def test_removing_an_entry_deletes_its_stored_state(tmp_path, monkeypatch):
+    monkeypatch.setattr(hub_module, "PUSH_ENABLED", False)
+
+    async def run():
+        hass = HomeAssistant(str(tmp_path))
+        hass.config_entries = _ConfigEntries(hass)
+        kitchen, bedroom = _Entry("entry_kitchen", "kitchen"), _Entry("entry_bedroom", "bedroom")
+        keys = (STORAGE_KEY_BACKLOG, STORAGE_KEY_THERMAL_MODEL, STORAGE_KEY_LAST_RESPONSE)
+        for entry in (kitchen, bedroom):
+            for key in keys:
+                await Store(hass, STORAGE_VERSION, key.format(entry_id=entry.entry_id)).async_save({"saved": True})
+
+        await kitchen.async_setup(hass)
+        await kitchen.async_unload(hass)
+        await async_remove_entry(hass, kitchen)
+
+        storage = tmp_path / ".storage"
+        for key in keys:
+            assert not (storage / key.format(entry_id=kitchen.entry_id)).exists()
+            assert (storage / key.format(entry_id=bedroom.entry_id)).exists()
+        await hass.async_stop(force=True)
+
+    asyncio.run(run())
+
+
+def test_unload_during_an_update_never_touches_the_removed_thermostat(tmp_path, monkeypatch, caplog):
+    monkeypatch.setattr(hub_module, "PUSH_ENABLED", False)
+    monkeypatch.setattr(heatly_test, "BATCH_SENSOR_UPLOADS", False)
+
+    async def run():
+        api = StandInApi(StandInConfig(latency_ms=300, latency_jitter_ms=0))
+        runner, base_url = await start_stand_in_server(api)
+        hass = HomeAssistant(str(tmp_path))
+        hass.config_entries = _ConfigEntries(hass, teardown_seconds=0.5)
+        kitchen = _Entry("entry_kitchen", "kitchen", base_url)
+        await kitchen.async_setup(hass)
+
+        data = hass.data[DOMAIN][kitchen.entry_id]
+        thermostat = HeatlyThermostat(hass, data["api"], kitchen.data, kitchen.entry_id)
+        thermostat.hass = hass
+        writes, errors = [], []
+
+        def write_state():
+            if thermostat.hass is None:
+                errors.append("write after removal")
+                raise RuntimeError("Attribute hass is None")
+            writes.append(1)
+
+        thermostat.async_write_ha_state = write_state
+        data["thermostat"] = thermostat
+        sensor_id = kitchen.data[CONF_TEMP_SENSOR]
+        hass.states.async_set(sensor_id, "20.0")
+        thermostat._sensors._update(sensor_id, hass.states.get(sensor_id))
+
+        hub = data["hub"]
+        hub._track(kitchen.entry_id, data["room"].updater.async_trigger())
+        await asyncio.sleep(0.1)
+        assert api.counters.get("sensor") == 1  # The upload is waiting for the server
+
+        await kitchen.async_unload(hass)
+        await asyncio.sleep(0.5)
+        assert errors == []
+        # update_from_response logs (and swallows) whatever fails on a removed entity
+        assert not [
+            record for record in caplog.records
+            if record.name.startswith(heatly_test.__name__) and record.levelno >= logging.ERROR
+        ]
+        assert not hub._tasks
+        await runner.cleanup()
+        await hass.async_stop(force=True)
+
+    asyncio.run(run())
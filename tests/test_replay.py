@@ -0,0 +1,53 @@
+"""A recorded session replays as the same API traffic."""
+import asyncio
+import json
+
+import pytest
+
+from benchmarks import replay
+from benchmarks.stand_in_server import StandInApi, StandInConfig
+
+ROOMS = ("room_1", "room_2", "room_3")
+UPLOADS_PER_ROOM = 6
+UPLOAD_INTERVAL = 300  # Recorded seconds between a room's uploads - each one returned a plan
+
+
+def _write_recording(path):
+    """A recording where every upload was answered with a plan, as with the production API."""
+    api = StandInApi(StandInConfig(include_plan=True, trajectory_points=12))
+    started = 1_700_000_000.0
+    with open(path, "w", encoding="utf-8") as f:
+        for step in range(UPLOADS_PER_ROOM):
+            for index, room_id in enumerate(ROOMS):
+                recorded_at = started + step * UPLOAD_INTERVAL + index
+                temperature = 19.0 + step * 0.4 + index * 0.1
+                record = {
+                    "t": recorded_at,
+                    "m": "POST",
+                    "p": f"/api/room/{room_id}/sensor",
+                    "s": 200,
+                    "l": 40.0,
+                    "q": {"temperature": temperature, "outdoor_temp": 2.0, "timestamp": int(recorded_at)},
+                    "r": api.control_response(room_id, temperature),
+                }
+                f.write(json.dumps(record) + "\n")
+
+
+@pytest.mark.parametrize("batched", [False, True])
+def test_replay_sends_every_recorded_upload(tmp_path, batched):
+    recording = tmp_path / "traffic.jsonl"
+    _write_recording(recording)
+
+    argv = [str(recording), "--speed", "3000", "--latency-ms", "1"]
+    if not batched:
+        argv.append("--no-batch")
+    report = asyncio.run(replay.run_replay(replay.build_parser().parse_args(argv)))
+
+    recorded = len(ROOMS) * UPLOADS_PER_ROOM
+    assert report["throughput"]["recorded_sensor_requests"] == recorded
+    assert report["throughput"]["uploads"] == recorded
+    assert report["server_counters"]["replayed"] == recorded
+    if batched:
+        assert report["server_counters"]["batch_readings"] == recorded
+    else:
+        assert report["throughput"]["api_requests"] == recorded
@@ -0,0 +1,52 @@
+"""The shared schedule cache: conditional refreshes and who owns the session."""
+import asyncio
+
+import aiohttp
+
+from benchmarks.stand_in_server import StandInApi, StandInConfig, start_stand_in_server
+from custom_components.heatly_test.api_client import HeatlyApiClient, ScheduleCache
+
+
+def test_not_modified_without_a_cached_copy_refetches():
+    async def run():
+        api = StandInApi(StandInConfig(latency_ms=1, latency_jitter_ms=0))
+        runner, base_url = await start_stand_in_server(api)
+        cache = ScheduleCache(base_url)
+        cache._etag = api.schedules_etag  # Validator left over, but no schedules to go with it
+        try:
+            async with aiohttp.ClientSession() as session:
+                schedules = await cache.async_get(session)
+        finally:
+            await runner.cleanup()
+
+        assert schedules == api.schedules
+        assert api.counters["schedules_not_modified"] == 1
+        assert api.counters["schedules"] == 2
+        assert cache._etag == api.schedules_etag
+
+    asyncio.run(run())
+
+
+def test_refresh_outlives_the_room_that_started_it():
+    async def run():
+        api = StandInApi(StandInConfig(latency_ms=20, latency_jitter_ms=0))
+        runner, base_url = await start_stand_in_server(api)
+        cache = ScheduleCache(base_url)
+        try:
+            async with aiohttp.ClientSession() as session:
+                first = HeatlyApiClient("room-1", base_url, session=session, schedule_cache=cache)
+                second = HeatlyApiClient("room-2", base_url, session=session, schedule_cache=cache)
+                pending = asyncio.create_task(first.get_available_schedules())
+                await asyncio.sleep(0)  # Refresh task created, not yet running
+                await first.async_close()  # The first room's entry unloads
+
+                assert await second.get_available_schedules() == api.schedules
+                assert await pending == api.schedules
+                # The refresh went out on the pool session, not a private one the closed client now owns
+                assert first._session is None
+        finally:
+            await runner.cleanup()
+
+        assert api.counters["schedules"] == 1
+
+    asyncio.run(run())
@@ -0,0 +1,80 @@
+"""The thermostat only writes state when something a user could see has changed."""
+import asyncio
+import time
+
+from homeassistant.components.climate import HVACMode
+
+from benchmarks.hass_stub import HassStub
+from benchmarks.load_test import build_rooms, set_temperature
+from benchmarks.stand_in_server import StandInApi, StandInConfig
+from custom_components.heatly_test.climate import ATTRIBUTE_KEYS
+
+
+def test_thermostat_is_not_polled():
+    async def run():
+        pool, rooms = build_rooms(HassStub(), "http://127.0.0.1:9", 1, 1, None)
+        assert rooms[0][1].should_poll is False
+        await pool.async_close()
+
+    asyncio.run(run())
+
+
+def test_unchanged_tick_writes_no_state():
+    async def run():
+        hass = HassStub()
+        pool, rooms = build_rooms(hass, "http://127.0.0.1:9", 1, 1, None)
+        room, thermostat, config = rooms[0]
+        writes = []
+        thermostat.async_write_ha_state = lambda: writes.append(1)
+        thermostat._attr_hvac_mode = HVACMode.HEAT
+        thermostat._attr_target_temperature = 21.0
+
+        set_temperature(hass, thermostat, config["temp_sensor"], 20.8)
+        await room.async_send_sensor_update()
+        assert len(writes) == 1
+
+        await room.async_send_sensor_update()
+        await room.async_send_sensor_update()
+        assert len(writes) == 1
+
+        # A visible change is still written
+        set_temperature(hass, thermostat, config["temp_sensor"], 19.0)
+        await room.async_send_sensor_update()
+        assert len(writes) == 2
+        await pool.async_close()
+
+    asyncio.run(run())
+
+
+def test_identical_api_responses_write_state_once(monkeypatch):
+    clock = [1_700_000_000.0]
+    monkeypatch.setattr(time, "time", lambda: clock[0])
+
+    async def run():
+        hass = HassStub()
+        pool, rooms = build_rooms(hass, "http://127.0.0.1:9", 1, 1, None)
+        room, thermostat, config = rooms[0]
+        writes = []
+        thermostat.async_write_ha_state = lambda: writes.append(dict(thermostat.extra_state_attributes))
+        set_temperature(hass, thermostat, config["temp_sensor"], 20.0)
+        response = StandInApi(StandInConfig(include_plan=True, prediction_age_seconds=30)).control_response(
+            room.room_id, 20.0
+        )
+
+        # The same plan every minute: plan_valid_until creeps forward, nothing a user sees changes
+        for _ in range(5):
+            await thermostat.update_from_response(response)
+            clock[0] += 60
+        assert len(writes) == 1
+        assert thermostat.suppressed_writes == 4
+
+        # Following the plan locally, or falling back to failsafe, keeps the attribute layout
+        await thermostat.async_run_without_api(api_failed=False)
+        assert writes[-1]["control_mode"] == "plan"
+        thermostat._plan = None
+        await thermostat.async_run_without_api()
+        assert writes[-1]["control_mode"] == "failsafe"
+        assert all(tuple(attributes) == ATTRIBUTE_KEYS for attributes in writes)
+        await pool.async_close()
+
+    asyncio.run(run())
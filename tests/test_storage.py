@@ -0,0 +1,91 @@
+"""Room state is written to storage on a fixed cadence, and only what restore needs."""
+import asyncio
+import json
+import time
+
+from homeassistant.const import EVENT_HOMEASSISTANT_FINAL_WRITE
+from homeassistant.core import HomeAssistant
+
+from benchmarks.stand_in_server import StandInApi, StandInConfig
+from custom_components.heatly_test.storage import PeriodicStoreWriter
+from custom_components.heatly_test.trajectory import TrajectoryPlan, plan_fields
+
+
+class _Store:
+    def __init__(self):
+        self.saved = []
+
+    async def async_save(self, data):
+        self.saved.append(data)
+
+
+def test_changes_faster_than_the_interval_are_still_saved(tmp_path):
+    async def run():
+        hass = HomeAssistant(str(tmp_path))
+        store = _Store()
+        value = {"n": 0}
+        writer = PeriodicStoreWriter(hass, store, lambda: dict(value), 0.1)
+
+        # A change every 20 ms for 0.35 s - a restarting delay would never fire
+        for n in range(1, 18):
+            value["n"] = n
+            writer.schedule()
+            await asyncio.sleep(0.02)
+        assert 2 <= len(store.saved) <= 4
+        assert store.saved[0]["n"] < store.saved[-1]["n"]
+
+        await writer.async_flush()
+        assert store.saved[-1] == {"n": 17}
+
+        # Nothing changed since - no further writes
+        saves = len(store.saved)
+        await writer.async_flush()
+        await asyncio.sleep(0.15)
+        assert len(store.saved) == saves
+        await hass.async_stop(force=True)
+
+    asyncio.run(run())
+
+
+def test_stored_plan_fields_restore_the_same_plan():
+    api = StandInApi(StandInConfig(include_plan=True, trajectory_points=12, prediction_age_seconds=30))
+    response = api.control_response("kitchen", 20.5)
+    received_at = time.time()
+
+    fields = plan_fields(response)
+    assert set(fields) == {"heater_state", "prediction_age_seconds", "trajectory"}
+    assert all(set(point) == {"timestamp", "heater_state"} for point in fields["trajectory"])
+
+    full = TrajectoryPlan.from_response(response, received_at)
+    restored = TrajectoryPlan.from_response(json.loads(json.dumps(fields)), received_at)
+    assert restored.timestamps == full.timestamps
+    assert restored.heater_states == full.heater_states
+    assert restored.expires_at == full.expires_at
+
+
+def test_response_without_plan_stores_nothing():
+    api = StandInApi(StandInConfig(include_plan=False))
+    assert plan_fields(api.control_response("kitchen", 20.5)) is None
+
+
+def test_pending_changes_are_written_when_home_assistant_stops(tmp_path):
+    async def run():
+        hass = HomeAssistant(str(tmp_path))
+        store = _Store()
+        writer = PeriodicStoreWriter(hass, store, lambda: {"n": 1}, 600)
+
+        writer.schedule()
+        writer.schedule()
+        assert hass.bus.async_listeners().get(EVENT_HOMEASSISTANT_FINAL_WRITE) == 1
+        hass.bus.async_fire(EVENT_HOMEASSISTANT_FINAL_WRITE)
+        await hass.async_block_till_done()
+        assert store.saved == [{"n": 1}]
+
+        # Flushed data leaves no listener or timer behind
+        writer.schedule()
+        await writer.async_flush()
+        assert hass.bus.async_listeners().get(EVENT_HOMEASSISTANT_FINAL_WRITE, 0) == 0
+        assert not [handle for handle in hass.loop._scheduled if not handle.cancelled()]
+        await hass.async_stop(force=True)
+
+    asyncio.run(run())
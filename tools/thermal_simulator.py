@@ -0,0 +1,262 @@
+"""Offline thermal simulator for tuning the local (HEAT mode) controller.
+
+Runs the same hysteresis decision as HeatlyThermostat._run_local_controller
+(control.hysteresis_step) against a two-node RC room model, vectorised with
+NumPy over every combination of
+
+    cold tolerance x hot tolerance x minimum switch interval x heater time constant
+
+so thousands of combinations and weeks of simulated time run in seconds. For
+each combination it reports switch count, comfort error and energy use.
+
+Room model (Euler steps of --dt seconds):
+
+    heater element:  dTh/dt = (u * heater_rise - (Th - T)) / tau_heater
+    room air:        dT/dt  = (Th - T) / tau_transfer + (T_out - T) / tau_loss
+
+A slow radiator has a large tau_heater (overshoots after switching off); a
+panel heater a small one (cycles quickly).
+
+Outdoor temperature (and optionally the target) can come from a recorded CSV
+trace with columns timestamp, outdoor_temp[, target][, temperature]; the first
+recorded indoor temperature is used as the starting point. Without a trace a
+daily sine around --outdoor-mean is used.
+
+Examples:
+
+    python tools/thermal_simulator.py --days 14
+    python tools/thermal_simulator.py --cold 0.1:1.5:15 --hot 0.1:1.5:15 \\
+        --min-switch 0,60,300,900 --tau-heater 120,1800 --output sweep.json
+    python tools/thermal_simulator.py --trace recorded.csv --top 20
+
+Requires numpy (not needed by the integration itself).
+"""
+import argparse
+import csv
+import importlib.util
+import json
+import math
+import pathlib
+import sys
+import time
+from datetime import datetime
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - tool-only dependency
+    sys.exit("thermal_simulator requires numpy: pip install numpy")
+
+_CONTROL_PATH = pathlib.Path(__file__).resolve().parent.parent / "custom_components" / "heatly_test" / "control.py"
+
+
+def _load_hysteresis_step():
+    """Import control.py by path, so the tool runs without Home Assistant installed."""
+    spec = importlib.util.spec_from_file_location("heatly_control", _CONTROL_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.hysteresis_step
+
+
+hysteresis_step = _load_hysteresis_step()
+
+
+def parse_values(text: str):
+    """'a:b:n' -> n evenly spaced values from a to b; 'x,y,z' -> the listed values."""
+    if ":" in text:
+        start, stop, count = text.split(":")
+        return [float(v) for v in np.linspace(float(start), float(stop), int(count))]
+    return [float(v) for v in text.split(",")]
+
+
+def _parse_time(value: str) -> float:
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+
+def load_trace(path: str):
+    """Read a recorded trace. Returns (seconds_from_start, outdoor, target_or_None, first_indoor_or_None)."""
+    times, outdoor, target, indoor = [], [], [], []
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            if not row.get("outdoor_temp"):
+                continue
+            times.append(_parse_time(row["timestamp"]))
+            outdoor.append(float(row["outdoor_temp"]))
+            target.append(float(row["target"]) if row.get("target") else math.nan)
+            indoor.append(float(row["temperature"]) if row.get("temperature") else math.nan)
+    if len(times) < 2:
+        sys.exit(f"Trace {path} needs at least two rows with outdoor_temp")
+
+    order = np.argsort(times)
+    times = np.asarray(times)[order]
+    target = np.asarray(target)[order]
+    indoor = np.asarray(indoor)[order]
+    has_target = not np.isnan(target).all()
+    first_indoor = indoor[~np.isnan(indoor)][0] if not np.isnan(indoor).all() else None
+    return (
+        times - times[0],
+        np.asarray(outdoor)[order],
+        target if has_target else None,
+        first_indoor,
+    )
+
+
+def build_inputs(args, steps: int):
+    """Outdoor and target temperature per simulation step."""
+    t = np.arange(steps) * args.dt
+    if args.trace:
+        trace_t, trace_outdoor, trace_target, first_indoor = load_trace(args.trace)
+        outdoor = np.interp(t, trace_t, trace_outdoor)
+        if trace_target is not None:
+            valid = ~np.isnan(trace_target)
+            target = np.interp(t, trace_t[valid], trace_target[valid])
+        else:
+            target = np.full(steps, args.target)
+        start_temp = first_indoor if first_indoor is not None else args.target
+    else:
+        outdoor = args.outdoor_mean + args.outdoor_amplitude * np.sin(2 * np.pi * (t / 86400.0 - 0.375))
+        target = np.full(steps, args.target)
+        start_temp = args.target
+    return outdoor, target, start_temp
+
+
+def simulate(args):
+    if args.trace:
+        duration = load_trace(args.trace)[0][-1]
+    else:
+        duration = args.days * 86400.0
+    steps = int(duration // args.dt)
+    outdoor, target, start_temp = build_inputs(args, steps)
+
+    grid = np.array(np.meshgrid(
+        parse_values(args.cold), parse_values(args.hot),
+        parse_values(args.min_switch), parse_values(args.tau_heater),
+        indexing="ij",
+    )).reshape(4, -1)
+    cold, hot, min_switch, tau_heater = grid
+    combos = grid.shape[1]
+    if args.dt > tau_heater.min() / 4:
+        print(f"warning: --dt {args.dt}s is coarse for tau_heater {tau_heater.min():.0f}s", file=sys.stderr)
+
+    temp = np.full(combos, float(start_temp))
+    element = temp.copy()
+    heater_on = np.zeros(combos, dtype=bool)
+    since_switch = np.full(combos, np.inf)
+    switches = np.zeros(combos, dtype=np.int64)
+    on_steps = np.zeros(combos, dtype=np.int64)
+    abs_error = np.zeros(combos)
+    sq_error = np.zeros(combos)
+    cold_degree_seconds = np.zeros(combos)
+
+    control_every = max(1, int(round(args.control_interval / args.dt)))
+    resolution = args.sensor_resolution
+    started = time.perf_counter()
+
+    for k in range(steps):
+        setpoint = target[k]
+        if k % control_every == 0:
+            measured = np.round(temp / resolution) * resolution if resolution else temp
+            new_state = hysteresis_step(measured, setpoint, cold, hot, heater_on, since_switch, min_switch)
+            switched = new_state != heater_on
+            switches += switched
+            since_switch[switched] = 0.0
+            heater_on = new_state
+        since_switch += args.dt
+        on_steps += heater_on
+
+        element += args.dt * (heater_on * args.heater_rise - (element - temp)) / tau_heater
+        temp += args.dt * ((element - temp) / args.tau_transfer + (outdoor[k] - temp) / args.tau_loss)
+
+        error = temp - setpoint
+        abs_error += np.abs(error)
+        sq_error += error * error
+        cold_degree_seconds += np.maximum(-error, 0.0)
+
+    elapsed = time.perf_counter() - started
+    days = steps * args.dt / 86400.0
+    results = []
+    for i in range(combos):
+        results.append({
+            "cold_tolerance": round(float(cold[i]), 3),
+            "hot_tolerance": round(float(hot[i]), 3),
+            "min_switch_interval": float(min_switch[i]),
+            "tau_heater": float(tau_heater[i]),
+            "switches_per_day": round(float(switches[i]) / days, 2),
+            "rms_error": round(math.sqrt(sq_error[i] / steps), 3),
+            "mean_abs_error": round(float(abs_error[i]) / steps, 3),
+            "cold_degree_hours": round(float(cold_degree_seconds[i]) / 3600.0, 2),
+            "energy_kwh": round(float(on_steps[i]) * args.dt * args.heater_watts / 3.6e6, 2),
+            "duty_cycle": round(float(on_steps[i]) / steps, 3),
+        })
+
+    # Lower is better: comfort error plus a penalty per switch
+    for result in results:
+        result["score"] = round(result["rms_error"] + args.switch_penalty * result["switches_per_day"], 4)
+    results.sort(key=lambda r: r["score"])
+
+    return {
+        "meta": {
+            "combinations": combos,
+            "simulated_days": round(days, 2),
+            "steps": steps,
+            "dt_seconds": args.dt,
+            "control_interval_seconds": args.control_interval,
+            "runtime_seconds": round(elapsed, 3),
+            "trace": args.trace,
+            "model": {
+                "heater_rise": args.heater_rise,
+                "tau_transfer": args.tau_transfer,
+                "tau_loss": args.tau_loss,
+                "heater_watts": args.heater_watts,
+            },
+        },
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep local controller parameters on a simulated room")
+    parser.add_argument("--cold", default="0.1:1.5:15", help="Cold tolerances, 'a:b:n' or 'x,y'")
+    parser.add_argument("--hot", default="0.1:1.5:15", help="Hot tolerances")
+    parser.add_argument("--min-switch", default="0,60,300,900", help="Minimum switch intervals (s)")
+    parser.add_argument("--tau-heater", default="120,1800", help="Heater element time constants (s)")
+    parser.add_argument("--days", type=float, default=14.0)
+    parser.add_argument("--dt", type=float, default=30.0, help="Simulation step (s)")
+    parser.add_argument("--control-interval", type=float, default=60.0, help="Controller period (s)")
+    parser.add_argument("--sensor-resolution", type=float, default=0.1, help="Sensor rounding (°C, 0 = none)")
+    parser.add_argument("--target", type=float, default=21.0)
+    parser.add_argument("--outdoor-mean", type=float, default=0.0)
+    parser.add_argument("--outdoor-amplitude", type=float, default=5.0)
+    parser.add_argument("--heater-rise", type=float, default=30.0, help="Element temperature rise at full power (°C)")
+    parser.add_argument("--tau-transfer", type=float, default=4 * 3600.0, help="Element-to-room time constant (s)")
+    parser.add_argument("--tau-loss", type=float, default=4 * 3600.0, help="Room-to-outdoor time constant (s)")
+    parser.add_argument("--heater-watts", type=float, default=1000.0)
+    parser.add_argument("--switch-penalty", type=float, default=0.01, help="Score penalty per switch per day")
+    parser.add_argument("--trace", help="CSV with timestamp,outdoor_temp[,target][,temperature]")
+    parser.add_argument("--top", type=int, default=10, help="Rows to print")
+    parser.add_argument("--output", help="Write the full JSON report here")
+    args = parser.parse_args()
+
+    report = simulate(args)
+    meta = report["meta"]
+    print(
+        f"{meta['combinations']} combinations x {meta['simulated_days']} days "
+        f"in {meta['runtime_seconds']}s"
+    )
+    print(f"{'cold':>5} {'hot':>5} {'min_sw':>6} {'tau_h':>6} {'sw/day':>7} {'rms':>6} {'kWh':>7} {'score':>7}")
+    for r in report["results"][:args.top]:
+        print(
+            f"{r['cold_tolerance']:5.2f} {r['hot_tolerance']:5.2f} {r['min_switch_interval']:6.0f} "
+            f"{r['tau_heater']:6.0f} {r['switches_per_day']:7.1f} {r['rms_error']:6.3f} "
+            f"{r['energy_kwh']:7.1f} {r['score']:7.3f}"
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()